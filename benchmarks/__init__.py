@@ -0,0 +1,31 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Benchmarks for the documentation macros (`main.py`) and `hooks.py`.
+
+Run from the repository root:
+
+    uv run python -m benchmarks run --output baseline.json
+    # ... change main.py, hooks.py or ucp_tools ...
+    uv run python -m benchmarks compare baseline.json
+
+`run` drives `define_env` with a stub `env`, calls every literal macro call
+found in `docs/` against the real `source/` tree, runs `on_post_build` into
+a temporary site directory and times schema resolution through the Python
+resolver and through a local fake `ucp-schema` executable. Each case is
+sampled several times, each sample starting from fresh modules and caches,
+and the min/median are written as JSON. `compare` runs the suite again (or
+reads a second results file) and exits non-zero if any case's median grew
+by more than the threshold.
+"""
@@ -0,0 +1,178 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Command line: `python -m benchmarks run|compare` (see the package doc)."""
+
+import argparse
+from collections import defaultdict
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+  sys.path.insert(0, str(ROOT))
+
+from benchmarks import fake_ucp_schema  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+  compare,
+  load_config,
+  read_results,
+  results_document,
+  speedups,
+  summarize,
+)
+from benchmarks.suites import SPEEDUPS, SUITES, Context  # noqa: E402
+
+DEFAULT_OUTPUT = Path(".cache/ucp-benchmark.json")
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_MS = 1.0
+
+
+def run_suites(
+  names: list[str], repeat: int, corpus: Path | None = None
+) -> dict[str, dict]:
+  """Sample each suite `repeat` times and return the summarized cases."""
+  corpus = (corpus or ROOT).resolve()
+  os.chdir(corpus)
+  # main.py and hooks.py log every file they touch; keep the output to ours.
+  logging.getLogger("mkdocs").setLevel(logging.WARNING)
+  config = load_config(ROOT, docs_dir=str(corpus / "docs"))
+  samples: dict[str, list[float]] = defaultdict(list)
+  with tempfile.TemporaryDirectory(prefix="ucp-benchmark-") as work_dir:
+    work_dir = Path(work_dir)
+    fake_ucp_schema.install(work_dir / "bin")
+    os.environ["PATH"] = f"{work_dir / 'bin'}{os.pathsep}{os.environ['PATH']}"
+    context = Context(ROOT, corpus, config, work_dir)
+    for name in names:
+      for sample in range(repeat):
+        context.sample = sample
+        for case, seconds in SUITES[name](context).items():
+          samples[case].append(seconds)
+        print(f"{name}: sample {sample + 1}/{repeat}", file=sys.stderr)
+  return summarize(samples)
+
+
+def _write(path: Path, document: dict) -> None:
+  path.parent.mkdir(parents=True, exist_ok=True)
+  with path.open("w", encoding="utf-8") as f:
+    json.dump(document, f, indent=2)
+    f.write("\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+  """Parse arguments and run or compare benchmarks."""
+  parser = argparse.ArgumentParser(
+    prog="python -m benchmarks",
+    description="Benchmark the documentation macros and post-build hook.",
+  )
+  commands = parser.add_subparsers(dest="command", required=True)
+
+  def add_run_options(command):
+    command.add_argument(
+      "--suite",
+      action="append",
+      choices=sorted(SUITES),
+      help="Suite to run (repeatable); default: all.",
+    )
+    command.add_argument(
+      "--repeat",
+      type=int,
+      default=DEFAULT_REPEAT,
+      help=f"Samples per suite (default {DEFAULT_REPEAT}).",
+    )
+    command.add_argument(
+      "--corpus",
+      type=Path,
+      help=(
+        "Directory with the source/ and docs/ to use, e.g. one written by "
+        "scripts/generate_corpus.py; default: this repository."
+      ),
+    )
+
+  run = commands.add_parser("run", help="Run the suites and save results.")
+  add_run_options(run)
+  run.add_argument(
+    "--output",
+    type=Path,
+    default=DEFAULT_OUTPUT,
+    help=f"Results file (default {DEFAULT_OUTPUT}).",
+  )
+
+  check = commands.add_parser(
+    "compare", help="Flag cases slower than a baseline."
+  )
+  check.add_argument("baseline", type=Path, help="Results file to compare to.")
+  check.add_argument(
+    "current",
+    type=Path,
+    nargs="?",
+    help="Results file to check; default: run the suites now.",
+  )
+  add_run_options(check)
+  check.add_argument(
+    "--threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD,
+    help=(
+      "Relative median slowdown that fails the comparison "
+      f"(default {DEFAULT_THRESHOLD})."
+    ),
+  )
+  check.add_argument(
+    "--min-ms",
+    type=float,
+    default=DEFAULT_MIN_MS,
+    help=(
+      "Ignore slowdowns of cases whose baseline median is below this "
+      f"(default {DEFAULT_MIN_MS})."
+    ),
+  )
+  args = parser.parse_args(argv)
+  names = args.suite or list(SUITES)
+
+  if args.command == "run":
+    # Resolved first: the suites run from the corpus directory.
+    output = args.output.resolve()
+    cases = run_suites(names, args.repeat, args.corpus)
+    ratios = speedups(cases, SPEEDUPS)
+    _write(output, results_document(cases, args.repeat, ratios))
+    for name, ratio in ratios.items():
+      baseline, faster = SPEEDUPS[name]
+      print(f"{name}: {faster} is {ratio:.2f}x as fast as {baseline}")
+    print(f"Wrote {len(cases)} cases to {args.output}")
+    return 0
+
+  baseline = read_results(args.baseline)
+  if args.current is not None:
+    current = read_results(args.current)
+  else:
+    current = run_suites(names, args.repeat, args.corpus)
+  lines, regressions = compare(baseline, current, args.threshold, args.min_ms)
+  print("\n".join(lines))
+  if regressions:
+    print(
+      f"{len(regressions)} case(s) slower than the baseline by more than "
+      f"{args.threshold:.0%}: {', '.join(regressions)}"
+    )
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,88 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Stand-in for the `ucp-schema` CLI, backed by the Python resolver.
+
+Supports the two invocations the macros make, `ucp-schema --version` and
+`ucp-schema resolve <file> --request|--response --op <op> [--bundle]`, so the
+CLI backend's subprocess and caching overhead can be timed without the real
+binary. `install()` writes an executable wrapper for it.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+from ucp_tools.resolver import ResolutionError, resolve_file
+
+FAKE_VERSION = "ucp-schema 0.0.0-benchmark"
+
+WRAPPER = """#!{python}
+import sys
+sys.path.insert(0, {root!r})
+from benchmarks.fake_ucp_schema import main
+sys.exit(main())
+"""
+
+
+def main(argv: list[str] | None = None) -> int:
+  """Run the fake CLI; returns the process exit code."""
+  argv = sys.argv[1:] if argv is None else argv
+  if argv == ["--version"]:
+    print(FAKE_VERSION)
+    return 0
+
+  parser = argparse.ArgumentParser(prog="ucp-schema")
+  commands = parser.add_subparsers(dest="command", required=True)
+  resolve = commands.add_parser("resolve")
+  resolve.add_argument("path")
+  direction = resolve.add_mutually_exclusive_group(required=True)
+  direction.add_argument("--request", action="store_true")
+  direction.add_argument("--response", action="store_true")
+  resolve.add_argument("--op", default="read")
+  resolve.add_argument("--bundle", action="store_true")
+  args = parser.parse_args(argv)
+
+  try:
+    data = resolve_file(
+      args.path,
+      "request" if args.request else "response",
+      args.op,
+      bundle=args.bundle,
+    )
+  except (ResolutionError, OSError, ValueError) as e:
+    print(f"error: {e}", file=sys.stderr)
+    return 1
+  json.dump(data, sys.stdout)
+  return 0
+
+
+def install(bin_dir: str | Path) -> Path:
+  """Write an executable `ucp-schema` wrapper into `bin_dir`."""
+  bin_dir = Path(bin_dir)
+  bin_dir.mkdir(parents=True, exist_ok=True)
+  executable = bin_dir / "ucp-schema"
+  executable.write_text(
+    WRAPPER.format(
+      python=sys.executable, root=str(Path(__file__).resolve().parents[1])
+    ),
+    encoding="utf-8",
+  )
+  executable.chmod(0o755)
+  return executable
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,143 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Process-wide cache resets, config loading and result bookkeeping."""
+
+import json
+from pathlib import Path
+import platform
+import statistics
+import sys
+from typing import Any
+
+from ucp_tools import (
+  bounded_cache,
+  openapi_index,
+  page_cache,
+  ref_graph,
+  render_cache,
+  repository,
+  validator,
+)
+
+# Bump when the results layout changes.
+RESULTS_FORMAT = 1
+
+# Process-wide memos kept by ucp_tools so `mkdocs serve` rebuilds are warm
+_PROCESS_CACHES = (
+  repository._repositories,
+  render_cache._caches,
+  page_cache._caches,
+  bounded_cache._caches,
+  ref_graph._graphs,
+  openapi_index._indexes,
+  validator._validators,
+)
+
+
+def reset_process_caches() -> None:
+  """Forget everything ucp_tools keeps between builds in one process."""
+  for cache in _PROCESS_CACHES:
+    cache.clear()
+
+
+def load_config(root, **overrides):
+  """Load the repository's `mkdocs.yml`, with optional setting overrides."""
+  from mkdocs.config import load_config as mkdocs_load_config
+
+  return mkdocs_load_config(str(root / "mkdocs.yml"), **overrides)
+
+
+def summarize(samples: dict[str, list[float]]) -> dict[str, dict]:
+  """Reduce per-case samples (seconds) to min/median milliseconds."""
+  return {
+    case: {
+      "min_ms": round(min(times) * 1e3, 3),
+      "median_ms": round(statistics.median(times) * 1e3, 3),
+      "runs": len(times),
+    }
+    for case, times in sorted(samples.items())
+  }
+
+
+def speedups(
+  cases: dict[str, dict], pairs: dict[str, tuple[str, str]]
+) -> dict[str, float]:
+  """Return {name: baseline median / faster median} for the measured pairs."""
+  return {
+    name: round(cases[baseline]["median_ms"] / cases[faster]["median_ms"], 2)
+    for name, (baseline, faster) in sorted(pairs.items())
+    if baseline in cases and cases.get(faster, {}).get("median_ms")
+  }
+
+
+def results_document(
+  cases: dict[str, dict], repeat: int, ratios: dict[str, float] | None = None
+) -> dict[str, Any]:
+  """Wrap summarized cases (and speedups) with what they were measured on."""
+  return {
+    "format": RESULTS_FORMAT,
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "repeat": repeat,
+    "cases": cases,
+    "speedups": ratios or {},
+  }
+
+
+def read_results(path) -> dict[str, dict]:
+  """Return the cases of a results file written by `run`."""
+  with Path(path).open(encoding="utf-8") as f:
+    document = json.load(f)
+  if document.get("format") != RESULTS_FORMAT:
+    sys.exit(f"{path}: unsupported results format {document.get('format')}")
+  return document["cases"]
+
+
+def compare(
+  baseline: dict[str, dict],
+  current: dict[str, dict],
+  threshold: float,
+  min_ms: float,
+) -> tuple[list[str], list[str]]:
+  """Compare medians case by case.
+
+  Args:
+    baseline: Cases of the reference run.
+    current: Cases of the run being checked.
+    threshold: Relative slowdown flagged, e.g. 0.2 for 20%.
+    min_ms: Cases whose baseline median is below this are reported but not
+      flagged; they are too short to time reliably.
+
+  Returns:
+    (report lines, names of the cases that slowed down beyond `threshold`).
+
+  """
+  lines = [f"{'baseline ms':>12} {'current ms':>12} {'change':>8}  case"]
+  regressions = []
+  for case in sorted(baseline.keys() | current.keys()):
+    before = baseline.get(case, {}).get("median_ms")
+    after = current.get(case, {}).get("median_ms")
+    if before is None or after is None:
+      status = "new" if before is None else "removed"
+      value = after if before is None else before
+      lines.append(f"{'':>12} {value:12.3f} {status:>8}  {case}")
+      continue
+    change = (after - before) / before if before else 0.0
+    flag = ""
+    if change > threshold and before >= min_ms:
+      regressions.append(case)
+      flag = "  <-- slower"
+    lines.append(f"{before:12.3f} {after:12.3f} {change:+8.1%}  {case}{flag}")
+  return lines, regressions
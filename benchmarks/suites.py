@@ -0,0 +1,391 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""The benchmark suites.
+
+Each suite takes one sample: it starts from fresh `main` / `hooks` modules
+and empty process-wide caches (as a cold `mkdocs build` would) and returns
+{case name: seconds}. Case names are stable so results can be compared
+across commits.
+
+The modules always come from the repository; `source/` and `docs/` come
+from the corpus directory, which is the repository itself unless a corpus
+from `scripts/generate_corpus.py` is given. Suites run with the corpus as
+the working directory, as `main.py` and `hooks.py` expect.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable
+import copy
+from dataclasses import dataclass
+from pathlib import Path
+import shutil
+import time
+
+from benchmarks.harness import reset_process_caches
+from ucp_tools.headless import HeadlessEnv, load_module
+from ucp_tools.profiling import get_profiler
+from ucp_tools.publish import (
+  PUBLISH_CACHE_DIR,
+  RefIdIndex,
+  transform_schema,
+  transform_schema_legacy,
+)
+from ucp_tools.repository import get_repository
+from ucp_tools.validator import VARIANTS, _escape, _unescape, compile_variants
+
+try:
+  from jsonschema import Draft202012Validator
+except ImportError:  # Optional baseline: `uv run --with jsonschema ...`.
+  Draft202012Validator = None
+
+# Schemas resolved by the resolver suite, relative to the corpus; capped so
+# the CLI cases stay short on large corpora
+RESOLVER_SCHEMAS_GLOB = "source/schemas/shopping/*.json"
+RESOLVER_MAX_SCHEMAS = 24
+RESOLVER_VARIANTS = (("response", "read"), ("request", "create"))
+# Payload schemas of the validator suite, and how often each sample payload
+# is validated per variant
+VALIDATOR_SCHEMAS = ("checkout", "cart")
+VALIDATOR_ROUNDS = 50
+# Items generated for every array of a sample payload
+SAMPLE_ARRAY_ITEMS = 3
+# `$ref`s followed on one branch before a sample stops descending
+SAMPLE_MAX_REFS = 6
+# Spans of the macros suite reported as cases of their own
+RENDER_SPANS = ("render:create_link", "render:_render_table_from_schema")
+
+
+@dataclass
+class Context:
+  """Shared inputs of every suite."""
+
+  root: Path
+  corpus: Path
+  config: object
+  work_dir: Path
+  sample: int = 0
+
+  def fresh_dir(self, name: str) -> Path:
+    """Return an empty scratch directory unique to this sample."""
+    path = self.work_dir / f"{name}-{self.sample}"
+    shutil.rmtree(path, ignore_errors=True)
+    path.mkdir(parents=True)
+    return path
+
+
+def _fresh_main(context: Context, **variables):
+  reset_process_caches()
+  main = load_module(context.root / "main.py", "main")
+  return main, HeadlessEnv(context.config, {"ucp_profile": False, **variables})
+
+
+def define_env_suite(context: Context) -> dict[str, float]:
+  """Time `define_env` with and without prefetching every variant."""
+  times = {}
+  for case, workers in (("define_env.no_prefetch", 0), ("define_env", None)):
+    variables = {} if workers is None else {"ucp_prefetch_workers": workers}
+    main, env = _fresh_main(context, **variables)
+    started = time.perf_counter()
+    main.define_env(env)
+    times[case] = time.perf_counter() - started
+  return times
+
+
+def macros_suite(context: Context) -> dict[str, float]:
+  """Time every literal macro call in docs/, cold and then warm.
+
+  Resolution happens lazily inside the macros (no prefetch), so the cold
+  pass includes it. `create_link` and `_render_table_from_schema` are
+  closures inside `define_env`; their totals come from the profiler.
+  """
+  main, env = _fresh_main(context, ucp_prefetch_workers=0)
+  main.define_env(env)
+  calls = list(main._scan_macro_calls(context.config["docs_dir"]))
+
+  times: dict[str, float] = defaultdict(float)
+  profiler = get_profiler()
+  profiler.start(context.work_dir / "profile.json")
+  try:
+    started = time.perf_counter()
+    for _, name, args, kwargs in calls:
+      call_started = time.perf_counter()
+      env.macros[name](*args, **kwargs)
+      times[f"macros.{name}"] += time.perf_counter() - call_started
+    times["macros.all"] = time.perf_counter() - started
+  finally:
+    profiler.stop()
+  for span in RENDER_SPANS:
+    if span in profiler.stats:
+      times[span] = profiler.stats[span].wall
+
+  started = time.perf_counter()
+  for _, name, args, kwargs in calls:
+    env.macros[name](*args, **kwargs)
+  times["macros.all.warm"] = time.perf_counter() - started
+  return dict(times)
+
+
+def hook_suite(context: Context) -> dict[str, float]:
+  """Time `on_post_build` into an empty site with no publish cache.
+
+  Then again with nothing new, into the same site and into an emptied one,
+  which is what `mkdocs build` and every `mkdocs serve` reload start from.
+  """
+  reset_process_caches()
+  shutil.rmtree(PUBLISH_CACHE_DIR, ignore_errors=True)
+  hooks = load_module(context.root / "hooks.py", "hooks")
+  config = {
+    "site_dir": str(context.fresh_dir("site")),
+    "extra": {**context.config.get("extra", {}), "ucp_profile": False},
+  }
+  times = {}
+  for case in (
+    "hook.on_post_build",
+    "hook.on_post_build.unchanged",
+    "hook.on_post_build.unchanged_clean_site",
+  ):
+    if case.endswith("clean_site"):
+      config["site_dir"] = str(context.fresh_dir("site"))
+    started = time.perf_counter()
+    hooks.on_post_build(config)
+    times[case] = time.perf_counter() - started
+  return times
+
+
+def publish_suite(context: Context) -> dict[str, float]:
+  """Time the `$ref` and version rewrites of the hook over every JSON file.
+
+  'publish.transform_schema' is the fused single pass and
+  'publish.transform_schema_legacy' the three passes it replaces
+  (`_process_refs`, `_set_schema_version`, `_rewrite_version_urls`), on
+  the same inputs; their ratio is reported as a speedup (see `SPEEDUPS`).
+  """
+  source_dir = context.corpus / "source"
+  repository = get_repository(source_dir)
+  documents = [
+    (path, repository.get(path))
+    for path in repository.paths()
+    if repository.get(path) is not None
+  ]
+  times = {}
+  rewrites: dict[str, Callable] = {
+    "publish.transform_schema": transform_schema,
+    "publish.transform_schema_legacy": transform_schema_legacy,
+  }
+  for case, rewrite in rewrites.items():
+    # Both rewrite in place, so each gets its own copies.
+    copies = [(Path(path), copy.deepcopy(data)) for path, data in documents]
+    id_index = RefIdIndex(repository)
+    started = time.perf_counter()
+    for path, data in copies:
+      rewrite(data, path.parent, id_index, str(path), "2026-01-23", "draft")
+    times[case] = time.perf_counter() - started
+  return times
+
+
+def resolver_suite(context: Context) -> dict[str, float]:
+  """Time resolving the top-level shopping schemas with each backend.
+
+  The CLI backend runs the fake `ucp-schema` from `fake_ucp_schema`, so
+  'resolver.cli' measures process and JSON overhead rather than the real
+  binary; 'resolver.cli.disk_cache' starts with a warm disk cache.
+  """
+  schemas = sorted(context.corpus.glob(RESOLVER_SCHEMAS_GLOB))
+  targets = [
+    (path.relative_to(context.corpus), direction, operation)
+    for path in schemas[:RESOLVER_MAX_SCHEMAS]
+    for direction, operation in RESOLVER_VARIANTS
+  ]
+  disk_cache = context.fresh_dir("ucp-schema-cache")
+  cases = (
+    ("resolver.python", "python", False),
+    ("resolver.cli", "cli", False),
+    ("resolver.cli.disk_cache", "cli", True),
+  )
+  times = {}
+  for case, backend, use_disk_cache in cases:
+    for timed in (False, True) if use_disk_cache else (True,):
+      main, env = _fresh_main(
+        context,
+        ucp_prefetch_workers=0,
+        ucp_schema_resolver=backend,
+        ucp_schema_cache=use_disk_cache,
+      )
+      main.SCHEMA_CACHE_DIR = disk_cache
+      main.define_env(env)
+      started = time.perf_counter()
+      for target in targets:
+        main._resolve_schema(*target)
+      if timed:
+        times[case] = time.perf_counter() - started
+  return times
+
+
+def _jsonschema_errors(schema):
+  """Return an `errors(payload)` of `jsonschema`, as (pointer, keyword)."""
+  validator = Draft202012Validator(schema)
+
+  def errors(payload):
+    return [
+      (
+        "".join(f"/{_escape(str(part))}" for part in error.absolute_path),
+        error.validator,
+      )
+      for error in validator.iter_errors(payload)
+    ]
+
+  return errors
+
+
+def sample_payload(root, schema=None, refs: int = 0):
+  """Return a payload shaped by a bundled schema, for timing validators.
+
+  Every declared property is filled in (not only the required ones) and
+  every array gets `SAMPLE_ARRAY_ITEMS` items, preferring `const`, `enum`
+  and `examples` values, so the payload exercises most of the schema. It is
+  usually, but not necessarily, valid.
+  """
+  schema = root if schema is None else schema
+  if not isinstance(schema, dict):
+    return {}
+  if "const" in schema:
+    return schema["const"]
+  if schema.get("enum"):
+    return schema["enum"][0]
+  if schema.get("examples"):
+    return schema["examples"][0]
+  if "$ref" in schema:
+    if refs >= SAMPLE_MAX_REFS:
+      return {}
+    target = root
+    for token in filter(None, schema["$ref"][1:].split("/")):
+      token = _unescape(token)
+      target = target[int(token) if isinstance(target, list) else token]
+    return sample_payload(root, target, refs + 1)
+  for keyword in ("anyOf", "oneOf"):
+    if schema.get(keyword):
+      return sample_payload(root, schema[keyword][0], refs)
+  merged = {}
+  for sub in schema.get("allOf", ()):
+    part = sample_payload(root, sub, refs)
+    if isinstance(part, dict):
+      merged.update(part)
+  kind = schema.get("type")
+  if isinstance(kind, list):
+    kind = kind[0]
+  if kind == "array" or "items" in schema:
+    item = sample_payload(root, schema.get("items", {}), refs)
+    return [item] * SAMPLE_ARRAY_ITEMS
+  if kind == "object" or "properties" in schema or merged:
+    for name, sub in schema.get("properties", {}).items():
+      merged[name] = sample_payload(root, sub, refs)
+    return merged
+  return {
+    "string": "sample",
+    "integer": 1,
+    "number": 1.5,
+    "boolean": True,
+    "null": None,
+  }.get(kind, "sample")
+
+
+def break_payload(payload):
+  """Return a copy of a payload with every string replaced by a number."""
+  if isinstance(payload, dict):
+    return {name: break_payload(value) for name, value in payload.items()}
+  if isinstance(payload, list):
+    return [break_payload(item) for item in payload]
+  return 0 if isinstance(payload, str) else payload
+
+
+def validator_suite(context: Context) -> dict[str, float]:
+  """Time compiled validators against `jsonschema`.
+
+  The baseline is `jsonschema`'s `Draft202012Validator`, when installed
+  (`uv run --with jsonschema python -m benchmarks`); otherwise only the
+  compiled validators are timed. Each variant of `VALIDATOR_SCHEMAS`
+  validates a sample payload that fills every property ('valid', though not
+  necessarily error-free) and a copy with every string replaced by a number
+  ('invalid'). `jsonschema` must first report the same (pointer, keyword)
+  pairs as the compiled validators.
+  """
+  reset_process_caches()
+  repository = get_repository(context.corpus / "source")
+  started = time.perf_counter()
+  validators = [
+    validator
+    for schema in VALIDATOR_SCHEMAS
+    for validator in compile_variants(
+      repository,
+      context.corpus / f"source/schemas/shopping/{schema}.json",
+      VARIANTS,
+      context.corpus / "source",
+    ).values()
+  ]
+  times = {"validator.compile": time.perf_counter() - started}
+  engines: dict[str, Callable] = {
+    "compiled": lambda validator: validator.errors,
+  }
+  if Draft202012Validator is not None:
+    engines["jsonschema"] = lambda validator: _jsonschema_errors(
+      validator.schema
+    )
+  payloads = {"valid": [], "invalid": []}
+  for validator in validators:
+    sample = sample_payload(validator.schema)
+    payloads["valid"].append((validator, sample))
+    payloads["invalid"].append((validator, break_payload(sample)))
+  for kind, pairs in payloads.items():
+    for engine, make in engines.items():
+      checks = [(make(validator), payload) for validator, payload in pairs]
+      for (validator, payload), (errors, _) in zip(pairs, checks, strict=True):
+        expected = {e[:2] for e in validator.errors(payload)}
+        if {e[:2] for e in errors(payload)} != expected:
+          raise RuntimeError(
+            f"{validator.name}: {engine} disagrees with the compiled "
+            f"validator ({kind} payload)"
+          )
+      started = time.perf_counter()
+      for _ in range(VALIDATOR_ROUNDS):
+        for errors, payload in checks:
+          errors(payload)
+      times[f"validator.{engine}.{kind}"] = time.perf_counter() - started
+  return times
+
+
+# Reported after a run as {name: (baseline case, faster case)}: how many
+# times the baseline's median is the faster case's
+SPEEDUPS = {
+  "publish.fused_vs_legacy": (
+    "publish.transform_schema_legacy",
+    "publish.transform_schema",
+  ),
+  **{
+    f"validator.compiled_vs_jsonschema.{kind}": (
+      f"validator.jsonschema.{kind}",
+      f"validator.compiled.{kind}",
+    )
+    for kind in ("valid", "invalid")
+  },
+}
+
+SUITES: dict[str, Callable[[Context], dict[str, float]]] = {
+  "define_env": define_env_suite,
+  "macros": macros_suite,
+  "hook": hook_suite,
+  "publish": publish_suite,
+  "resolver": resolver_suite,
+  "validator": validator_suite,
+}
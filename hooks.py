@@ -24,104 +24,64 @@ Mike handles deployment to /{version}/ paths, so output paths exclude version
 but $id/$ref URLs include it for correct resolution after deployment.
 """
 
-import json
 import logging
 import re
-import shutil
 from datetime import date
 from pathlib import Path
 
+from ucp_tools.bundle import plan_bundles
+from ucp_tools.publish import (
+  BuildManifest,
+  PublishSettings,
+  PublishVersion,
+  RefIdIndex,
+  publish_file,
+  publish_in_pool,
+  write_schema_catalogs,
+  write_size_report,
+)
+from ucp_tools.profiling import get_profiler
+from ucp_tools.ref_graph import REF_GRAPH_CACHE, get_ref_graph
+from ucp_tools.repository import get_repository, source_search_dirs
+
 log = logging.getLogger("mkdocs")
 
-# URL prefix for UCP schemas that need version injection
-UCP_SCHEMA_PREFIX = "https://ucp.dev/schemas/"
 # Pattern for valid date-based versions
 DATE_VERSION_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
 
-def _process_refs(data, current_file_dir):
-  """Recursively resolve relative $ref paths to absolute URLs.
+def _publish_version(ucp_version, output_dir=""):
+  """Derive URL and schema versions from a configured `ucp_version`."""
+  # URL always uses configured version string (date or label like 'draft')
+  url_version = ucp_version
+  if DATE_VERSION_PATTERN.match(ucp_version):
+    schema_version = ucp_version
+  else:
+    # Non-date: $id matches deployed URL, version = publish date
+    schema_version = date.today().isoformat()
+    log.info(
+      f"Non-date version '{ucp_version}': schema version set to "
+      f"'{schema_version}'"
+    )
+  return PublishVersion(url_version, schema_version, output_dir)
 
-  Reads referenced file's $id to construct the absolute URL.
-  Only processes relative refs (not # fragments or http URLs).
-  """
-  if isinstance(data, dict):
-    for key, value in data.items():
-      if (
-        key == "$ref"
-        and isinstance(value, str)
-        and not value.startswith(("#", "http"))
-      ):
-        ref_parts = value.split("#", 1)
-        relative_path = ref_parts[0]
-        fragment = f"#{ref_parts[1]}" if len(ref_parts) > 1 else ""
-
-        if not relative_path:
-          continue
-
-        ref_file_path = (current_file_dir / relative_path).resolve()
-
-        try:
-          with ref_file_path.open("r", encoding="utf-8") as f:
-            ref_data = json.load(f)
-
-          if "$id" in ref_data:
-            data[key] = ref_data["$id"] + fragment
-          else:
-            log.warning(
-              f"No '$id' found in {ref_file_path}. "
-              f"Keeping original '$ref': {value}"
-            )
-        except FileNotFoundError:
-          log.error(
-            f"Referenced file not found: {ref_file_path}. "
-            f"Keeping original '$ref': {value}"
-          )
-        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
-          log.error(
-            f"Failed to read referenced file {ref_file_path}: {e}. "
-            f"Keeping original '$ref': {value}"
-          )
-      else:
-        _process_refs(value, current_file_dir)
-  elif isinstance(data, list):
-    for item in data:
-      _process_refs(item, current_file_dir)
-
-
-def _rewrite_version_urls(data, url_version):
-  """Recursively rewrite ucp.dev/schemas/ URLs to include version.
-
-  Transforms: https://ucp.dev/schemas/X -> https://ucp.dev/{url_version}/schemas/X
-
-  This ensures $id matches the deployed URL and $ref resolves correctly.
-  Applied to both $id and $ref fields.
-  """
-  versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
-
-  if isinstance(data, dict):
-    for key, value in data.items():
-      if (
-        key in ("$id", "$ref")
-        and isinstance(value, str)
-        and value.startswith(UCP_SCHEMA_PREFIX)
-      ):
-        data[key] = value.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
-      else:
-        _rewrite_version_urls(value, url_version)
-  elif isinstance(data, list):
-    for item in data:
-      _rewrite_version_urls(item, url_version)
-
-
-def _set_schema_version(data, version):
-  """Set version field for named entities (capabilities, services, handlers).
-
-  Named entities (schemas with top-level 'name' field) require version per
-  ucp.json#/$defs/entity. Build injects version so source files don't need it.
+
+def _publish_versions(ucp_version):
+  """Return the versions to publish for the `extra.ucp_version` setting.
+
+  A single version is published at the site root (mike adds the version
+  prefix on deploy). A list publishes each version under its own
+  `{version}/` directory, matching its `https://ucp.dev/{version}/` URLs.
   """
-  if "name" in data:
-    data["version"] = version
+  if not ucp_version:
+    log.warning("No ucp_version in mkdocs.yml extra config")
+    return (PublishVersion(None, None),)
+  if isinstance(ucp_version, list):
+    # YAML reads unquoted dates as dates; dict.fromkeys drops duplicates.
+    return tuple(
+      _publish_version(v, v) for v in dict.fromkeys(map(str, ucp_version))
+    )
+  return (_publish_version(str(ucp_version)),)
 
 
 def on_post_build(config):
@@ -138,81 +98,123 @@ def on_post_build(config):
   Version handling:
   - YYYY-MM-DD: use for both URL path and version field
   - Non-date (e.g., 'draft'): URL uses literal, version = today's date
+  - A list of versions: each file is parsed and ref-resolved once, then
+    written to one `{version}/` tree per version
   """
-  ucp_version = config.get("extra", {}).get("ucp_version")
-  if not ucp_version:
-    log.warning("No ucp_version in mkdocs.yml extra config")
-    url_version = None
-    schema_version = None
-  else:
-    # URL always uses configured version string (date or label like 'draft')
-    url_version = ucp_version
-    if DATE_VERSION_PATTERN.match(ucp_version):
-      schema_version = ucp_version
-    else:
-      # Non-date: $id matches deployed URL, version = publish date
-      schema_version = date.today().isoformat()
-      log.info(
-        f"Non-date version '{ucp_version}': schema version set to "
-        f"'{schema_version}'"
-      )
+  versions = _publish_versions(config.get("extra", {}).get("ucp_version"))
 
   base_src_path = Path.cwd() / "source"
   if not base_src_path.exists():
     log.warning("Source directory not found: %s", base_src_path)
     return
 
-  for src_file in base_src_path.rglob("*"):
-    if not src_file.is_file():
-      continue
-    rel_path = src_file.relative_to(base_src_path).as_posix()
-
-    if not src_file.name.endswith(".json"):
-      dest_file = Path(config["site_dir"]) / rel_path
-      dest_dir = dest_file.parent
-      dest_dir.mkdir(exist_ok=True, parents=True)
-      shutil.copy2(src_file, dest_file)
-      log.info("Copied %s to %s", src_file, dest_file)
-      continue
-
-    # Process JSON files
-    try:
-      with src_file.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-
-      # Determine output path from ORIGINAL $id (before version rewrite).
-      # Mike deploys site/ to /{version}/, so we exclude version from path.
-      file_id = data.get("$id")
-      if file_id and file_id.startswith("https://ucp.dev"):
-        file_rel_path = file_id.removeprefix("https://ucp.dev").lstrip("/")
-      else:
-        file_rel_path = rel_path
-
-      # Step 1: Resolve relative $ref to absolute URLs
-      _process_refs(data, src_file.parent)
-
-      # Step 2: Inject version field for named entities
-      if schema_version:
-        _set_schema_version(data, schema_version)
-
-      # Step 3: Rewrite URLs to include version
-      if url_version:
-        _rewrite_version_urls(data, url_version)
-
-      dest_file = Path(config["site_dir"]) / file_rel_path
-      dest_dir = dest_file.parent
-
-      dest_dir.mkdir(exist_ok=True, parents=True)
-      with dest_file.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-      log.info("Processed and copied %s to %s", src_file, dest_file)
-
-    except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
-      log.error(
-        "Failed to process JSON file %s, copying as-is: %s", src_file, e
+  extra = config.get("extra", {})
+  # Same search directories as main.py, so this is the repository (and ref
+  # graph) the macros already built this build rather than a second index.
+  repository = get_repository(base_src_path, source_search_dirs(base_src_path))
+  ref_graph = get_ref_graph(repository, base_src_path, REF_GRAPH_CACHE)
+  for cycle in ref_graph.cycles():
+    log.info("Schemas with a cyclic $ref dependency: %s", ", ".join(cycle))
+  settings = PublishSettings(
+    source_dir=base_src_path,
+    site_dir=Path(config["site_dir"]),
+    versions=versions,
+    # Debug aid: also run the legacy three-pass rewrite and compare output.
+    check_fused=bool(extra.get("ucp_schema_check_fused")),
+    precompressed=bool(extra.get("ucp_schema_precompress")),
+    hashed_copies=bool(extra.get("ucp_schema_hashed_copies")),
+    # Variant bundles are resolved in-process, which is not yet checked
+    # against ucp-schema (see main.py's resolver backends), so opt-in.
+    bundles=(
+      plan_bundles(
+        repository,
+        base_src_path,
+        with_variants=bool(extra.get("ucp_schema_variant_bundles")),
       )
-      # Fallback to copying if processing fails
-      dest_file = Path(config["site_dir"]) / rel_path
-      dest_dir = dest_file.parent
-      dest_dir.mkdir(exist_ok=True, parents=True)
-      shutil.copy2(src_file, dest_file)
+      if extra.get("ucp_schema_bundles", True)
+      else {}
+    ),
+  )
+  src_files = sorted(p for p in base_src_path.rglob("*") if p.is_file())
+  workers = extra.get("ucp_post_build_workers") or 0
+
+  id_index = RefIdIndex(repository)
+
+  # Skip files whose inputs match the manifest left by the previous build,
+  # copying their outputs back from the publish cache if the site was wiped.
+  manifest = BuildManifest(settings, repository, ref_graph)
+  inputs = {}
+  to_publish = []
+  restored = 0
+  for src_file in src_files:
+    rel_path = src_file.relative_to(base_src_path).as_posix()
+    inputs[rel_path] = manifest.inputs(src_file)
+    if settings.check_fused or not manifest.is_current(
+      rel_path, inputs[rel_path]
+    ):
+      to_publish.append(src_file)
+    else:
+      restored += manifest.restore(rel_path)
+      id_index.merge_unresolved(manifest.unresolved(rel_path))
+  if len(to_publish) < len(src_files):
+    log.info(
+      "Publishing %d of %d source files; the rest are unchanged "
+      "(%d outputs copied from %s)",
+      len(to_publish),
+      len(src_files),
+      restored,
+      manifest.cache_dir,
+    )
+
+  if workers > 1 and len(to_publish) > 1:
+    results = publish_in_pool(to_publish, settings, workers)
+  else:
+    results = (publish_file(f, settings, id_index) for f in to_publish)
+
+  # Results arrive in file order, so the log is the same for any pool size.
+  profiler = get_profiler()
+  fused_mismatches = []
+  for result in results:
+    if result.timing:
+      started, wall, cpu, pid = result.timing
+      profiler.add(f"hook:{result.rel_path}", "hook", started, wall, cpu, pid)
+    for level, msg, args in result.records:
+      log.log(level, msg, *args)
+    id_index.merge_unresolved(result.unresolved)
+    manifest.record(result, inputs[result.rel_path])
+    if result.fused_mismatch:
+      fused_mismatches.append(result.rel_path)
+
+  for removed in manifest.remove_deleted(inputs):
+    log.info("Removed %s: no source file produces it any more", removed)
+  manifest.save()
+  if settings.precompressed:
+    write_size_report(manifest.cache_dir, manifest.sizes())
+  write_schema_catalogs(settings.site_dir, manifest.catalog())
+
+  id_index.log_summary()
+  if fused_mismatches:
+    log.error(
+      "Single-pass schema rewrite differs from the legacy passes for: %s",
+      ", ".join(sorted(fused_mismatches)),
+    )
+  elif settings.check_fused:
+    log.info("Single-pass schema rewrite matches the legacy passes")
+  _write_profile(profiler)
+
+
+def _write_profile(profiler):
+  """Log the top spans and write the profile, if profiling is enabled.
+
+  This hook runs after the macros plugin's post-build step, so the profile
+  covers the whole build.
+  """
+  if not profiler.enabled:
+    return
+  log.info(
+    "Build profile, top %d spans by wall time:\n%s",
+    profiler.top_n,
+    "\n".join(profiler.report()),
+  )
+  log.info("Wrote build profile to %s", profiler.write())
+  profiler.stop()
@@ -18,35 +18,142 @@ This module defines custom macros for MkDocs (`schema_fields` and
 `method_fields`) that parse OpenAPI specifications and JSON schema files
 to automatically generate Markdown tables for API request and response
 bodies.
+
+Run as `python -m main render` to expand the macro calls in `docs/` without
+MkDocs (see `ucp_tools.headless`).
 """
 
+import ast
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import difflib
+import functools
+import hashlib
+import inspect
 import json
-import subprocess
+import logging
+import os
 from pathlib import Path
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
 from typing import Any
 
+# mkdocs-macros loads this file by path, so make the sibling tooling package
+# importable regardless of how mkdocs was launched.
+if str(Path(__file__).resolve().parent) not in sys.path:
+  sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ucp_tools.bounded_cache import (  # noqa: E402
+  DEFAULT_MAX_ENTRIES,
+  BoundedCache,
+  get_bounded_cache,
+)
+from ucp_tools.headless import main as headless_main  # noqa: E402
+from ucp_tools.openapi_index import get_operation_index  # noqa: E402
+from ucp_tools.page_cache import PageCache, get_page_cache  # noqa: E402
+from ucp_tools.profiling import (  # noqa: E402
+  DEFAULT_PROFILE_PATH,
+  DEFAULT_TOP_N,
+  PROFILE_FORMATS,
+  get_profiler,
+  profiled,
+)
+from ucp_tools.ref_graph import REF_GRAPH_CACHE, get_ref_graph  # noqa: E402
+from ucp_tools.render_cache import (  # noqa: E402
+  RenderCache,
+  content_hash,
+  get_render_cache,
+)
+from ucp_tools.repository import (  # noqa: E402
+  SchemaRepository,
+  get_repository,
+  source_search_dirs,
+)
+from ucp_tools.resolver import ResolutionError, Resolver  # noqa: E402
+from ucp_tools.schema_cache import ResolutionCache  # noqa: E402
+from ucp_tools.snapshot import (  # noqa: E402
+  SNAPSHOT_MODES,
+  SNAPSHOT_PATH,
+  SchemaSnapshot,
+)
+
+log = logging.getLogger("mkdocs")
+
 # --- CONFIGURATION ---
+# Root of all schema, OpenAPI and OpenRPC sources
+SOURCE_DIR = Path("source")
 # Base directories for schema resolution
 OPENAPI_DIR = Path("source/services/shopping")
 SHOPPING_SCHEMAS_DIR = Path("source/schemas/shopping")
 UCP_SCHEMA_PATH = Path("source/schemas/ucp.json")
-SCHEMAS_DIRS = [
-  Path("source/handlers/google_pay"),
-  Path("source/schemas"),
-  SHOPPING_SCHEMAS_DIR,
-  SHOPPING_SCHEMAS_DIR / "types",
-]
-
-# Cache for resolved schemas to avoid repeated subprocess calls
-_resolved_schema_cache: dict[str, dict] = {}
+# Base directories for name lookups; the same as the hooks' repository uses,
+# so both share one index of source/
+SCHEMAS_DIRS = source_search_dirs(SOURCE_DIR)
+
+# Persistent cache for ucp-schema output, shared across builds
+SCHEMA_CACHE_DIR = Path(".cache/ucp-schema")
+
+# Schema resolution backends (extra.ucp_schema_resolver):
+# - python: in-process resolver (ucp_tools.resolver), no CLI needed
+# - cli: the ucp-schema binary (`cargo install ucp-schema`)
+# - cross-check: run both, log any differences and prefer the CLI output
+RESOLVER_BACKENDS = ("python", "cli", "cross-check")
+# The CLI stays the default until `cross-check` has run cleanly against the
+# real binary; the Python backend is opt-in until then.
+DEFAULT_RESOLVER_BACKEND = "cli"
+
+# Parse-once index of every file under source/, set up by define_env
+_repository: SchemaRepository | None = None
+# Resolved schemas, configured by define_env; survives serve rebuilds and is
+# bounded by extra.ucp_resolved_cache_entries (and ucp_resolved_cache_mb)
+_resolved_schema_cache: BoundedCache | None = None
+# Disk cache, configured by define_env (disabled via extra.ucp_schema_cache)
+_schema_disk_cache: ResolutionCache | None = None
+# Committed ucp-schema output, configured by define_env for the cli and
+# cross-check backends (extra.ucp_schema_snapshot); in 'write' mode every CLI
+# resolution is recorded and saved by on_post_build instead
+_schema_snapshot: SchemaSnapshot | None = None
+_snapshot_writing = False
+# Active resolution backend, configured by define_env
+_resolver_backend = DEFAULT_RESOLVER_BACKEND
+# Whether the ucp-schema binary is on PATH, checked by define_env
+_cli_available = True
+# Variants the cli backend resolved in-process because neither ucp-schema
+# nor a current snapshot entry could serve them
+_python_fallbacks: list[str] = []
+# Number of times the ucp-schema CLI was actually invoked this build
+_cli_calls = 0
+_cli_calls_lock = threading.Lock()
+# Variants whose Python and CLI resolutions differed (cross-check mode)
+_cross_check_mismatches: list[str] = []
+# In-process resolvers by (direction, operation), shared for this build
+_in_process_resolvers: dict[tuple[str, str], Resolver] = {}
+_in_process_resolvers_lock = threading.Lock()
+# Rendered-table memo, configured by define_env; survives serve rebuilds
+_render_cache: RenderCache | None = None
+# Per-page macro output, configured by define_env; survives serve rebuilds
+_page_cache: PageCache | None = None
+# Pages served from _page_cache in this build
+_reused_pages: set[str] = set()
+# (perf_counter, thread_time) at the start of each page's macros, profiling
+_page_started: dict[str, tuple[float, float]] = {}
+
+# Matches `{{ macro_name(args) }}` calls in Markdown pages
+MACRO_CALL_PATTERN = re.compile(r"\{\{\s*(\w+)\((.*?)\)\s*\}\}", re.DOTALL)
 
 
 # --- HELPER FUNCTIONS ---
-# These are thin wrappers; actual schema resolution is done by ucp-schema CLI.
+# These are thin wrappers; actual schema resolution is done by the configured
+# backend (in-process resolver or ucp-schema CLI).
 
 
 def _load_json(path: str | Path) -> dict[str, Any] | None:
   """Load JSON file, returns None on error."""
+  if _repository is not None:
+    return _repository.get(path)
   try:
     with Path(path).open(encoding="utf-8") as f:
       return json.load(f)
@@ -54,6 +161,21 @@ def _load_json(path: str | Path) -> dict[str, Any] | None:
     return None
 
 
+def _spec_path(file_name: str) -> Path:
+  """Return the spec file named in a `method_fields` or `header_fields` call.
+
+  A bare file name (e.g. "rest.openapi.json") is in `OPENAPI_DIR`; a path is
+  relative to `SOURCE_DIR` (e.g. "handlers/tokenization/openapi.json"), with
+  or without the leading "source/".
+  """
+  path = Path(file_name)
+  if len(path.parts) == 1:
+    return OPENAPI_DIR / path
+  if path.is_absolute() or path.parts[0] == SOURCE_DIR.name:
+    return path
+  return SOURCE_DIR / path
+
+
 def _resolve_json_pointer(pointer: str, data: Any) -> Any | None:
   """Navigate to a JSON pointer path (e.g., '#/$defs/foo' or '#/components/x').
 
@@ -90,8 +212,12 @@ def _resolve_schema(
   direction: str = "response",
   operation: str = "read",
   bundle: bool = False,
+  pointer: str | None = None,
 ) -> dict[str, Any] | None:
-  """Resolve a schema using ucp-schema CLI.
+  """Resolve a schema's ucp_request/ucp_response annotations.
+
+  Uses the backend selected by `extra.ucp_schema_resolver` (see
+  RESOLVER_BACKENDS).
 
   Args:
     schema_path: Path to the schema file.
@@ -99,44 +225,209 @@ def _resolve_schema(
     operation: 'create', 'update', 'complete', or 'read'.
     bundle: If True, inline all $ref pointers. If False, preserve $refs for
       hyperlink generation in documentation.
+    pointer: Optional. A '#/...' JSON pointer; only that sub-schema (and,
+      when bundling, the refs it reaches) is resolved and returned.
 
   Returns:
     Resolved schema as dict, or None if resolution fails.
 
   """
+  _record_ref_closure(schema_path)
   bundle_suffix = ":bundled" if bundle else ""
   cache_key = f"{schema_path}:{direction}:{operation}{bundle_suffix}"
-  if cache_key in _resolved_schema_cache:
-    return _resolved_schema_cache[cache_key]
+  if pointer:
+    cache_key += pointer
+  cache = _resolved_schema_cache
+  with get_profiler().span("resolve:memory cache miss", "resolve") as span:
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+      span.name = "resolve:memory cache hit"
+  if cached is not None:
+    return cached
+
+  if pointer and _resolver_backend != "python":
+    # The CLI resolves whole files; every pointer into the file shares that
+    # one (cached) resolution.
+    whole = _resolve_schema(schema_path, direction, operation, bundle)
+    data = _resolve_json_pointer(pointer, whole) if whole else None
+  elif _resolver_backend == "cli":
+    data = _resolve_with_cli(schema_path, direction, operation, bundle)
+    if data is None and not _cli_available and not _snapshot_writing:
+      # Render the Python resolver's tables rather than an error message.
+      data = _resolve_in_process(schema_path, direction, operation, bundle)
+      _python_fallbacks.append(
+        f"{schema_path} {direction}/{operation}"
+        + (" (bundled)" if bundle else "")
+      )
+  elif _resolver_backend == "cross-check":
+    data = _resolve_cross_checked(schema_path, direction, operation, bundle)
+  else:
+    data = _resolve_in_process(
+      schema_path, direction, operation, bundle, pointer
+    )
 
+  if data is not None and cache is not None:
+    cache.put(cache_key, data, _ref_closure(schema_path))
+  return data
+
+
+def _ref_closure(schema_path: str | Path) -> list[Path]:
+  """Return a schema file and every file it refs, directly or not."""
+  source_dir = SOURCE_DIR.resolve()
+  path = Path(schema_path).resolve()
+  closure = ()
+  if _repository is not None and path.is_relative_to(source_dir):
+    graph = get_ref_graph(_repository, SOURCE_DIR, REF_GRAPH_CACHE)
+    closure = graph.file_closure(path.relative_to(source_dir).as_posix())
+  return [path, *((source_dir / p).resolve() for p in closure)]
+
+
+def _record_ref_closure(schema_path: str | Path) -> None:
+  """Record a schema and every file it refs as read by the current page.
+
+  A resolution depends on its whole `$ref` closure, but a cached one reads
+  nothing through the repository, so the closure comes from the ref graph.
+  """
+  recorder = _repository.recorder if _repository is not None else None
+  if recorder is not None and recorder.active:
+    recorder.record(_ref_closure(schema_path))
+
+
+def _in_process_resolver(direction: str, operation: str) -> Resolver:
+  """Return this build's shared resolver for a direction and operation.
+
+  Sharing it means each file is annotated once per variant, however many
+  of its definitions are resolved.
+  """
+  with _in_process_resolvers_lock:
+    resolver = _in_process_resolvers.get((direction, operation))
+    if resolver is None:
+      loader = _repository.load if _repository is not None else None
+      resolver = _in_process_resolvers[(direction, operation)] = Resolver(
+        direction, operation, loader
+      )
+    return resolver
+
+
+@profiled("resolve:python resolver", "resolve")
+def _resolve_in_process(
+  schema_path: str | Path,
+  direction: str,
+  operation: str,
+  bundle: bool,
+  pointer: str | None = None,
+) -> dict[str, Any] | None:
+  """Resolve a schema with the in-process Python resolver."""
+  resolver = _in_process_resolver(direction, operation)
+  try:
+    if pointer:
+      return resolver.resolve_pointer(schema_path, pointer[1:], bundle)
+    return resolver.resolve(schema_path, bundle=bundle)
+  except (ResolutionError, OSError, ValueError) as e:
+    log.warning(
+      f"Failed to resolve {schema_path} ({direction}/{operation}): {e}"
+    )
+    return None
+
+
+def _resolve_with_cli(
+  schema_path: str | Path, direction: str, operation: str, bundle: bool
+) -> dict[str, Any] | None:
+  """Resolve a schema using the ucp-schema CLI, through the snapshot."""
   dir_flag = "--request" if direction == "request" else "--response"
-  cmd = [
-    "ucp-schema",
-    "resolve",
-    str(schema_path),
-    dir_flag,
-    "--op",
-    operation,
-  ]
+  flags = [dir_flag, "--op", operation]
   if bundle:
-    cmd.append("--bundle")
+    flags.append("--bundle")
+
+  snapshot = _schema_snapshot
+  if snapshot is not None and not _snapshot_writing:
+    with get_profiler().span("resolve:snapshot miss", "resolve") as span:
+      data = snapshot.get(schema_path, flags)
+      if data is not None:
+        span.name = "resolve:snapshot hit"
+    if data is not None:
+      return data
 
+  data = _run_cli(schema_path, flags)
+  if data is not None and snapshot is not None and _snapshot_writing:
+    snapshot.put(schema_path, flags, data)
+  return data
+
+
+def _run_cli(schema_path: str | Path, flags: list[str]) -> Any | None:
+  """Run `ucp-schema resolve` with `flags`, through the disk cache."""
+  global _cli_calls
+
+  disk_key = None
+  if _schema_disk_cache is not None:
+    with get_profiler().span("resolve:disk cache miss", "resolve") as span:
+      disk_key = _schema_disk_cache.key(schema_path, flags)
+      data = _schema_disk_cache.get(disk_key) if disk_key else None
+      if data is not None:
+        span.name = "resolve:disk cache hit"
+    if data is not None:
+      return data
+
+  if not _cli_available:
+    return None
+  cmd = ["ucp-schema", "resolve", str(schema_path), *flags]
   try:
-    result = subprocess.run(
-      cmd,
-      capture_output=True,
-      text=True,
-      check=False,
-    )
+    with _cli_calls_lock:
+      _cli_calls += 1
+    with get_profiler().span("resolve:ucp-schema subprocess", "resolve"):
+      result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        check=False,
+      )
     if result.returncode == 0:
       data = json.loads(result.stdout)
-      _resolved_schema_cache[cache_key] = data
+      if disk_key is not None:
+        _schema_disk_cache.put(disk_key, data)
       return data
   except (subprocess.SubprocessError, json.JSONDecodeError, FileNotFoundError):
     pass
   return None
 
 
+def _resolve_cross_checked(
+  schema_path: str | Path, direction: str, operation: str, bundle: bool
+) -> dict[str, Any] | None:
+  """Resolve with both backends and log a diff when they disagree."""
+  from_cli = _resolve_with_cli(schema_path, direction, operation, bundle)
+  from_python = _resolve_in_process(schema_path, direction, operation, bundle)
+  if from_cli is None:
+    log.warning(f"Cross-check: ucp-schema could not resolve {schema_path}")
+    return from_python
+  if from_cli != from_python:
+    variant = f"{schema_path} {direction}/{operation}" + (
+      " (bundled)" if bundle else ""
+    )
+    _cross_check_mismatches.append(variant)
+    diff = difflib.unified_diff(
+      json.dumps(from_cli, indent=2, sort_keys=True).splitlines(),
+      json.dumps(from_python, indent=2, sort_keys=True).splitlines(),
+      fromfile="ucp-schema",
+      tofile="python",
+      lineterm="",
+    )
+    log.warning(f"Cross-check mismatch for {variant}:\n" + "\n".join(diff))
+  return from_cli
+
+
+def _resolution_hint() -> str:
+  """Return the remediation hint for a failed resolution."""
+  if _resolver_backend == "python":
+    return "See the build log for details."
+  if _schema_snapshot is not None and _schema_snapshot.stale:
+    return (
+      f"The {_schema_snapshot.path} entry is stale; install ucp-schema "
+      "(`cargo install ucp-schema`) and run `python -m main snapshot`"
+    )
+  return "Ensure ucp-schema is installed: `cargo install ucp-schema`"
+
+
 # Backward compatibility alias
 def _resolve_schema_bundled(
   schema_path: str | Path,
@@ -147,6 +438,60 @@ def _resolve_schema_bundled(
   return _resolve_schema(schema_path, direction, operation, bundle=True)
 
 
+def _split_entity_variant(entity_name: str) -> tuple[str, str, str]:
+  """Split a `schema_fields` entity name into (base, direction, operation).
+
+  - 'cart_resp' -> ('cart', 'response', 'read')
+  - 'cart_create_req' -> ('cart', 'request', 'create')
+  - 'buyer' -> ('buyer', 'response', 'read')
+  """
+  if entity_name.endswith("_resp"):
+    return entity_name[:-5], "response", "read"
+  if entity_name.endswith("_req"):
+    # Pattern: entity_op_req (e.g., cart_create_req)
+    parts = entity_name[:-4].rsplit("_", 1)  # Strip _req, split on last _
+    if len(parts) == 2 and parts[1] in (
+      "create",
+      "update",
+      "complete",
+      "read",
+    ):
+      return parts[0], "request", parts[1]
+    return entity_name[:-4], "request", "read"
+  return entity_name, "response", "read"
+
+
+def _parse_macro_call(match: re.Match) -> tuple[list, dict] | None:
+  """Return the (args, kwargs) of a `MACRO_CALL_PATTERN` match.
+
+  None unless every argument is a literal; anything else (variables,
+  expressions) is left to the regular page render.
+  """
+  try:
+    call = ast.parse(f"f({match.group(2)})", mode="eval").body
+    args = [ast.literal_eval(arg) for arg in call.args]
+    kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in call.keywords}
+  except (SyntaxError, ValueError):
+    return None
+  return args, kwargs
+
+
+def _scan_macro_calls(docs_dir: str | Path):
+  """Yield (page, macro name, args, kwargs) for macro calls in Markdown pages.
+
+  Only calls whose arguments are all literals are reported.
+  """
+  for page in sorted(Path(docs_dir).rglob("*.md")):
+    try:
+      text = page.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+      continue
+    for match in MACRO_CALL_PATTERN.finditer(text):
+      parsed = _parse_macro_call(match)
+      if parsed is not None:
+        yield page, match.group(1), *parsed
+
+
 def define_env(env):
   """Injects custom macros into the MkDocs environment.
 
@@ -159,28 +504,151 @@ def define_env(env):
     env: The MkDocs environment object.
 
   """
-  # Use module-level constants for paths
-  schemas_dirs = SCHEMAS_DIRS
+  global _repository, _schema_disk_cache, _resolver_backend
+  global _render_cache, _page_cache, _resolved_schema_cache
+  global _schema_snapshot, _snapshot_writing, _cli_available
+
+  # Opt-in timing report; written by the post-build hook at the very end.
+  profile = env.variables.get("ucp_profile")
+  if profile:
+    profile_format = env.variables.get("ucp_profile_format", "json")
+    if profile_format not in PROFILE_FORMATS:
+      log.warning(
+        f"Unknown ucp_profile_format '{profile_format}', expected one of "
+        f"{', '.join(PROFILE_FORMATS)}; using 'json'"
+      )
+      profile_format = "json"
+    get_profiler().start(
+      profile if isinstance(profile, str) else DEFAULT_PROFILE_PATH,
+      profile_format,
+      int(env.variables.get("ucp_profile_top", DEFAULT_TOP_N)),
+    )
+  else:
+    get_profiler().stop()
+
+  # Parse every source file once; later builds in the same process (mkdocs
+  # serve) only reparse files whose mtime changed.
+  repository = _repository = get_repository(SOURCE_DIR, SCHEMAS_DIRS)
+
+  backend = env.variables.get("ucp_schema_resolver", DEFAULT_RESOLVER_BACKEND)
+  if backend not in RESOLVER_BACKENDS:
+    log.warning(
+      f"Unknown ucp_schema_resolver '{backend}', expected one of "
+      f"{', '.join(RESOLVER_BACKENDS)}; using '{DEFAULT_RESOLVER_BACKEND}'"
+    )
+    backend = DEFAULT_RESOLVER_BACKEND
+  _resolver_backend = backend
+  _cli_available = shutil.which("ucp-schema") is not None
+  # Without the CLI, the cli backend falls back to the Python resolver, so
+  # its cached resolutions and tables must not be mixed with the CLI's.
+  cache_backend = backend if _cli_available else f"{backend}:no-cli"
+
+  # Built here, before the prefetch threads need it.
+  ref_graph = get_ref_graph(repository, SOURCE_DIR, REF_GRAPH_CACHE)
+  # Resolved schemas are kept across serve rebuilds until a file behind them
+  # changes (or they are evicted). Bounding by size is opt-in, since it
+  # means JSON-encoding every resolved schema to measure it.
+  max_mb = env.variables.get("ucp_resolved_cache_mb")
+  _resolved_schema_cache = get_bounded_cache(
+    repository,
+    ("resolved", cache_backend),
+    max_entries=env.variables.get(
+      "ucp_resolved_cache_entries", DEFAULT_MAX_ENTRIES
+    ),
+    max_bytes=int(max_mb * 1024 * 1024) if max_mb is not None else None,
+  )
+
+  if env.variables.get("ucp_schema_cache", True):
+    _schema_disk_cache = ResolutionCache(
+      SCHEMA_CACHE_DIR, repository=repository
+    )
+  else:
+    _schema_disk_cache = None
+
+  # The snapshot stands in for the CLI; the Python backend never needs it.
+  snapshot_mode = env.variables.get("ucp_schema_snapshot", "read")
+  if snapshot_mode and snapshot_mode not in SNAPSHOT_MODES:
+    log.warning(
+      f"Unknown ucp_schema_snapshot '{snapshot_mode}', expected one of "
+      f"{', '.join(SNAPSHOT_MODES)} or false; using 'read'"
+    )
+    snapshot_mode = "read"
+  _snapshot_writing = snapshot_mode == "write"
+  if backend == "python" or not snapshot_mode:
+    _schema_snapshot = None
+  elif _snapshot_writing:
+    _schema_snapshot = SchemaSnapshot(
+      SNAPSHOT_PATH, repository, SOURCE_DIR, ref_graph
+    )
+  else:
+    # Output of a different ucp-schema than the installed one is not served.
+    version_source = _schema_disk_cache or ResolutionCache(SCHEMA_CACHE_DIR)
+    _schema_snapshot = SchemaSnapshot.load(
+      SNAPSHOT_PATH,
+      repository,
+      SOURCE_DIR,
+      ref_graph,
+      version_source.tool_version,
+    )
+
+  # Tables also depend on the backend and on this file's rendering code.
+  main_digest = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+  render_cache = _render_cache = get_render_cache(
+    repository, (cache_backend, main_digest)
+  )
+  # Pages additionally depend on mkdocs.yml (extra variables, theme).
+  config_file = env.conf.get("config_file_path")
+  config_digest = (
+    hashlib.sha256(Path(config_file).read_bytes()).hexdigest()
+    if config_file
+    else None
+  )
+  page_cache = _page_cache = get_page_cache(
+    repository, (cache_backend, main_digest, config_digest)
+  )
+  repository.recorder = page_cache.recorder
+
+  def _memoized_table(render):
+    """Serve a table renderer's output from the render cache.
+
+    The key covers every argument: the schema (by content hash), the spec
+    file name, the header flag, the parent required list and the context's
+    io_type / operation_id.
+    """
+    signature = inspect.signature(render)
+
+    @functools.wraps(render)
+    def wrapper(*args, **kwargs):
+      bound = signature.bind(*args, **kwargs)
+      bound.apply_defaults()
+      arguments = dict(bound.arguments)
+      context = arguments.get("context")
+      if context:
+        arguments["context"] = [
+          context.get("io_type"),
+          context.get("operation_id"),
+        ]
+      key = (render.__name__, content_hash(arguments))
+      return render_cache.get_or_render(key, lambda: render(*args, **kwargs))
+
+    return wrapper
+
+  def _find_schema_file(file_name):
+    """Return the first configured directory's path to `file_name`."""
+    return repository.find(file_name)
 
   def _resolve_with_ucp_schema(schema_path, direction, operation):
-    """Resolve a schema using ucp-schema CLI (delegates to module-level fn)."""
+    """Resolve a schema variant (delegates to module-level fn)."""
     return _resolve_schema(schema_path, direction, operation, bundle=False)
 
   def _load_json_file(entity_name):
     """Try loading a JSON file from the configured directories."""
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / (entity_name + ".json")
-      try:
-        with full_path.open(encoding="utf-8") as f:
-          return json.load(f)
-      except FileNotFoundError:
-        continue
-    return None
+    return repository.load_by_name(entity_name)
 
   def _load_schema_variant(entity_name, context):
     """Load and resolve a schema for a specific operation.
 
-    Uses ucp-schema to resolve annotations at runtime based on context.
+    Resolves ucp_request/ucp_response annotations at runtime based on context.
 
     Args:
     ----
@@ -192,22 +660,34 @@ def define_env(env):
       The resolved schema data as a dictionary, or None if not found.
 
     """
-    if not context:
+    target = _variant_target(entity_name, context)
+    if not target:
       return _load_json_file(entity_name)
 
+    # Resolve annotations (no fallback - fail loudly if unavailable)
+    resolved = _resolve_with_ucp_schema(*target)
+    if resolved:
+      return resolved
+
+    # ucp-schema failed - don't silently fall back to raw JSON with annotations
+    return None
+
+  def _variant_target(entity_name, context):
+    """Return the ucp-schema (path, direction, operation) for a variant.
+
+    Returns None when there is no context or no schema file, in which case
+    the raw JSON is used instead.
+    """
+    if not context:
+      return None
+
     io_type = context.get("io_type")
     op_id = context.get("operation_id", "").lower()
 
     # Find the schema file
-    schema_path = None
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / (entity_name + ".json")
-      if full_path.exists():
-        schema_path = str(full_path)
-        break
-
+    schema_path = _find_schema_file(entity_name + ".json")
     if not schema_path:
-      return _load_json_file(entity_name)
+      return None
 
     # Determine direction and operation for ucp-schema
     direction = io_type  # "request" or "response"
@@ -223,16 +703,10 @@ def define_env(env):
     elif io_type == "response":
       operation = "read"
 
-    # Resolve using ucp-schema (no fallback - fail loudly if unavailable)
-    resolved = _resolve_with_ucp_schema(schema_path, direction, operation)
-    if resolved:
-      return resolved
+    return str(schema_path), direction, operation
 
-    # ucp-schema failed - don't silently fall back to raw JSON with annotations
-    return None
-
-  # Cache for polymorphic type detection
-  _polymorphic_cache: dict[str, bool] = {}
+  # Cache for polymorphic type detection, checked against the schema file
+  polymorphic_cache = get_bounded_cache(repository, ("polymorphic",))
 
   def _is_polymorphic_type(ref_string: str) -> bool:
     """Check if a schema file is polymorphic (has ucp_request annotations).
@@ -240,34 +714,34 @@ def define_env(env):
     Polymorphic types have different request/response variants and require
     the -response suffix in anchors to match markdown headings.
     """
-    if ref_string in _polymorphic_cache:
-      return _polymorphic_cache[ref_string]
-
     # Only check types/ refs
     if "types/" not in ref_string:
-      _polymorphic_cache[ref_string] = False
       return False
 
+    cached = polymorphic_cache.get(ref_string)
+    if cached is not None:
+      return cached
+
     # Find and load the schema file
     # ref_string is like "types/line_item.json", extract just the filename
     filename = Path(ref_string).name.replace(".json", "")
-    # _load_json_file searches in SCHEMAS_DIRS which already includes the
-    # types directory, so we just pass the filename
-    schema_data = _load_json_file(filename)
+    # SCHEMAS_DIRS already includes the types directory, so we just pass the
+    # filename
+    schema_file = _find_schema_file(filename)
+    schema_data = _load_json(schema_file) if schema_file else None
     if not schema_data:
-      _polymorphic_cache[ref_string] = False
       return False
 
     # Check if any property has ucp_request annotation
     properties = schema_data.get("properties", {})
-    for prop_details in properties.values():
-      if isinstance(prop_details, dict) and "ucp_request" in prop_details:
-        _polymorphic_cache[ref_string] = True
-        return True
-
-    _polymorphic_cache[ref_string] = False
-    return False
+    polymorphic = any(
+      isinstance(prop_details, dict) and "ucp_request" in prop_details
+      for prop_details in properties.values()
+    )
+    polymorphic_cache.put(ref_string, polymorphic, [schema_file])
+    return polymorphic
 
+  @profiled(category="render")
   def create_link(ref_string, spec_file_name, context=None):
     """Transform schema paths into Markdown links.
 
@@ -358,6 +832,7 @@ def define_env(env):
     base = f"site:specification/{spec_file_name}/#"
     return f"[{link_text}]({base}{anchor_name.lower()})"
 
+  @_memoized_table
   def _render_table_from_ref(
     properties_ref, required_list, spec_file_name, context=None
   ):
@@ -407,10 +882,10 @@ def define_env(env):
       # If purely external and not found locally
       if properties_ref.startswith("http"):
         return f"_See [{properties_ref}]({properties_ref})_"
-      # ucp-schema failed or schema not found - fail loudly
+      # Resolution failed or schema not found - fail loudly
       return (
         f"**Error:** Failed to resolve '{ref_entity_name}'. "
-        f"Ensure ucp-schema is installed: `cargo install ucp-schema`"
+        f"{_resolution_hint()}"
       )
 
   def _render_embedded_table(
@@ -466,6 +941,8 @@ def define_env(env):
 
     return "\n".join(md)
 
+  @profiled(category="render")
+  @_memoized_table
   def _render_table_from_schema(
     schema_data,
     spec_file_name,
@@ -598,9 +1075,8 @@ def define_env(env):
         version_data = None
         if ref and ref.endswith("#/$defs/version"):
           try:
-            with UCP_SCHEMA_PATH.open(encoding="utf-8") as f:
-              data = json.load(f)
-              version_data = data.get("$defs", {}).get("version", {})
+            data = repository.load(UCP_SCHEMA_PATH)
+            version_data = data.get("$defs", {}).get("version", {})
           except json.JSONDecodeError as e:
             print(f"**Error loading schema {'ucp.json' + ref}':** {e}")
 
@@ -670,6 +1146,7 @@ def define_env(env):
 
     return "\n".join(md)
 
+  @_memoized_table
   def _read_schema_from_defs(
     entity_name, spec_file_name, need_header=True, parent_required_list=None
   ):
@@ -687,27 +1164,21 @@ def define_env(env):
     except ValueError:
       return f"**Error:** Malformed entity name: {entity_name}"
 
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / core_entity_name
-      if not full_path.exists():
-        continue
-      # Use ucp-schema to resolve the full file with bundling
-      bundled = _resolve_schema_bundled(full_path)
-      if bundled:
-        # Extract the $def from the bundled result
-        embedded_schema_data = _resolve_json_pointer(def_path, bundled)
-        if embedded_schema_data is not None:
-          return _render_table_from_schema(
-            embedded_schema_data,
-            spec_file_name,
-            need_header,
-            parent_required_list,
-          )
-        else:
-          return (
-            f"**Error:** Definition '{def_path}' not found in '{full_path}'"
-          )
-      # Try next directory if resolution failed
+    full_path = _find_schema_file(core_entity_name)
+    if full_path:
+      if _resolve_json_pointer(def_path, _load_json(full_path)) is None:
+        return f"**Error:** Definition '{def_path}' not found in '{full_path}'"
+      # Resolve and bundle only this definition and the refs it reaches
+      embedded_schema_data = _resolve_schema(
+        full_path, "response", "read", bundle=True, pointer=def_path
+      )
+      if embedded_schema_data is not None:
+        return _render_table_from_schema(
+          embedded_schema_data,
+          spec_file_name,
+          need_header,
+          parent_required_list,
+        )
 
     return (
       f"**Error:** Schema file '{core_entity_name}' not found in any schema"
@@ -716,6 +1187,7 @@ def define_env(env):
 
   # --- MACRO 1: For Standalone JSON Schemas ---
   @env.macro
+  @profiled(category="macro")
   def schema_fields(entity_name, spec_file_name):
     """Parse a standalone JSON Schema file and render a table.
 
@@ -733,35 +1205,13 @@ def define_env(env):
 
     """
     # Parse suffix to determine resolution direction/operation
-    direction = "response"
-    operation = "read"
-    base_name = entity_name
-
-    if entity_name.endswith("_resp"):
-      base_name = entity_name[:-5]  # Strip _resp
-      direction = "response"
-    elif entity_name.endswith("_req"):
-      # Pattern: entity_op_req (e.g., cart_create_req)
-      parts = entity_name[:-4].rsplit("_", 1)  # Strip _req, split on last _
-      if len(parts) == 2 and parts[1] in (
-        "create",
-        "update",
-        "complete",
-        "read",
-      ):
-        base_name, operation = parts
-        direction = "request"
-      else:
-        base_name = entity_name[:-4]
-        direction = "request"
+    base_name, direction, operation = _split_entity_variant(entity_name)
 
     # Build context for downstream link generation
     context = {"io_type": direction, "operation_id": operation}
 
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / (base_name + ".json")
-      if not full_path.exists():
-        continue
+    full_path = _find_schema_file(base_name + ".json")
+    if full_path:
       # Resolve WITHOUT bundling to preserve $refs for hyperlinks
       resolved_schema = _resolve_schema(
         full_path, direction, operation, bundle=False
@@ -770,15 +1220,16 @@ def define_env(env):
         return _render_table_from_schema(
           resolved_schema, spec_file_name, context=context
         )
-      # ucp-schema failed - fail loudly, don't silently use raw JSON
+      # Resolution failed - fail loudly, don't silently use raw JSON
       return (
-        f"**Error:** Failed to resolve schema '{full_path}' with ucp-schema. "
-        f"Ensure ucp-schema is installed: `cargo install ucp-schema`"
+        f"**Error:** Failed to resolve schema '{full_path}'. "
+        f"{_resolution_hint()}"
       )
 
     return f"**Error:** Schema '{base_name}' not found in any schema directory."
 
   @env.macro
+  @profiled(category="macro")
   def extension_schema_fields(entity_name, spec_file_name):
     """Parse a standalone JSON Schema file and render a table.
 
@@ -795,6 +1246,7 @@ def define_env(env):
     return _read_schema_from_defs(entity_name, spec_file_name)
 
   @env.macro
+  @profiled(category="macro")
   def auto_generate_schema_reference(
     sub_dir=".",
     spec_file_name="reference",
@@ -917,6 +1369,7 @@ def define_env(env):
 
   # --- MACRO 2: For Standalone JSON Extensions ---
   @env.macro
+  @profiled(category="macro")
   def extension_fields(entity_name, spec_file_name):
     """Parse an extension schema file and render a table from its $defs.
 
@@ -932,8 +1385,7 @@ def define_env(env):
     # Construct full path based on new structure
     full_path = SHOPPING_SCHEMAS_DIR / (entity_name + ".json")
     try:
-      with full_path.open(encoding="utf-8") as f:
-        data = json.load(f)
+      data = repository.load(full_path)
 
       # Extension schemas have their composed type in $defs.checkout
       # or $defs.order_line_item.
@@ -954,105 +1406,35 @@ def define_env(env):
 
   # --- MACRO 3: For Transport Operations ---
   @env.macro
+  @profiled(category="macro")
   def method_fields(operation_id, file_name, spec_file_name, io_type=None):
     """Extract Request/Response schemas for a specific OpenAPI operationId.
 
     Args:
     ----
       operation_id: The `operationId` of the OpenAPI operation to document.
-      file_name: The name of the OpenAPI file to read.
+      file_name: The OpenAPI or OpenRPC file to read: a name in
+        `OPENAPI_DIR` or a path under `SOURCE_DIR`.
       spec_file_name: The name of the spec file indicating where the dictionary
         should be rendered (e.g., "checkout", "fulfillment").
       io_type: Optional. Specifies whether to render 'request', 'response', or
         both (if None).
 
     """
-    full_path = OPENAPI_DIR / file_name
+    full_path = _spec_path(file_name)
 
     try:
-      with full_path.open(encoding="utf-8") as f:
-        data = json.load(f)
-
-      # 1. Find the Operation Object by ID (search paths first, then webhooks)
-      operation = None
-      path_parameters = []
-
-      # Search in paths
-      paths = data.get("paths", {})
-      for _, path_item in paths.items():
-        for _, op_data in path_item.items():
-          if not isinstance(op_data, dict):
-            continue
-          if op_data.get("operationId") == operation_id:
-            operation = op_data
-            path_parameters = path_item.get("parameters", [])
-            break
-        if operation:
-          break
-
-      # If not found in paths, search in webhooks (OpenAPI 3.1+)
-      if not operation:
-        webhooks = data.get("webhooks", {})
-        for _, webhook_item in webhooks.items():
-          for _, op_data in webhook_item.items():
-            if not isinstance(op_data, dict):
-              continue
-            if op_data.get("operationId") == operation_id:
-              operation = op_data
-              break
-          if operation:
-            break
-
-      if not operation:
+      # 1. Find the Operation by ID (paths first, then webhooks; or an
+      # OpenRPC method name)
+      entry = get_operation_index(repository, full_path).get(operation_id)
+      if not entry:
         return f"**Error:** Operation ID `{operation_id}` not found."
 
-      # 2. Extract Request Schema
-      req_content = operation.get("requestBody", {}).get("content", {})
-      req_schema = req_content.get("application/json", {}).get("schema", {})
-
-      # 3. Extract Parameters (Path + Operation)
-      op_parameters = operation.get("parameters", [])
-      all_parameters = path_parameters + op_parameters
-
-      # 4. Extract Response Schema
-      success_response_codes = ["200", "201"]
-      res_schema = {}
-      res = operation.get("responses", {})
-      for code in success_response_codes:
-        if code in res:
-          res_content = res.get(code, {}).get("content", {})
-          res_schema = res_content.get("application/json", {}).get("schema", {})
-          break
-
-      # --- FIX: Targeted Reference Resolution ---
-      # We only resolve the top-level ref and 'allOf' children.
-      # This fixes the "Complete Checkout" table without expanding every
-      # property.
-
-      def resolve_structure(schema, root):
-        if not schema:
-          return schema
-        # 1. Resolve Top-Level Ref (e.g. "create_checkout")
-        if "$ref" in schema and schema["$ref"].startswith("#/"):
-          resolved = _resolve_json_pointer(schema["$ref"], root)
-          if resolved:
-            schema = resolved
-
-        # 2. Resolve Composition Refs (e.g. "complete_checkout" response)
-        if "allOf" in schema:
-          new_all_of = []
-          for item in schema["allOf"]:
-            if "$ref" in item and item["$ref"].startswith("#/"):
-              resolved = _resolve_json_pointer(item["$ref"], root)
-              new_all_of.append(resolved if resolved else item)
-            else:
-              new_all_of.append(item)
-          schema["allOf"] = new_all_of
-        return schema
-
-      req_schema = resolve_structure(req_schema, data)
-      res_schema = resolve_structure(res_schema, data)
-      # ------------------------------------------
+      # 2. Parameters (Path + Operation) and Request/Response Schemas come
+      # pre-resolved from the index.
+      all_parameters = entry.parameters
+      req_schema = entry.request_schema
+      res_schema = entry.response_schema
 
       output = ""
 
@@ -1063,13 +1445,6 @@ def define_env(env):
         param_props = {}
         param_required_fields = []
         for param in all_parameters:
-          # Resolve param refs explicitly if needed (rare for params but good
-          # safety)
-          if "$ref" in param and param["$ref"].startswith("#/"):
-            resolved = _resolve_json_pointer(param["$ref"], data)
-            if resolved:
-              param = resolved
-
           # Filter out headers (transport-specific)
           if param.get("in") == "header":
             continue
@@ -1143,78 +1518,30 @@ def define_env(env):
 
   # --- MACRO 4: For HTTP Headers ---
   @env.macro
+  @profiled(category="macro")
   def header_fields(operation_id, file_name):
     """Extract HTTP headers for a specific OpenAPI operationId.
 
     Args:
     ----
       operation_id: The `operationId` of the OpenAPI operation.
-      file_name: The name of the OpenAPI file to read.
+      file_name: The OpenAPI or OpenRPC file to read: a name in
+        `OPENAPI_DIR` or a path under `SOURCE_DIR`.
 
     """
-    full_path = OPENAPI_DIR / file_name
+    full_path = _spec_path(file_name)
 
     try:
-      with full_path.open(encoding="utf-8") as f:
-        data = json.load(f)
-
-      # 1. Find the Operation Object by ID
-      operation = None
-      path_parameters = []
-      paths = data.get("paths", {})
-      for _, path_item in paths.items():
-        for _, op_data in path_item.items():
-          if not isinstance(op_data, dict):
-            continue
-
-          if op_data.get("operationId") == operation_id:
-            operation = op_data
-            # Extract parameters defined at the path level
-            path_parameters = path_item.get("parameters", [])
-            break
-        if operation:
-          break
-
-      if not operation:
+      # 1. Find the Operation by ID (HTTP paths only; webhooks carry no
+      # request headers to document)
+      entry = get_operation_index(repository, full_path).get(operation_id)
+      if not entry or entry.is_webhook:
         return f"**Error:** Operation ID `{operation_id}` not found."
 
-      # 2. Extract Request Parameters (Path + Operation)
-      op_parameters = operation.get("parameters", [])
-      all_parameters = path_parameters + op_parameters
-
-      req_headers = []
-      for param in all_parameters:
-        # Resolve reference if needed
-        if "$ref" in param:
-          resolved = _resolve_json_pointer(param["$ref"], data)
-          if resolved:
-            param = resolved
-          else:
-            continue
-
-        if param.get("in") == "header":
-          req_headers.append(param)
-
-      # 3. Extract Response Headers (Assumes 200 OK)
-      res_headers_defs = (
-        operation.get("responses", {}).get("200", {}).get("headers", {})
-      )
-      res_headers = []
-      for name, header in res_headers_defs.items():
-        if "$ref" in header:
-          resolved = _resolve_json_pointer(header["$ref"], data)
-          if resolved:
-            h = resolved.copy()
-            h["name"] = name
-            res_headers.append(h)
-          else:
-            # If ref not resolved, just use name
-            h = {"name": name, "description": "Ref not resolved"}
-            res_headers.append(h)
-        else:
-          h = header.copy()
-          h["name"] = name
-          res_headers.append(h)
+      # 2. Request Headers (Path + Operation parameters) and Response Headers
+      # (200 OK) come pre-resolved from the index.
+      req_headers = entry.header_parameters
+      res_headers = list(entry.response_headers)
 
       if not req_headers and not res_headers:
         return "_No headers defined._"
@@ -1246,3 +1573,291 @@ def define_env(env):
 
     except (FileNotFoundError, json.JSONDecodeError) as e:
       return f"**Error processing OpenAPI:** {e}"
+
+  # --- PREFETCH: Resolve every schema variant before pages render ---
+
+  def _composed_refs(schema):
+    """Yield the $refs that _render_table_from_schema expands inline."""
+    if not isinstance(schema, dict):
+      return
+    properties = schema.get("properties", {})
+    if "allOf" in properties:
+      items = properties["allOf"]
+    elif "allOf" in schema:
+      items = schema["allOf"]
+    elif "$ref" in schema:
+      yield schema["$ref"]
+      return
+    else:
+      if isinstance(properties.get("$ref"), str):
+        yield properties["$ref"]
+      return
+    for item in items:
+      if isinstance(item, dict) and len(item) == 1 and "$ref" in item:
+        yield item["$ref"]
+      else:
+        yield from _composed_refs(item)
+
+  def _follow_up_targets(schema, context):
+    """Yield (target, context) for variants rendering `schema` will load."""
+    for ref in _composed_refs(schema):
+      if not isinstance(ref, str):
+        continue
+      ref_clean = ref.split("#")[0]
+      if ref_clean.endswith("/schema"):
+        ref_clean = ref_clean.replace("/schema", "")
+      target = _variant_target(Path(ref_clean).stem, context)
+      if target:
+        yield (*target, False), context
+
+  def _plan_macro_call(name, args, kwargs):
+    """Yield (target, context) pairs a literal macro call will resolve."""
+    macro = {
+      "schema_fields": schema_fields,
+      "extension_schema_fields": extension_schema_fields,
+      "auto_generate_schema_reference": auto_generate_schema_reference,
+      "method_fields": method_fields,
+    }.get(name)
+    if macro is None:
+      return
+    try:
+      call = inspect.signature(macro).bind(*args, **kwargs)
+    except TypeError:
+      return
+    call.apply_defaults()
+    params = call.arguments
+
+    if name == "schema_fields":
+      base_name, direction, operation = _split_entity_variant(
+        params["entity_name"]
+      )
+      schema_path = _find_schema_file(base_name + ".json")
+      if schema_path:
+        context = {"io_type": direction, "operation_id": operation}
+        yield (str(schema_path), direction, operation, False), context
+
+    elif name == "extension_schema_fields":
+      core_entity_name, _, def_path = params["entity_name"].partition("#")
+      schema_path = _find_schema_file(core_entity_name)
+      pointer = f"#{def_path}"
+      # Missing definitions render an error without resolving anything.
+      if (
+        schema_path
+        and def_path
+        and _resolve_json_pointer(pointer, _load_json(schema_path)) is not None
+      ):
+        yield (str(schema_path), "response", "read", True, pointer), None
+
+    elif name == "auto_generate_schema_reference":
+      if not params["include_extensions"]:
+        return
+      sub_dir = params["sub_dir"]
+      scan_path = SHOPPING_SCHEMAS_DIR / sub_dir
+      if not scan_path.is_dir():
+        return
+      for schema_file in sorted(scan_path.glob("*.json")):
+        schema_data = _load_json(schema_file)
+        if (
+          schema_data
+          and "Extension" in schema_data.get("title", "")
+          and schema_data.get("$defs")
+        ):
+          for def_name in schema_data["$defs"]:
+            pointer = f"#/$defs/{def_name}"
+            yield (str(schema_file), "response", "read", True, pointer), None
+
+    elif name == "method_fields":
+      try:
+        index = get_operation_index(repository, _spec_path(params["file_name"]))
+      except (OSError, ValueError):
+        return
+      entry = index.get(params["operation_id"])
+      if not entry:
+        return
+      req_schema, res_schema = entry.request_schema, entry.response_schema
+      io_type = params["io_type"]
+      if io_type in (None, "request"):
+        context = {"io_type": "request", "operation_id": params["operation_id"]}
+        yield from _follow_up_targets(req_schema, context)
+      if io_type in (None, "response"):
+        context = {
+          "io_type": "response",
+          "operation_id": params["operation_id"],
+        }
+        yield from _follow_up_targets(res_schema, context)
+
+  def _prefetch_schemas(docs_dir, workers):
+    """Resolve all schema variants used by the docs on a thread pool.
+
+    Scans the Markdown pages for literal macro calls, works out the
+    (schema_path, direction, operation, bundle) tuples they need, and
+    resolves them concurrently. Variants pulled in through `allOf` or
+    top-level `$ref` composition are scheduled as their parents resolve.
+    Results land in the regular resolution caches, so page rendering then
+    finds every variant already resolved.
+    """
+    seen = set()
+    initial = []
+    affected = {}
+    for page, name, args, kwargs in _scan_macro_calls(docs_dir):
+      # Pages whose previous output is still valid are not rendered again.
+      src_path = page.relative_to(docs_dir).as_posix()
+      if src_path not in affected:
+        affected[src_path] = page_cache.affected(src_path)
+      if affected[src_path]:
+        initial.extend(_plan_macro_call(name, args, kwargs))
+
+    with ThreadPoolExecutor(
+      max_workers=workers, thread_name_prefix="ucp-prefetch"
+    ) as pool:
+      running = {}
+
+      def submit(target, context):
+        if target in seen:
+          return
+        seen.add(target)
+        running[pool.submit(_resolve_schema, *target)] = context
+
+      for target, context in initial:
+        submit(target, context)
+      while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+          context = running.pop(future)
+          resolved = future.result()
+          if resolved and context:
+            for target, follow_context in _follow_up_targets(resolved, context):
+              submit(target, follow_context)
+
+    log.info(f"Prefetched {len(seen)} schema variants with {workers} worker(s)")
+
+  prefetch_workers = env.variables.get(
+    "ucp_prefetch_workers", min(32, (os.cpu_count() or 1) + 4)
+  )
+  if prefetch_workers:
+    with get_profiler().span("build:prefetch"):
+      _prefetch_schemas(env.conf["docs_dir"], int(prefetch_workers))
+
+
+def on_pre_page_macros(env):
+  """Reuse a page's previous macro output if nothing it read has changed.
+
+  Called by mkdocs-macros before a page renders. On a hit the cached output
+  replaces the Markdown and rendering is switched off for the page; on a
+  miss the files the page's macros read are recorded until
+  `on_post_page_macros`.
+
+  Args:
+  ----
+    env: The MkDocs environment object.
+
+  """
+  page = env.page
+  if get_profiler().enabled:
+    _page_started[page.file.src_path] = (
+      time.perf_counter(),
+      time.thread_time(),
+    )
+  if (
+    _page_cache is None
+    or "render_macros" in page.meta
+    or (page.title and env.has_j2(page.title))
+  ):
+    return
+  cached = _page_cache.begin(page.file.src_path, env.markdown)
+  if cached is not None:
+    env.markdown = cached
+    page.meta["render_macros"] = False
+    _reused_pages.add(page.file.src_path)
+
+
+def on_post_page_macros(env):
+  """Store a rendered page's macro output in the page cache and time it.
+
+  Args:
+  ----
+    env: The MkDocs environment object.
+
+  """
+  page = env.page
+  if page.file.src_path in _reused_pages:
+    del page.meta["render_macros"]
+  elif _page_cache is not None:
+    _page_cache.finish(page.file.src_path, env.markdown)
+  started = _page_started.pop(page.file.src_path, None)
+  if started is not None:
+    get_profiler().add(
+      f"page:{page.file.src_path}",
+      "page",
+      started[0],
+      time.perf_counter() - started[0],
+      time.thread_time() - started[1],
+    )
+
+
+def on_post_build(env):
+  """Report how schema resolution was served once the build finishes.
+
+  Called by mkdocs-macros after the site is written. With the CLI backend, a
+  fully warm build reports zero ucp-schema CLI calls.
+
+  Args:
+  ----
+    env: The MkDocs environment object.
+
+  """
+  log.info(
+    f"Schema resolver '{_resolver_backend}': "
+    f"{len(_resolved_schema_cache or ())} variants cached, "
+    f"ucp-schema CLI calls: {_cli_calls}"
+  )
+  if _repository is not None:
+    log.info(
+      f"Schema repository: {len(_repository.paths())} source files, "
+      f"{_repository.parses} parsed in this process"
+    )
+  if _resolver_backend != "python" and _schema_disk_cache is not None:
+    log.info(_schema_disk_cache.summary())
+  if _schema_snapshot is not None and _snapshot_writing:
+    version_source = _schema_disk_cache or ResolutionCache(SCHEMA_CACHE_DIR)
+    _schema_snapshot.save(version_source.tool_version)
+    log.info(
+      f"Wrote {len(_schema_snapshot.entries)} resolved variants to "
+      f"{_schema_snapshot.path}"
+    )
+  elif _schema_snapshot is not None:
+    log.info(_schema_snapshot.summary())
+    if _schema_snapshot.stale:
+      mismatch = _schema_snapshot.tool_mismatch
+      log.warning(
+        f"{len(_schema_snapshot.stale)} ucp-schema snapshot entries are "
+        f"stale{f' ({mismatch})' if mismatch else ''}; regenerate with "
+        "`python -m main snapshot`"
+      )
+  if _python_fallbacks:
+    log.warning(
+      f"ucp-schema is not installed: {len(_python_fallbacks)} variant(s) with "
+      "no current snapshot entry were resolved by the Python resolver, which "
+      "is not yet checked against ucp-schema. Install it "
+      "(`cargo install ucp-schema`) or regenerate the snapshot "
+      "(`python -m main snapshot`)."
+    )
+  if _resolved_schema_cache is not None:
+    log.info(_resolved_schema_cache.summary("Resolved schema cache"))
+  if _render_cache is not None:
+    log.info(_render_cache.summary())
+  if _page_cache is not None:
+    log.info(_page_cache.summary())
+  if _resolver_backend == "cross-check":
+    if _cross_check_mismatches:
+      log.warning(
+        f"Cross-check: {len(_cross_check_mismatches)} variant(s) differ "
+        "between ucp-schema and the Python resolver:\n  "
+        + "\n  ".join(_cross_check_mismatches)
+      )
+    else:
+      log.info("Cross-check: Python resolver matches ucp-schema")
+
+
+if __name__ == "__main__":
+  sys.exit(headless_main(Path(__file__)))
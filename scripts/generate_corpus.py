@@ -0,0 +1,409 @@
+#!/usr/bin/env -S uv run
+
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Generate a synthetic, source/-shaped schema corpus for scale testing.
+
+The corpus is a copy of `source/` and `docs/` plus a number of synthetic
+merchants. Each merchant contributes:
+
+- a chain of types in `schemas/shopping/types/` (`syn_<m>_t<k>.json`), each
+  with `$defs`, `ucp_request` annotations and a `$ref` to the next type; the
+  last one refers to a core type;
+- an extension in `schemas/shopping/` (`syn_<m>.json`) that composes
+  `checkout.json` or `cart.json` with `allOf`, like `discount.json` and
+  `fulfillment.json`;
+- create/get operations in a shared `services/shopping/syn_<n>.openapi.json`;
+- a page in `docs/synthetic/` calling the macros on all of the above.
+
+`--scale 10` generates roughly ten times as many schema files as `source/`
+has today. Profile the result with
+
+    uv run python -m benchmarks run --corpus .cache/corpus-10x
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+import random
+import shutil
+import sys
+
+CORPUS_MARKER = ".ucp-corpus.json"
+SCHEMA_DIALECT = "https://json-schema.org/draft/2020-12/schema"
+SCHEMA_ID_BASE = "https://ucp.dev/schemas/shopping"
+
+# Core schemas extensions compose, and core types chains end in
+EXTENDED_CAPABILITIES = ("checkout", "cart")
+CORE_TYPES = ("total", "postal_address", "line_item", "link", "message")
+
+ENUM_VALUES = ("pending", "active", "expired", "revoked", "redeemed")
+REQUEST_ANNOTATIONS = (
+  "omit",
+  "optional",
+  {"create": "required", "update": "optional"},
+  {"create": "optional", "update": "optional", "complete": "omit"},
+)
+
+
+def _write_json(path: Path, data) -> None:
+  path.parent.mkdir(parents=True, exist_ok=True)
+  with path.open("w", encoding="utf-8") as f:
+    json.dump(data, f, indent=2)
+    f.write("\n")
+
+
+def type_schema(
+  merchant: str, index: int, chain_length: int, rng: random.Random
+) -> dict:
+  """Return type `index` of a merchant's chain."""
+  name = f"syn_{merchant}_t{index:02d}"
+  if index + 1 < chain_length:
+    next_ref = f"syn_{merchant}_t{index + 1:02d}.json"
+  else:
+    next_ref = f"{rng.choice(CORE_TYPES)}.json"
+  return {
+    "$schema": SCHEMA_DIALECT,
+    "$id": f"{SCHEMA_ID_BASE}/types/{name}.json",
+    "title": f"Merchant {merchant} Type {index}",
+    "description": f"Synthetic type {index} of merchant {merchant}.",
+    "type": "object",
+    "required": ["id", "amount"],
+    "$defs": {
+      "attribute": {
+        "type": "object",
+        "required": ["key"],
+        "properties": {
+          "key": {"type": "string", "description": "Attribute name."},
+          "value": {"type": "string", "description": "Attribute value."},
+        },
+      },
+    },
+    "properties": {
+      "id": {
+        "type": "string",
+        "description": "Unique identifier.",
+        "ucp_request": {"create": "omit", "update": "required"},
+      },
+      "amount": {
+        "type": "integer",
+        "minimum": 0,
+        "description": "Amount in minor (cents) currency units.",
+        "ucp_request": rng.choice(REQUEST_ANNOTATIONS),
+      },
+      "status": {
+        "type": "string",
+        "enum": rng.sample(ENUM_VALUES, 3),
+        "description": "Lifecycle status.",
+        "ucp_request": "omit",
+      },
+      "label": {"type": "string", "description": "Display label."},
+      "attributes": {
+        "type": "array",
+        "items": {"$ref": "#/$defs/attribute"},
+        "description": "Merchant-specific attributes.",
+      },
+      "next": {
+        "$ref": next_ref,
+        "description": "Next element of the chain.",
+      },
+    },
+  }
+
+
+def extension_schema(
+  merchant: str, chain_length: int, rng: random.Random
+) -> dict:
+  """Return a merchant's extension of checkout or cart."""
+  name = f"syn_{merchant}"
+  capability = rng.choice(EXTENDED_CAPABILITIES)
+  defs = {
+    f"{name}_entry": {"$ref": f"types/syn_{merchant}_t00.json"},
+    f"{name}_object": {
+      "type": "object",
+      "description": f"Merchant {merchant} data.",
+      "properties": {
+        "codes": {
+          "type": "array",
+          "items": {"type": "string"},
+          "description": "Codes to apply.",
+        },
+        "entries": {
+          "type": "array",
+          "readOnly": True,
+          "items": {"$ref": f"#/$defs/{name}_entry"},
+          "description": "Entries applied by the merchant.",
+        },
+        "last": {
+          "$ref": f"types/syn_{merchant}_t{chain_length - 1:02d}.json",
+          "description": "Last element of the chain.",
+        },
+      },
+    },
+    f"dev.ucp.shopping.{capability}": {
+      "title": f"{capability.title()} with Merchant {merchant}",
+      "description": f"{capability.title()} extended by merchant {merchant}.",
+      "allOf": [
+        {"$ref": f"{capability}.json"},
+        {
+          "type": "object",
+          "properties": {
+            name: {
+              "$ref": f"#/$defs/{name}_object",
+              "ucp_request": {
+                "create": "optional",
+                "update": "optional",
+                "complete": "omit",
+              },
+            },
+          },
+        },
+      ],
+    },
+  }
+  return {
+    "$schema": SCHEMA_DIALECT,
+    "$id": f"{SCHEMA_ID_BASE}/{name}.json",
+    "name": f"com.example.{name}",
+    "title": f"Merchant {merchant} Extension",
+    "description": f"Extends {capability.title()} for merchant {merchant}.",
+    "$defs": defs,
+  }
+
+
+def openapi_document(index: int, merchants: list[str]) -> dict:
+  """Return an OpenAPI shard with create/get operations per merchant."""
+  paths = {}
+  schemas = {}
+  for merchant in merchants:
+    name = f"syn_{merchant}"
+    schemas[name] = {"$ref": f"../../schemas/shopping/types/{name}_t00.json"}
+    body = {
+      "content": {
+        "application/json": {"schema": {"$ref": f"#/components/schemas/{name}"}}
+      }
+    }
+    paths[f"/{name}"] = {
+      "post": {
+        "operationId": f"create_{name}",
+        "summary": f"Create {name}",
+        "parameters": [
+          {"$ref": "#/components/parameters/idempotency_key"},
+          {"$ref": "#/components/parameters/request_id"},
+        ],
+        "requestBody": {"required": True, **body},
+        "responses": {"201": {"description": "Created", **body}},
+      },
+    }
+    paths[f"/{name}/{{id}}"] = {
+      "parameters": [{"$ref": "#/components/parameters/id_path"}],
+      "get": {
+        "operationId": f"get_{name}",
+        "summary": f"Get {name}",
+        "parameters": [{"$ref": "#/components/parameters/request_id"}],
+        "responses": {"200": {"description": "Retrieved", **body}},
+      },
+    }
+  return {
+    "openapi": "3.1.0",
+    "info": {"title": f"Synthetic Operations {index}", "version": "draft"},
+    "paths": paths,
+    "components": {
+      "parameters": {
+        "id_path": {
+          "name": "id",
+          "in": "path",
+          "required": True,
+          "schema": {"type": "string"},
+          "description": "The unique identifier of the resource.",
+        },
+        "idempotency_key": {
+          "name": "Idempotency-Key",
+          "in": "header",
+          "required": True,
+          "schema": {"type": "string", "format": "uuid"},
+        },
+        "request_id": {
+          "name": "Request-Id",
+          "in": "header",
+          "required": True,
+          "schema": {"type": "string", "format": "uuid"},
+        },
+      },
+      "schemas": schemas,
+    },
+  }
+
+
+def merchant_page(merchant: str, openapi_file: str, chain_length: int) -> str:
+  """Return a docs page exercising every macro on one merchant."""
+  name = f"syn_{merchant}"
+  spec = f"synthetic-{merchant}"
+  last = f"{name}_t{chain_length - 1:02d}"
+  return "\n".join(
+    [
+      f"# Merchant {merchant}",
+      "",
+      "## Extension",
+      "",
+      f"{{{{ extension_schema_fields('{name}.json#/$defs/{name}_object', "
+      f"'{spec}') }}}}",
+      "",
+      "## Types",
+      "",
+      f"{{{{ schema_fields('{name}_t00_resp', '{spec}') }}}}",
+      "",
+      f"{{{{ schema_fields('{name}_t00_create_req', '{spec}') }}}}",
+      "",
+      f"{{{{ schema_fields('{last}_update_req', '{spec}') }}}}",
+      "",
+      "## Operations",
+      "",
+      f"{{{{ method_fields('create_{name}', '{openapi_file}', '{spec}') }}}}",
+      "",
+      f"{{{{ method_fields('get_{name}', '{openapi_file}', '{spec}') }}}}",
+      "",
+      f"{{{{ header_fields('create_{name}', '{openapi_file}') }}}}",
+      "",
+    ]
+  )
+
+
+def generate(
+  output: Path,
+  scale: float,
+  chain_length: int,
+  operations_per_file: int,
+  seed: int,
+  source: Path = Path("source"),
+  docs: Path = Path("docs"),
+) -> dict:
+  """Write the corpus into `output` and return its summary."""
+  rng = random.Random(seed)
+  shutil.copytree(source, output / "source")
+  shutil.copytree(docs, output / "docs")
+  schemas_dir = output / "source" / "schemas" / "shopping"
+  services_dir = output / "source" / "services" / "shopping"
+  pages_dir = output / "docs" / "synthetic"
+
+  base_files = sum(1 for _ in source.rglob("*.json"))
+  # Each merchant adds its types and one extension.
+  merchant_count = math.ceil(base_files * (scale - 1) / (chain_length + 1))
+  width = max(4, len(str(merchant_count)))
+  merchants = [f"m{i:0{width}d}" for i in range(merchant_count)]
+  shard_size = max(1, operations_per_file // 2)
+
+  for shard_index in range(0, merchant_count, shard_size):
+    shard = merchants[shard_index : shard_index + shard_size]
+    openapi_file = f"syn_{shard_index // shard_size:03d}.openapi.json"
+    _write_json(
+      services_dir / openapi_file,
+      openapi_document(shard_index // shard_size, shard),
+    )
+    for merchant in shard:
+      for index in range(chain_length):
+        _write_json(
+          schemas_dir / "types" / f"syn_{merchant}_t{index:02d}.json",
+          type_schema(merchant, index, chain_length, rng),
+        )
+      _write_json(
+        schemas_dir / f"syn_{merchant}.json",
+        extension_schema(merchant, chain_length, rng),
+      )
+      pages_dir.mkdir(parents=True, exist_ok=True)
+      (pages_dir / f"{merchant}.md").write_text(
+        merchant_page(merchant, openapi_file, chain_length), encoding="utf-8"
+      )
+
+  summary = {
+    "scale": scale,
+    "seed": seed,
+    "chain_length": chain_length,
+    "merchants": merchant_count,
+    "schema_files": sum(1 for _ in (output / "source").rglob("*.json")),
+    "pages": sum(1 for _ in (output / "docs").rglob("*.md")),
+  }
+  _write_json(output / CORPUS_MARKER, summary)
+  return summary
+
+
+def main():
+  """Parse arguments and generate the corpus."""
+  parser = argparse.ArgumentParser(
+    description="Generate a synthetic schema corpus for scale testing."
+  )
+  parser.add_argument(
+    "--scale",
+    type=float,
+    default=10,
+    help="Size relative to today's source/ (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--output",
+    type=Path,
+    help="Output directory (default: .cache/corpus-<scale>x)",
+  )
+  parser.add_argument(
+    "--chain-length",
+    type=int,
+    default=8,
+    help="Types per merchant, each referring to the next "
+    "(default: %(default)s)",
+  )
+  parser.add_argument(
+    "--operations-per-file",
+    type=int,
+    default=100,
+    help="OpenAPI operations per generated file (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--seed", type=int, default=0, help="Random seed (default: %(default)s)"
+  )
+  parser.add_argument(
+    "--force",
+    action="store_true",
+    help="Replace an existing corpus at the output directory",
+  )
+  args = parser.parse_args()
+
+  if args.scale < 1 or args.chain_length < 1:
+    print("Error: --scale and --chain-length must be at least 1.")
+    sys.exit(1)
+  if not Path("source").is_dir():
+    print("Error: run from the repository root (source/ not found).")
+    sys.exit(1)
+
+  output = args.output or Path(f".cache/corpus-{args.scale:g}x")
+  if output.exists():
+    # Only ever delete a directory this script created.
+    if not args.force or not (output / CORPUS_MARKER).is_file():
+      print(
+        f"Error: {output} exists; pass --force to replace a generated corpus."
+      )
+      sys.exit(1)
+    shutil.rmtree(output)
+
+  summary = generate(
+    output, args.scale, args.chain_length, args.operations_per_file, args.seed
+  )
+  print(
+    f"Wrote {summary['schema_files']} schema files and {summary['pages']} "
+    f"pages ({summary['merchants']} synthetic merchants) to {output}"
+  )
+
+
+if __name__ == "__main__":
+  main()
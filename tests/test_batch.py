@@ -0,0 +1,138 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Batch validation: tag parsing, payload extraction and damaged inputs."""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from ucp_tools.batch import (
+  Chunk,
+  main,
+  read_chunks,
+  validate_chunk,
+  validate_files,
+)
+from ucp_tools.repository import get_repository
+
+SOURCE_DIR = Path(__file__).resolve().parents[1] / "source"
+CREATE = {"schema": "checkout", "operation": "create_request"}
+
+
+def _validate(*records):
+  lines = [json.dumps(record).encode() for record in records]
+  return validate_chunk(
+    Chunk("test", 1, lines), get_repository(SOURCE_DIR), SOURCE_DIR
+  )
+
+
+def _write_ndjson(path, records, compress=False):
+  data = "".join(json.dumps(record) + "\n" for record in records).encode()
+  path.write_bytes(gzip.compress(data) if compress else data)
+  return path
+
+
+@pytest.mark.parametrize(
+  "tag",
+  [
+    {"schema": "checkout", "operation": ["create"]},
+    {"schema": {"name": "checkout"}, "operation": "create_request"},
+    {"schema": 3, "operation": "create_request"},
+  ],
+)
+def test_non_string_tags_are_rejected(tag):
+  """A tag that is not a string is counted, not raised."""
+  report = _validate({**tag, "payload": {}})
+  assert report.rejected == {"schema/operation tag is not a string": 1}
+  assert report.variants == {}
+
+
+def test_unknown_and_missing_tags_are_rejected():
+  """Unknown schemas and operations and missing tags are counted apart."""
+  report = _validate(
+    {"schema": "invoice", "operation": "create", "payload": {}},
+    {"schema": "checkout", "operation": "delete", "payload": {}},
+    {"payload": {}},
+    [],
+  )
+  assert report.rejected == {
+    "unknown schema 'invoice'": 1,
+    "unknown operation 'delete'": 1,
+    "no schema/operation tag": 1,
+    "not a JSON object": 1,
+  }
+
+
+def test_tag_fields_are_not_part_of_the_payload():
+  """A record without a payload field is validated without its tag."""
+  payload = {"line_items": [{"item": {"id": "x"}, "quantity": 1}]}
+  payload["currency"] = "USD"
+  nested = _validate({**CREATE, "payload": payload})
+  flat = _validate({**CREATE, **payload})
+  assert nested.to_json()["variants"] == flat.to_json()["variants"]
+  assert not flat.invalid
+
+
+def test_errors_are_counted_per_variant():
+  """Failures are grouped by variant, pointer and keyword."""
+  report = _validate({**CREATE, "payload": {}}, {**CREATE, "payload": {}})
+  stats = report.variants["checkout.create_request"]
+  assert (stats.records, stats.invalid) == (2, 2)
+  assert set(stats.errors) == {"/ required"}
+
+
+def test_truncated_gzip_keeps_the_lines_before_the_damage(tmp_path):
+  """A truncated .gz ends in an error chunk after the readable lines."""
+  records = [{**CREATE, "payload": {"n": i}} for i in range(2000)]
+  whole = _write_ndjson(tmp_path / "whole.gz", records, compress=True)
+  truncated = tmp_path / "truncated.gz"
+  truncated.write_bytes(whole.read_bytes()[: whole.stat().st_size // 2])
+
+  chunks = list(read_chunks([truncated], chunk_size=500))
+  assert chunks[-1].error.startswith("EOFError")
+  assert chunks[-1].lines == []
+  read = sum(len(chunk.lines) for chunk in chunks)
+  assert 0 < read < len(records)
+
+
+def test_failed_inputs_do_not_stop_the_others(tmp_path):
+  """Missing and corrupt inputs are reported; the rest are validated."""
+  good = _write_ndjson(tmp_path / "good.ndjson", [{**CREATE, "payload": {}}])
+  corrupt = tmp_path / "corrupt.gz"
+  corrupt.write_bytes(gzip.compress(b"{}\n")[:12])
+  missing = tmp_path / "missing.ndjson"
+
+  report = validate_files([corrupt, missing, good], SOURCE_DIR)
+  assert set(report.failed_inputs) == {str(corrupt), str(missing)}
+  assert report.records == 1
+  assert main([str(corrupt), str(good), "--source-dir", str(SOURCE_DIR)]) == 2
+
+
+def test_uncompilable_variant_is_counted_not_raised(tmp_path):
+  """A schema that fails to compile marks its records as not validated."""
+  schemas = tmp_path / "schemas/shopping"
+  schemas.mkdir(parents=True)
+  (schemas / "checkout.json").write_text(json.dumps({"$ref": "missing.json"}))
+
+  lines = [json.dumps({**CREATE, "payload": {}}).encode()] * 3
+  report = validate_chunk(
+    Chunk("test", 1, lines), get_repository(tmp_path), tmp_path
+  )
+  stats = report.variants["checkout.create_request"]
+  assert (stats.records, stats.invalid, stats.unvalidated) == (3, 0, 3)
+  assert stats.schema_error
+  assert report.invalid == 3
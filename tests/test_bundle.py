@@ -0,0 +1,146 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Bundles are self-contained: every `$ref` resolves inside the document."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ucp_tools.bundle import bundle_schema, bundle_variants
+from ucp_tools.repository import get_repository
+from ucp_tools.validator import VARIANTS, _unescape
+
+SOURCE_DIR = Path(__file__).resolve().parents[1] / "source"
+
+
+def _refs(node):
+  """Yield every `$ref` value in a document."""
+  if isinstance(node, dict):
+    for key, value in node.items():
+      if key == "$ref" and isinstance(value, str):
+        yield value
+      else:
+        yield from _refs(value)
+  elif isinstance(node, list):
+    for item in node:
+      yield from _refs(item)
+
+
+def _follow(document, ref):
+  """Return what a local `$ref` points at in `document`."""
+  assert ref.startswith("#"), ref
+  target = document
+  for token in filter(None, ref[1:].split("/")):
+    target = target[_unescape(token)]
+  return target
+
+
+@pytest.fixture
+def source(tmp_path):
+  """Write an order with a recursive line type and a shared amount type."""
+  (tmp_path / "types").mkdir()
+  files = {
+    "order.json": {
+      "$schema": "https://json-schema.org/draft/2020-12/schema",
+      "$id": "https://ucp.dev/schemas/order.json",
+      "properties": {
+        "lines": {"type": "array", "items": {"$ref": "types/line.json"}},
+        "total": {"$ref": "types/amount.json"},
+        "status": {"$ref": "#/$defs/status"},
+      },
+      "$defs": {"status": {"enum": ["open", "done"]}},
+    },
+    "types/line.json": {
+      "$id": "https://ucp.dev/schemas/types/line.json",
+      "properties": {
+        "price": {"$ref": "amount.json"},
+        "parts": {"type": "array", "items": {"$ref": "#"}},
+        "kind": {"$ref": "#/$defs/kind"},
+      },
+      "$defs": {"kind": {"enum": ["good", "service"]}},
+    },
+    "types/amount.json": {"type": "integer", "minimum": 0},
+  }
+  for name, document in files.items():
+    (tmp_path / name).write_text(json.dumps(document))
+  return tmp_path
+
+
+def _load(path):
+  """Read a schema file."""
+  return json.loads(Path(path).read_text())
+
+
+def test_every_ref_resolves_within_the_bundle(source):
+  """File refs become `#/$defs/...` refs that land on the embedded file."""
+  bundled = bundle_schema(source / "order.json", _load, source)
+  refs = set(_refs(bundled))
+  assert refs == {
+    "#/$defs/types.line",
+    "#/$defs/types.amount",
+    "#/$defs/status",
+    "#/$defs/types.line/$defs/kind",
+  }
+  for ref in refs:
+    _follow(bundled, ref)
+  assert _follow(bundled, "#/$defs/types.line/$defs/kind") == {
+    "enum": ["good", "service"]
+  }
+
+
+def test_shared_files_are_embedded_once(source):
+  """A file referenced from several places gets a single `$defs` entry."""
+  bundled = bundle_schema(source / "order.json", _load, source)
+  assert set(bundled["$defs"]) == {"status", "types.line", "types.amount"}
+  assert bundled["$defs"]["types.amount"] == _load(source / "types/amount.json")
+
+
+def test_self_reference_points_at_the_embedded_document(source):
+  """`#` inside an embedded file means that file, not the bundle root."""
+  bundled = bundle_schema(source / "order.json", _load, source)
+  line = bundled["$defs"]["types.line"]
+  assert line["properties"]["parts"]["items"] == {"$ref": "#/$defs/types.line"}
+
+
+def test_embedded_documents_are_not_resources(source):
+  """Only the root keeps `$id` and `$schema`."""
+  bundled = bundle_schema(source / "order.json", _load, source)
+  assert bundled["$id"] == "https://ucp.dev/schemas/order.json"
+  assert "$id" not in bundled["$defs"]["types.line"]
+
+
+def test_loaded_documents_are_not_modified(source):
+  """Bundling leaves what the loader returned untouched."""
+  documents = {}
+
+  def load(path):
+    return documents.setdefault(path, _load(path))
+
+  bundle_schema(source / "order.json", load, source)
+  for path, document in documents.items():
+    assert document == _load(path)
+
+
+def test_shopping_bundles_are_self_contained():
+  """Every bundle of the real shopping schemas is self-contained."""
+  repository = get_repository(SOURCE_DIR)
+  for path in sorted((SOURCE_DIR / "schemas/shopping").glob("*.json")):
+    bundles = bundle_variants(path, repository.load, SOURCE_DIR, VARIANTS)
+    for name, bundled in bundles.items():
+      for ref in set(_refs(bundled)):
+        if not ref.startswith(("http://", "https://")):
+          _follow(bundled, ref)
+      assert name == "" or "ucp_request" not in json.dumps(bundled)
@@ -0,0 +1,127 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Visibility annotations per direction and operation in the resolver."""
+
+import json
+
+import pytest
+
+from ucp_tools.resolver import ResolutionError, Resolver, resolve_file
+
+ORDER = {
+  "$id": "https://ucp.dev/schemas/order.json",
+  "type": "object",
+  "required": ["id", "status"],
+  "properties": {
+    "id": {
+      "type": "string",
+      "ucp_request": {"create": "omit", "update": "required"},
+    },
+    "status": {
+      "type": "string",
+      "ucp_request": "optional",
+      "ucp_response": "required",
+    },
+    "note": {"type": "string", "ucp_request": {"update": "required"}},
+    "buyer": {"$ref": "buyer.json"},
+  },
+}
+BUYER = {
+  "$id": "https://ucp.dev/schemas/buyer.json",
+  "type": "object",
+  "properties": {
+    "email": {"type": "string", "ucp_request": {"create": "required"}},
+    "id": {"type": "string", "ucp_request": "omit"},
+    "referrer": {"$ref": "buyer.json"},
+  },
+}
+
+
+@pytest.fixture
+def order(tmp_path):
+  """Write the order and buyer schemas; return the order's path."""
+  (tmp_path / "buyer.json").write_text(json.dumps(BUYER))
+  path = tmp_path / "order.json"
+  path.write_text(json.dumps(ORDER))
+  return path
+
+
+def _annotations(node):
+  """Yield every ucp_request / ucp_response key left in a document."""
+  if isinstance(node, dict):
+    for key, value in node.items():
+      if key in ("ucp_request", "ucp_response"):
+        yield key
+      yield from _annotations(value)
+  elif isinstance(node, list):
+    for item in node:
+      yield from _annotations(item)
+
+
+def test_create_omits_and_relaxes(order):
+  """'omit' drops the property and its required entry; 'optional' relaxes."""
+  resolved = resolve_file(order, "request", "create")
+  assert "id" not in resolved["properties"]
+  assert "required" not in resolved
+  assert "note" in resolved["properties"]
+
+
+def test_operation_map_requires_per_operation(order):
+  """A map annotation applies to the operations it names only."""
+  resolved = resolve_file(order, "request", "update")
+  assert resolved["required"] == ["id", "note"]
+
+
+def test_response_uses_its_own_annotation(order):
+  """Request annotations do not affect the response direction."""
+  resolved = resolve_file(order, "response", "read")
+  assert resolved["required"] == ["id", "status"]
+  assert set(resolved["properties"]) == {"id", "status", "note", "buyer"}
+
+
+def test_annotations_are_stripped(order):
+  """No annotation key survives resolution, bundled or not."""
+  for bundle in (False, True):
+    resolved = resolve_file(order, "request", "create", bundle=bundle)
+    assert list(_annotations(resolved)) == []
+
+
+def test_bundle_resolves_refs_for_the_same_operation(order):
+  """Inlined files get the variant's annotations and lose $id/$schema."""
+  buyer = resolve_file(order, "request", "create", bundle=True)["properties"][
+    "buyer"
+  ]
+  assert buyer["required"] == ["email"]
+  assert "id" not in buyer["properties"]
+  assert "$id" not in buyer
+  # The cyclic self-reference is kept as a ref rather than expanded.
+  assert buyer["properties"]["referrer"] == {"$ref": "buyer.json"}
+
+
+def test_source_documents_are_not_modified(order):
+  """Resolving never mutates what the loader returned."""
+  loaded = json.loads(order.read_text())
+  Resolver("request", "create", loader=lambda path: loaded).resolve(order)
+  assert loaded == ORDER
+
+
+def test_invalid_annotation_value(tmp_path):
+  """An unknown visibility is an error naming where it was found."""
+  path = tmp_path / "bad.json"
+  path.write_text(
+    json.dumps({"properties": {"x": {"ucp_request": {"create": "hidden"}}}})
+  )
+  with pytest.raises(ResolutionError, match="#/properties/x"):
+    resolve_file(path, "request", "create")
@@ -0,0 +1,115 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Snapshot entries are served only while their inputs and tool match."""
+
+import json
+
+import pytest
+
+from ucp_tools.ref_graph import get_ref_graph
+from ucp_tools.repository import SchemaRepository
+from ucp_tools.snapshot import SchemaSnapshot
+
+FLAGS = ["--request", "--op", "create"]
+RESOLVED = {"type": "object", "properties": {"line": {"type": "object"}}}
+
+
+@pytest.fixture
+def source(tmp_path):
+  """Write a schema that refs a type, in a directory with a space."""
+  source = tmp_path / "source dir"
+  (source / "types").mkdir(parents=True)
+  (source / "types/line.json").write_text(json.dumps({"type": "object"}))
+  (source / "order.json").write_text(
+    json.dumps({"properties": {"line": {"$ref": "types/line.json"}}})
+  )
+  return source
+
+
+@pytest.fixture
+def repository(source):
+  """Index the fixture's source directory."""
+  return SchemaRepository(source)
+
+
+def _snapshot(source, repository, installed_tool="ucp-schema 1.0.0"):
+  """Load the snapshot of `source` against its current contents."""
+  repository.refresh()
+  graph = get_ref_graph(repository, source)
+  return SchemaSnapshot.load(
+    source.parent / "snapshot.json", repository, source, graph, installed_tool
+  )
+
+
+def _record(source, repository):
+  """Write a snapshot holding one resolution of order.json."""
+  snapshot = _snapshot(source, repository)
+  snapshot.put(source / "order.json", FLAGS, RESOLVED)
+  snapshot.save("ucp-schema 1.0.0")
+
+
+def test_entry_records_path_and_flags(source, repository):
+  """Entries keep their path and flags instead of encoding them in a key."""
+  _record(source, repository)
+  entry = next(iter(_snapshot(source, repository).entries.values()))
+  assert entry["path"] == "order.json"
+  assert entry["flags"] == FLAGS
+  assert set(entry["files"]) == {"order.json", "types/line.json"}
+
+
+def test_unchanged_entry_is_served(source, repository):
+  """With the same inputs and tool, the recorded schema is returned."""
+  _record(source, repository)
+  snapshot = _snapshot(source, repository)
+  assert snapshot.get(source / "order.json", FLAGS) == RESOLVED
+  assert snapshot.verify() == []
+  assert (snapshot.served, snapshot.stale) == (1, set())
+
+
+def test_changed_ref_target_makes_the_entry_stale(source, repository):
+  """Editing a file in the $ref closure invalidates the entry."""
+  _record(source, repository)
+  (source / "types/line.json").write_text(json.dumps({"type": "string"}))
+  snapshot = _snapshot(source, repository)
+  assert snapshot.get(source / "order.json", FLAGS) is None
+  assert snapshot.stale == {"order.json --request --op create"}
+  assert snapshot.verify() == [
+    ("order.json --request --op create", "changed: types/line.json")
+  ]
+
+
+def test_removed_source_is_reported(source, repository):
+  """An entry whose schema was deleted is listed by verify."""
+  _record(source, repository)
+  (source / "order.json").unlink()
+  assert _snapshot(source, repository).verify() == [
+    ("order.json --request --op create", "source file removed")
+  ]
+
+
+def test_other_tool_version_makes_every_entry_stale(source, repository):
+  """Output of another ucp-schema version is never served."""
+  _record(source, repository)
+  snapshot = _snapshot(source, repository, installed_tool="ucp-schema 2.0.0")
+  assert snapshot.get(source / "order.json", FLAGS) is None
+  [(variant, reason)] = snapshot.verify()
+  assert "ucp-schema 2.0.0" in reason
+
+
+def test_without_the_cli_entries_are_still_served(source, repository):
+  """With no ucp-schema installed, current entries stand in for it."""
+  _record(source, repository)
+  snapshot = _snapshot(source, repository, installed_tool=None)
+  assert snapshot.get(source / "order.json", FLAGS) == RESOLVED
@@ -0,0 +1,147 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Compiled validators: error pointers, keyword coverage, jsonschema parity."""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.suites import break_payload, sample_payload
+from ucp_tools.repository import get_repository
+from ucp_tools.validator import (
+  VARIANTS,
+  CompileError,
+  Validator,
+  compile_variants,
+)
+
+SOURCE_DIR = Path(__file__).resolve().parents[1] / "source"
+
+ORDER = {
+  "type": "object",
+  "required": ["lines"],
+  "properties": {
+    "lines": {"type": "array", "items": {"$ref": "#/$defs/line"}},
+    "tags": {"type": "object", "additionalProperties": {"type": "string"}},
+  },
+  "$defs": {
+    "line": {
+      "type": "object",
+      "required": ["sku"],
+      "properties": {"quantity": {"type": "integer", "minimum": 1}},
+    }
+  },
+}
+
+
+def _pairs(violations):
+  return sorted((v.pointer, v.keyword) for v in violations)
+
+
+def test_pointers_locate_the_failing_value():
+  """Errors point at the offending value, not at the schema."""
+  errors = Validator(ORDER).errors(
+    {
+      "lines": [{"sku": "a", "quantity": 1}, {"quantity": 0}],
+      "tags": {"a/b": 1},
+    }
+  )
+  assert _pairs(errors) == [
+    ("/lines/1", "required"),
+    ("/lines/1/quantity", "minimum"),
+    ("/tags/a~1b", "type"),
+  ]
+
+
+def test_required_is_reported_on_the_parent():
+  """A missing property is reported at the object that lacks it."""
+  assert _pairs(Validator(ORDER).errors({})) == [("", "required")]
+
+
+def test_valid_payload():
+  """A conforming payload has no errors."""
+  assert Validator(ORDER).is_valid({"lines": [{"sku": "a", "quantity": 2}]})
+
+
+def test_cyclic_refs():
+  """A recursive schema compiles and validates at every depth."""
+  node = {
+    "type": "object",
+    "properties": {"child": {"$ref": "#"}, "name": {"type": "string"}},
+  }
+  errors = Validator(node).errors({"child": {"child": {"name": 1}}})
+  assert _pairs(errors) == [("/child/child/name", "type")]
+
+
+def test_dependent_schemas():
+  """A dependent schema applies only when its property is present."""
+  validator = Validator({"dependentSchemas": {"card": {"required": ["cvc"]}}})
+  assert _pairs(validator.errors({"card": "x"})) == [("", "required")]
+  assert validator.is_valid({"iban": "x"})
+
+
+@pytest.mark.parametrize(
+  "schema",
+  [
+    {"unevaluatedProperties": False},
+    {"$dynamicRef": "#node"},
+    {"properties": {"x": {"minimun": 1}}},
+  ],
+)
+def test_unsupported_keywords_do_not_compile(schema):
+  """Keywords the compiler cannot check are errors, not silently ignored."""
+  with pytest.raises(CompileError, match="unsupported keywords"):
+    Validator(schema)
+
+
+def test_annotations_and_extensions_compile():
+  """Annotations and ucp_/x- extensions do not affect validation."""
+  validator = Validator(
+    {"title": "t", "ucp_shared_request": True, "x-note": 1, "format": "email"}
+  )
+  assert validator.is_valid("not an email")
+
+
+def test_unresolvable_ref():
+  """A $ref that does not resolve fails at compile time."""
+  with pytest.raises(CompileError, match="does not resolve"):
+    Validator({"$ref": "#/$defs/missing"})
+
+
+@pytest.mark.parametrize("schema", ["checkout", "cart"])
+def test_parity_with_jsonschema(schema):
+  """Every shopping variant reports what jsonschema reports."""
+  jsonschema = pytest.importorskip("jsonschema")
+  validators = compile_variants(
+    get_repository(SOURCE_DIR),
+    SOURCE_DIR / f"schemas/shopping/{schema}.json",
+    VARIANTS,
+    SOURCE_DIR,
+  )
+  for validator in validators.values():
+    reference = jsonschema.Draft202012Validator(validator.schema)
+    sample = sample_payload(validator.schema)
+    for payload in (sample, break_payload(sample), {}, []):
+      expected = sorted(
+        (
+          "".join(
+            "/" + str(part).replace("~", "~0").replace("/", "~1")
+            for part in error.absolute_path
+          ),
+          error.validator,
+        )
+        for error in reference.iter_errors(payload)
+      )
+      assert _pairs(validator.errors(payload)) == expected, validator.name
@@ -0,0 +1,525 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Batch validation of NDJSON payload archives against the UCP schemas.
+
+    python -m ucp_tools.batch payloads.ndjson.gz [more.ndjson ...]
+
+Each line is one record, usually an envelope such as
+
+    {"schema": "checkout", "operation": "create_request", "payload": {...}}
+
+whose tag picks the compiled validator (see `validator.py`) for the payload.
+Records without a tag use `--schema` / `--operation`, and a record without
+the payload field is itself the payload.
+
+Input is read lazily (gzip is detected from the file header), cut into
+chunks of raw lines, and validated on a process pool with a bounded number
+of chunks in flight, so memory does not grow with the input. Results are
+per-variant error histograms keyed by JSON pointer, with array indices
+folded into '*' so they stay small however many records fail.
+"""
+
+import argparse
+from collections import Counter
+from collections.abc import Iterable, Iterator
+import contextlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+import gzip
+import itertools
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import re
+import sys
+from typing import Any, BinaryIO
+import zlib
+
+from ucp_tools.bundle import variant_name
+from ucp_tools.repository import get_repository
+from ucp_tools.resolver import ResolutionError
+from ucp_tools.validator import VARIANTS, CompileError, get_validator
+
+# Payload schemas records may be tagged with, under source/schemas/shopping/
+BATCH_SCHEMAS = ("checkout", "cart", "order")
+BATCH_SCHEMAS_DIR = "schemas/shopping"
+# Bump when the report layout changes.
+REPORT_FORMAT = 1
+DEFAULT_CHUNK_SIZE = 2000
+# Failing records kept per variant as examples in the report
+DEFAULT_EXAMPLES = 5
+# Chunks queued per worker; bounds memory while keeping workers busy
+_CHUNKS_IN_FLIGHT_PER_WORKER = 2
+_GZIP_MAGIC = b"\x1f\x8b"
+# Reading an input stops at these (missing file, truncated or corrupt gzip);
+# the other inputs are still validated.
+_INPUT_ERRORS = (OSError, EOFError, gzip.BadGzipFile, zlib.error)
+# A variant whose schema fails to compile or resolve is reported, not fatal.
+_SCHEMA_ERRORS = (CompileError, ResolutionError, OSError, ValueError, re.error)
+
+# 'create_request' -> ('request', 'create'), and 'create' as a shorthand
+_OPERATIONS = {
+  variant_name(direction, operation): (direction, operation)
+  for direction, operation in VARIANTS
+} | {operation: (direction, operation) for direction, operation in VARIANTS}
+
+
+@dataclass(frozen=True)
+class RecordFormat:
+  """Where a record keeps its tag and payload, and the default tag."""
+
+  schema_field: str = "schema"
+  operation_field: str = "operation"
+  payload_field: str = "payload"
+  schema: str | None = None
+  operation: str | None = None
+
+
+@dataclass
+class Chunk:
+  """Consecutive raw lines of one input, starting at line `first_line`.
+
+  A chunk with an `error` has no lines: reading `source` failed after the
+  chunks before it.
+  """
+
+  source: str
+  first_line: int
+  lines: list[bytes]
+  error: str | None = None
+
+
+@dataclass
+class VariantStats:
+  """Counts for one schema variant, e.g. 'checkout.create_request'."""
+
+  records: int = 0
+  invalid: int = 0
+  # Records not validated because the variant's schema did not compile
+  unvalidated: int = 0
+  schema_error: str | None = None
+  # 'pointer keyword' -> violations
+  errors: Counter = field(default_factory=Counter)
+  # 'source:line pointer: message' of the first failing records
+  examples: list[str] = field(default_factory=list)
+
+  def merge(self, other: "VariantStats", max_examples: int) -> None:
+    """Add another chunk's counts to these."""
+    self.records += other.records
+    self.invalid += other.invalid
+    self.unvalidated += other.unvalidated
+    self.schema_error = self.schema_error or other.schema_error
+    self.errors.update(other.errors)
+    room = max_examples - len(self.examples)
+    self.examples.extend(other.examples[: max(room, 0)])
+
+
+@dataclass
+class BatchReport:
+  """Results of a batch: per-variant stats and rejected records."""
+
+  max_examples: int = DEFAULT_EXAMPLES
+  records: int = 0
+  variants: dict[str, VariantStats] = field(default_factory=dict)
+  # reason -> records that could not be validated at all
+  rejected: Counter = field(default_factory=Counter)
+  # input -> why reading it stopped early
+  failed_inputs: dict[str, str] = field(default_factory=dict)
+
+  def merge(self, other: "BatchReport") -> None:
+    """Add the results of another chunk."""
+    self.records += other.records
+    self.rejected.update(other.rejected)
+    self.failed_inputs.update(other.failed_inputs)
+    for name, stats in other.variants.items():
+      self.variants.setdefault(name, VariantStats()).merge(
+        stats, self.max_examples
+      )
+
+  @property
+  def invalid(self) -> int:
+    """Records that failed validation or could not be validated."""
+    return sum(s.invalid + s.unvalidated for s in self.variants.values()) + sum(
+      self.rejected.values()
+    )
+
+  def to_json(self) -> dict[str, Any]:
+    """Return the report as a JSON document, most frequent errors first."""
+    return {
+      "format": REPORT_FORMAT,
+      "records": self.records,
+      "invalid": self.invalid,
+      "rejected": dict(self.rejected.most_common()),
+      "failed_inputs": dict(sorted(self.failed_inputs.items())),
+      "variants": {
+        name: {
+          "records": stats.records,
+          "invalid": stats.invalid,
+          "unvalidated": stats.unvalidated,
+          "schema_error": stats.schema_error,
+          "errors": dict(stats.errors.most_common()),
+          "examples": stats.examples,
+        }
+        for name, stats in sorted(self.variants.items())
+      },
+    }
+
+  def summary(self, top: int = 10) -> str:
+    """Return a text summary with the `top` errors of each variant."""
+    lines = [
+      f"{self.records} records, {self.invalid} invalid, "
+      f"{sum(self.rejected.values())} rejected"
+    ]
+    lines += [f"  rejected: {n:>8}  {why}" for why, n in self.rejected.items()]
+    lines += [
+      f"  input failed: {source}: {error}"
+      for source, error in sorted(self.failed_inputs.items())
+    ]
+    for name, stats in sorted(self.variants.items()):
+      lines.append(f"{name}: {stats.records} records, {stats.invalid} invalid")
+      if stats.schema_error:
+        lines.append(
+          f"  {stats.unvalidated:>8}  not validated: {stats.schema_error}"
+        )
+      lines += [
+        f"  {count:>8}  {error}"
+        for error, count in stats.errors.most_common(top)
+      ]
+    return "\n".join(lines)
+
+
+def _histogram_key(pointer: str, keyword: str) -> str:
+  """Return 'pointer keyword', with array indices folded into '*'."""
+  folded = "/".join(
+    "*" if segment.isdigit() else segment for segment in pointer.split("/")
+  )
+  return f"{folded or '/'} {keyword}"
+
+
+def open_input(path: str | Path) -> BinaryIO:
+  """Open an NDJSON file ('-' for stdin), decompressing gzip transparently.
+
+  For stdin, the result is `sys.stdin.buffer` itself unless it is gzip.
+  """
+  if str(path) == "-":
+    stream = sys.stdin.buffer
+    if stream.peek(2)[:2] == _GZIP_MAGIC:
+      return gzip.GzipFile(fileobj=stream)
+    return stream
+  with Path(path).open("rb") as f:
+    compressed = f.read(2) == _GZIP_MAGIC
+  return gzip.open(path, "rb") if compressed else Path(path).open("rb")
+
+
+def read_chunks(
+  paths: Iterable[str | Path], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Chunk]:
+  """Yield the non-blank lines of each input in chunks, one file at a time.
+
+  An input that cannot be opened or stops decompressing part-way (e.g. a
+  truncated `.gz`) ends with an error chunk, after a chunk of the lines read
+  up to the failure, and the next input is read.
+  """
+  for path in paths:
+    batch: list[tuple[int, bytes]] = []
+    error = None
+    try:
+      with contextlib.ExitStack() as stack:
+        stream = open_input(path)
+        if stream is not sys.stdin.buffer:
+          stack.enter_context(stream)
+        for number, line in enumerate(stream, start=1):
+          if not line.strip():
+            continue
+          batch.append((number, line))
+          if len(batch) == chunk_size:
+            yield Chunk(str(path), batch[0][0], [line for _, line in batch])
+            batch = []
+    except _INPUT_ERRORS as e:
+      error = f"{type(e).__name__}: {e}"
+    if batch:
+      yield Chunk(str(path), batch[0][0], [line for _, line in batch])
+    if error is not None:
+      yield Chunk(str(path), 0, [], error)
+
+
+def _parse_tag(record: dict, fmt: RecordFormat) -> tuple[str, str, str]:
+  """Return (schema, direction, operation) of a record.
+
+  Raises:
+    ValueError: With the reason if the tag is missing or unknown.
+
+  """
+  schema = record.get(fmt.schema_field, fmt.schema)
+  operation = record.get(fmt.operation_field, fmt.operation)
+  if schema is None or operation is None:
+    raise ValueError("no schema/operation tag")
+  if not isinstance(schema, str) or not isinstance(operation, str):
+    raise ValueError("schema/operation tag is not a string")
+  schema = Path(schema).name.removesuffix(".json")
+  if schema not in BATCH_SCHEMAS:
+    raise ValueError(f"unknown schema {schema!r}")
+  if operation not in _OPERATIONS:
+    raise ValueError(f"unknown operation {operation!r}")
+  return (schema, *_OPERATIONS[operation])
+
+
+def validate_chunk(
+  chunk: Chunk,
+  repository,
+  source_dir: str | Path = "source",
+  fmt: RecordFormat | None = None,
+  max_examples: int = DEFAULT_EXAMPLES,
+) -> BatchReport:
+  """Validate every record of a chunk, returning its partial report."""
+  fmt = fmt or RecordFormat()
+  report = BatchReport(max_examples)
+  if chunk.error is not None:
+    report.failed_inputs[chunk.source] = chunk.error
+    return report
+  schemas_dir = Path(source_dir) / BATCH_SCHEMAS_DIR
+  validators = {}
+  for offset, line in enumerate(chunk.lines):
+    report.records += 1
+    try:
+      record = json.loads(line)
+    except ValueError:
+      report.rejected["not JSON"] += 1
+      continue
+    if not isinstance(record, dict):
+      report.rejected["not a JSON object"] += 1
+      continue
+    try:
+      schema, direction, operation = _parse_tag(record, fmt)
+    except ValueError as e:
+      report.rejected[str(e)] += 1
+      continue
+    key = (schema, direction, operation)
+    if key not in validators:
+      try:
+        validators[key] = get_validator(
+          repository,
+          schemas_dir / f"{schema}.json",
+          direction,
+          operation,
+          source_dir,
+        )
+      except _SCHEMA_ERRORS as e:
+        # Remembered for the rest of the chunk instead of retried per record
+        validators[key] = e
+    validator = validators[key]
+    name = f"{schema}.{variant_name(direction, operation)}"
+    stats = report.variants.setdefault(name, VariantStats())
+    stats.records += 1
+    if isinstance(validator, Exception):
+      stats.unvalidated += 1
+      stats.schema_error = f"{type(validator).__name__}: {validator}"
+      continue
+    if fmt.payload_field in record:
+      payload = record[fmt.payload_field]
+    else:
+      # The record is the payload, less the tag it was routed by.
+      tag_fields = (fmt.schema_field, fmt.operation_field)
+      payload = {k: v for k, v in record.items() if k not in tag_fields}
+    errors = validator.errors(payload)
+    if not errors:
+      continue
+    stats.invalid += 1
+    stats.errors.update(_histogram_key(e.pointer, e.keyword) for e in errors)
+    if len(stats.examples) < max_examples:
+      first = errors[0]
+      stats.examples.append(
+        f"{chunk.source}:{chunk.first_line + offset} "
+        f"{first.pointer or '/'}: {first.message}"
+      )
+  return report
+
+
+# Per-process state of the pool workers, set by `_init_batch_worker`.
+_worker_args: tuple = ()
+
+
+def _init_batch_worker(
+  source_dir: str, fmt: RecordFormat, max_examples: int
+) -> None:
+  global _worker_args
+  _worker_args = (get_repository(source_dir), source_dir, fmt, max_examples)
+
+
+def _validate_in_worker(chunk: Chunk) -> BatchReport:
+  return validate_chunk(chunk, *_worker_args)
+
+
+def validate_stream(
+  chunks: Iterable[Chunk],
+  source_dir: str | Path = "source",
+  fmt: RecordFormat | None = None,
+  workers: int = 0,
+  max_examples: int = DEFAULT_EXAMPLES,
+) -> BatchReport:
+  """Validate chunks of records, on `workers` processes if more than one.
+
+  At most a few chunks per worker are read ahead, so memory stays constant
+  however many chunks `chunks` yields.
+  """
+  report = BatchReport(max_examples)
+  if workers <= 1:
+    repository = get_repository(source_dir)
+    for chunk in chunks:
+      report.merge(
+        validate_chunk(chunk, repository, source_dir, fmt, max_examples)
+      )
+    return report
+  # Spawned workers import this module by name; make sure they can.
+  repo_dir = str(Path(__file__).resolve().parents[1])
+  if repo_dir not in sys.path:
+    sys.path.insert(0, repo_dir)
+  with ProcessPoolExecutor(
+    max_workers=workers,
+    mp_context=multiprocessing.get_context("spawn"),
+    initializer=_init_batch_worker,
+    initargs=(str(source_dir), fmt, max_examples),
+  ) as pool:
+    chunks = iter(chunks)
+    pending = set()
+    limit = workers * _CHUNKS_IN_FLIGHT_PER_WORKER
+    while True:
+      for chunk in itertools.islice(chunks, limit - len(pending)):
+        pending.add(pool.submit(_validate_in_worker, chunk))
+      if not pending:
+        return report
+      done, pending = wait(pending, return_when=FIRST_COMPLETED)
+      for future in done:
+        report.merge(future.result())
+
+
+def validate_files(
+  paths: Iterable[str | Path],
+  source_dir: str | Path = "source",
+  fmt: RecordFormat | None = None,
+  workers: int = 0,
+  chunk_size: int = DEFAULT_CHUNK_SIZE,
+  max_examples: int = DEFAULT_EXAMPLES,
+) -> BatchReport:
+  """Validate NDJSON files (plain or gzip); see `validate_stream`."""
+  return validate_stream(
+    read_chunks(paths, chunk_size), source_dir, fmt, workers, max_examples
+  )
+
+
+def main(argv: list[str] | None = None) -> int:
+  """Command line of `python -m ucp_tools.batch`; returns the exit code.
+
+  Exits 2 if an input could not be read to the end (its records up to that
+  point and the other inputs are still reported), otherwise 1 if any record
+  is invalid or could not be validated.
+  """
+  parser = argparse.ArgumentParser(
+    prog="python -m ucp_tools.batch",
+    description="Validate NDJSON payload archives against the UCP schemas.",
+  )
+  parser.add_argument(
+    "inputs",
+    nargs="+",
+    help="NDJSON files, optionally gzip-compressed; '-' reads stdin",
+  )
+  parser.add_argument(
+    "--source-dir",
+    type=Path,
+    default=Path("source"),
+    help="Schema sources (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--schema",
+    help=f"Schema of untagged records, one of {', '.join(BATCH_SCHEMAS)}",
+  )
+  parser.add_argument(
+    "--operation",
+    help="Operation of untagged records, e.g. create_request, read_response",
+  )
+  parser.add_argument(
+    "--schema-field",
+    default="schema",
+    help="Record field holding the schema tag (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--operation-field",
+    default="operation",
+    help="Record field holding the operation tag (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--payload-field",
+    default="payload",
+    help="Record field holding the payload; a record without it is "
+    "validated as a whole (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--workers",
+    type=int,
+    default=os.cpu_count() or 1,
+    help="Worker processes; 0 or 1 validates in-process (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--chunk-size",
+    type=int,
+    default=DEFAULT_CHUNK_SIZE,
+    help="Records per chunk sent to a worker (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--examples",
+    type=int,
+    default=DEFAULT_EXAMPLES,
+    help="Failing records listed per variant (default: %(default)s)",
+  )
+  parser.add_argument(
+    "--output",
+    type=Path,
+    help="Write the full JSON report here",
+  )
+  args = parser.parse_args(argv)
+  if args.chunk_size < 1:
+    parser.error("--chunk-size must be at least 1")
+
+  fmt = RecordFormat(
+    args.schema_field,
+    args.operation_field,
+    args.payload_field,
+    args.schema,
+    args.operation,
+  )
+  report = validate_files(
+    args.inputs,
+    args.source_dir,
+    fmt,
+    args.workers,
+    args.chunk_size,
+    args.examples,
+  )
+  print(report.summary())
+  if args.output:
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w", encoding="utf-8") as f:
+      json.dump(report.to_json(), f, indent=2)
+      f.write("\n")
+  for source, error in sorted(report.failed_inputs.items()):
+    print(f"error: {source}: {error}", file=sys.stderr)
+  if report.failed_inputs:
+    return 2
+  return 1 if report.invalid else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
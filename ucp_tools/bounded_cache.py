@@ -0,0 +1,192 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""In-memory LRU cache whose entries are checked against their sources.
+
+Each entry remembers the digest of every source file it was computed from.
+Entries are bounded by count and, optionally, by approximate size, evicting
+the least recently used first, and an entry whose
+files changed since it was stored is dropped on lookup. Source digests come
+from the `SchemaRepository`, which re-stats files on every refresh, so
+entries are only re-checked after the repository saw a change.
+"""
+
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import threading
+from typing import Any
+
+DEFAULT_MAX_ENTRIES = 1024
+# Byte bounding is opt-in: sizing a value the caller did not measure means
+# JSON-encoding it on every store.
+DEFAULT_MAX_BYTES = None
+
+
+@dataclass
+class _Entry:
+  value: Any
+  size: int
+  sources: dict[Path, str | None]
+  generation: int
+
+
+def _approximate_size(value: Any) -> int:
+  """Return the length of a value's JSON encoding."""
+  try:
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+  except (TypeError, ValueError):
+    return 0
+
+
+class BoundedCache:
+  """LRU cache bounded by entries and bytes, validated against sources."""
+
+  def __init__(
+    self,
+    repository,
+    max_entries: int | None = DEFAULT_MAX_ENTRIES,
+    max_bytes: int | None = DEFAULT_MAX_BYTES,
+  ):
+    """Create an empty cache.
+
+    Args:
+      repository: The `SchemaRepository` source digests are read from.
+      max_entries: Most entries kept; None for no limit.
+      max_bytes: Most bytes kept; None (the default) for no limit, in which
+        case values are never sized.
+
+    """
+    self.repository = repository
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.invalidations = 0
+    self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    """Return the number of entries."""
+    return len(self._entries)
+
+  def __contains__(self, key: Hashable) -> bool:
+    """Return whether `key` has an entry (without validating it)."""
+    return key in self._entries
+
+  def reset_stats(self) -> None:
+    """Zero the counters, e.g. at the start of a rebuild."""
+    with self._lock:
+      self.hits = self.misses = self.evictions = self.invalidations = 0
+
+  def _is_current(self, entry: _Entry) -> bool:
+    generation = self.repository.generation
+    if entry.generation == generation:
+      return True
+    if any(
+      self.repository.digest(path) != digest
+      for path, digest in entry.sources.items()
+    ):
+      return False
+    entry.generation = generation
+    return True
+
+  def _drop(self, key: Hashable) -> None:
+    self.bytes -= self._entries.pop(key).size
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    """Return the value for `key`, or `default` if missing or stale."""
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None and not self._is_current(entry):
+        self._drop(key)
+        self.invalidations += 1
+        entry = None
+      if entry is None:
+        self.misses += 1
+        return default
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry.value
+
+  def put(
+    self,
+    key: Hashable,
+    value: Any,
+    sources: Iterable[str | Path] = (),
+    size: int | None = None,
+  ) -> None:
+    """Store `value`, computed from the files in `sources`.
+
+    `size` is the value's size in bytes, if the caller already knows it
+    (e.g. the length of the text it was parsed from). Without it, the value
+    is sized by its JSON encoding, but only while `max_bytes` is set.
+    """
+    sources = {
+      Path(path).resolve(): self.repository.digest(path) for path in sources
+    }
+    if size is None:
+      size = _approximate_size(value) if self.max_bytes is not None else 0
+    with self._lock:
+      if key in self._entries:
+        self._drop(key)
+      if self.max_bytes is not None and size > self.max_bytes:
+        return
+      self._entries[key] = _Entry(
+        value, size, sources, self.repository.generation
+      )
+      self.bytes += size
+      while self._entries and (
+        (self.max_entries is not None and len(self._entries) > self.max_entries)
+        or (self.max_bytes is not None and self.bytes > self.max_bytes)
+      ):
+        self._drop(next(iter(self._entries)))
+        self.evictions += 1
+
+  def summary(self, name: str = "Cache") -> str:
+    """Return a one-line stats summary for the build log."""
+    size = f" ({self.bytes / 1024:.0f} KiB)" if self.max_bytes else ""
+    return (
+      f"{name}: {len(self._entries)} entries{size}, {self.hits} hits, "
+      f"{self.misses} misses, {self.evictions} evictions, "
+      f"{self.invalidations} invalidated"
+    )
+
+
+_caches: dict[tuple, BoundedCache] = {}
+
+
+def get_bounded_cache(
+  repository,
+  namespace: tuple = (),
+  max_entries: int | None = DEFAULT_MAX_ENTRIES,
+  max_bytes: int | None = DEFAULT_MAX_BYTES,
+) -> BoundedCache:
+  """Return the process-wide cache for a repository and namespace.
+
+  The bounds are updated (and enforced on the next store) if they changed,
+  e.g. after `mkdocs.yml` was edited during `mkdocs serve`.
+  """
+  key = (id(repository), namespace)
+  cache = _caches.get(key)
+  if cache is None or cache.repository is not repository:
+    cache = _caches[key] = BoundedCache(repository, max_entries, max_bytes)
+  cache.max_entries = max_entries
+  cache.max_bytes = max_bytes
+  cache.reset_stats()
+  return cache
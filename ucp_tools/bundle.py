@@ -0,0 +1,198 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Single-file bundles of a schema and everything it references.
+
+Every file reachable through relative `$ref`s is embedded once under the
+root's `$defs`, keyed by its path ('shopping.types.line_item'), and every
+ref is rewritten to a local `#/$defs/...` pointer. Unlike the in-place
+inlining of `Resolver(bundle=True)`, shared types appear once and cyclic
+refs stay valid, so a client can validate against a single file.
+"""
+
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from ucp_tools.openapi_index import get_operation_index
+from ucp_tools.resolver import Resolver
+
+# Schemas bundled, relative to the source directory
+BUNDLE_ROOTS_GLOB = "schemas/shopping/*.json"
+# Service definition whose operations decide the per-variant bundles
+OPERATIONS_SPEC = "services/shopping/openapi.json"
+# Request operations published as '<entity>.<operation>_request' variants
+REQUEST_OPERATIONS = ("create", "update", "complete")
+# Responses are resolved for 'read', matching the documentation tables.
+RESPONSE_OPERATION = "read"
+
+
+def variant_name(direction: str | None, operation: str | None) -> str:
+  """Return the artifact infix for a variant, e.g. 'create_request'."""
+  if direction is None:
+    return ""
+  return f"{operation}_{direction}"
+
+
+def bundle_schema(
+  path: str | Path,
+  load: Callable[[Path], Any],
+  source_dir: str | Path,
+) -> dict[str, Any]:
+  """Return `path` with every referenced file embedded under `$defs`.
+
+  Args:
+    path: The root schema file.
+    load: Returns the document for a (resolved) file path, e.g.
+      `SchemaRepository.load` or `Resolver.document`. Documents are not
+      modified.
+    source_dir: Directory `$defs` keys are derived relative to.
+
+  Returns:
+    The bundled schema. Embedded documents lose `$id` and `$schema`, since
+    their local refs are rewritten relative to the bundle root.
+
+  """
+  root_path = Path(path).resolve()
+  source_dir = Path(source_dir).resolve()
+  root = load(root_path)
+  taken = set(root.get("$defs", {})) if isinstance(root, dict) else set()
+  keys: dict[Path, str] = {}
+  pending: list[Path] = []
+
+  def def_key(target: Path) -> str | None:
+    if target == root_path:
+      return None
+    if target not in keys:
+      try:
+        relative = target.relative_to(source_dir)
+      except ValueError:
+        relative = Path(target.name)
+      parts = relative.with_suffix("").parts
+      if parts[0] == "schemas" and len(parts) > 1:
+        parts = parts[1:]
+      key = ".".join(parts)
+      while key in taken:
+        key += "_"
+      taken.add(key)
+      keys[target] = key
+      pending.append(target)
+    return keys[target]
+
+  def rewrite(node: Any, base: Path, base_key: str | None) -> Any:
+    if isinstance(node, list):
+      return [rewrite(item, base, base_key) for item in node]
+    if not isinstance(node, dict):
+      return node
+    result = {}
+    for key, value in node.items():
+      if (
+        key == "$ref"
+        and isinstance(value, str)
+        and not value.startswith(("http://", "https://"))
+      ):
+        file_part, _, fragment = value.partition("#")
+        target = (base.parent / file_part).resolve() if file_part else base
+        target_key = def_key(target) if file_part else base_key
+        prefix = "#" if target_key is None else f"#/$defs/{target_key}"
+        result[key] = prefix + fragment
+      else:
+        result[key] = rewrite(value, base, base_key)
+    return result
+
+  bundled = rewrite(root, root_path, None)
+  embedded = {}
+  while pending:
+    target = pending.pop(0)
+    document = rewrite(load(target), target, keys[target])
+    if isinstance(document, dict):
+      for key in ("$id", "$schema"):
+        document.pop(key, None)
+    embedded[keys[target]] = document
+  if embedded:
+    bundled["$defs"] = {**bundled.get("$defs", {}), **embedded}
+  return bundled
+
+
+def bundle_variants(
+  path: str | Path,
+  load: Callable[[Path], Any],
+  source_dir: str | Path,
+  variants: Iterable[tuple[str, str]],
+) -> dict[str, dict[str, Any]]:
+  """Bundle a schema as-is and for each (direction, operation) variant.
+
+  Returns:
+    {variant name: bundle}, where '' is the unresolved schema with its
+    `ucp_request` / `ucp_response` annotations intact.
+
+  """
+  bundles = {"": bundle_schema(path, load, source_dir)}
+  for direction, operation in variants:
+    resolver = Resolver(direction, operation, loader=load)
+    bundles[variant_name(direction, operation)] = bundle_schema(
+      path, resolver.document, source_dir
+    )
+  return bundles
+
+
+def operation_variants(
+  index, entities: Iterable[str]
+) -> dict[str, tuple[tuple[str, str], ...]]:
+  """Map each entity to the variants its operations in `index` need.
+
+  An entity gets a '<op>_request' variant for every create / update /
+  complete operation named '<op>_<entity>' (e.g. 'create_checkout'), and a
+  'read_response' variant if it has any operation at all.
+  """
+  verbs: dict[str, set[str]] = {entity: set() for entity in entities}
+  served: set[str] = set()
+  for operation in index:
+    if operation.is_webhook:
+      continue
+    verb, _, entity = operation.operation_id.partition("_")
+    if entity in verbs:
+      verbs[entity].add(verb)
+      served.add(entity)
+  return {
+    entity: tuple(
+      ("request", op) for op in REQUEST_OPERATIONS if op in entity_verbs
+    )
+    + ((("response", RESPONSE_OPERATION),) if entity in served else ())
+    for entity, entity_verbs in verbs.items()
+  }
+
+
+def plan_bundles(
+  repository, source_dir: str | Path, with_variants: bool = True
+) -> dict[str, tuple[tuple[str, str], ...]]:
+  """Return {source-relative path: variants} for every schema to bundle.
+
+  Each top-level shopping schema is bundled; its variants follow the
+  operations of the shopping REST service (see `operation_variants`), or
+  there are none if `with_variants` is false.
+  """
+  source_dir = Path(source_dir)
+  roots = sorted(source_dir.glob(BUNDLE_ROOTS_GLOB))
+  if not with_variants:
+    return {root.relative_to(source_dir).as_posix(): () for root in roots}
+  try:
+    index = get_operation_index(repository, source_dir / OPERATIONS_SPEC)
+  except (OSError, ValueError):
+    index = ()
+  variants = operation_variants(index, [root.stem for root in roots])
+  return {
+    root.relative_to(source_dir).as_posix(): variants[root.stem]
+    for root in roots
+  }
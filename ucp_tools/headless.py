@@ -0,0 +1,381 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Render the documentation macros without MkDocs (`python -m main`).
+
+Every literal macro call in the Markdown pages is evaluated through the
+macros `main.define_env` registers, and either the pages with the calls
+expanded or a JSON map of each call's output is written out. Only macro
+calls are expanded; other Jinja (variables such as `{{ ucp_url }}`) is left
+as-is, so the output is for reviewing and diffing tables, not publishing.
+
+Pages are rendered on spawned worker processes, each running its own
+`define_env` like a separate build would.
+
+`python -m main snapshot` renders the pages once with the CLI backend to
+(re)write the ucp-schema snapshot, and `--verify` lists its stale entries;
+see `ucp_tools.snapshot`.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+import fnmatch
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+import sys
+import time
+from types import ModuleType
+from typing import Any
+
+OUTPUT_FORMATS = ("markdown", "json")
+DEFAULT_OUTPUT_DIR = Path(".cache/rendered")
+# File written by the 'json' format in the output directory
+JSON_MAP_NAME = "macros.json"
+
+
+class HeadlessEnv:
+  """The parts of the mkdocs-macros `env` that `main.define_env` uses."""
+
+  def __init__(self, conf, variables: dict[str, Any] | None = None):
+    """Create an env for an MkDocs config.
+
+    Args:
+      conf: The MkDocs config (or the dict from `headless_conf`), exposed
+        as `env.conf`.
+      variables: Overrides for `extra`, which becomes `env.variables`.
+
+    """
+    self.conf = conf
+    self.variables = {**(conf.get("extra") or {}), **(variables or {})}
+    self.macros: dict[str, Any] = {}
+
+  def macro(self, function, name: str = ""):
+    """Register a macro, like `env.macro`."""
+    self.macros[name or function.__name__] = function
+    return function
+
+
+def load_module(path: str | Path, name: str = "main") -> ModuleType:
+  """Execute a module file anew, as mkdocs-macros does with `main.py`."""
+  spec = importlib.util.spec_from_file_location(name, path)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+
+def headless_conf(config_file: str | Path) -> dict[str, Any]:
+  """Return the settings `define_env` reads from an `mkdocs.yml`.
+
+  The file is only parsed; no theme or plugin is loaded.
+  """
+  from mkdocs.utils import yaml_load
+
+  config_file = Path(config_file).resolve()
+  with config_file.open("rb") as f:
+    config = yaml_load(f) or {}
+  return {
+    "config_file_path": str(config_file),
+    "docs_dir": str(config_file.parent / config.get("docs_dir", "docs")),
+    "extra": config.get("extra") or {},
+  }
+
+
+@dataclass
+class MacroCall:
+  """One evaluated macro call."""
+
+  macro: str
+  args: list
+  kwargs: dict
+  # 1-based line of the call in the page source
+  line: int
+  output: str
+  # 'ExceptionType: message' if the macro raised; the call is then kept
+  error: str | None = None
+
+
+@dataclass
+class PageResult:
+  """A page with its macro calls expanded."""
+
+  src_path: str
+  markdown: str
+  calls: list[MacroCall] = field(default_factory=list)
+
+
+class Renderer:
+  """Expands macro calls with the macros of one `define_env` call."""
+
+  def __init__(self, main_path, conf, variables=None):
+    """Load `main_path` and run its `define_env`.
+
+    Args:
+      main_path: Path of `main.py`.
+      conf: Settings from `headless_conf`.
+      variables: Overrides for `extra`.
+
+    """
+    self.module = load_module(main_path)
+    self.env = HeadlessEnv(conf, variables)
+    self.docs_dir = Path(conf["docs_dir"])
+    self.module.define_env(self.env)
+
+  def render(self, page: Path) -> PageResult:
+    """Return `page` with its literal macro calls expanded."""
+    text = page.read_text(encoding="utf-8")
+    calls = []
+
+    def expand(match):
+      name = match.group(1)
+      parsed = self.module._parse_macro_call(match)
+      if parsed is None or name not in self.env.macros:
+        return match.group(0)
+      args, kwargs = parsed
+      line = text.count("\n", 0, match.start()) + 1
+      try:
+        output = str(self.env.macros[name](*args, **kwargs))
+        error = None
+      except Exception as e:
+        output, error = match.group(0), f"{type(e).__name__}: {e}"
+      calls.append(MacroCall(name, args, kwargs, line, output, error))
+      return output
+
+    markdown = self.module.MACRO_CALL_PATTERN.sub(expand, text)
+    return PageResult(
+      page.relative_to(self.docs_dir).as_posix(), markdown, calls
+    )
+
+
+# Per-process renderer of a pool worker, set by `_init_render_worker`.
+_worker_renderer: Renderer | None = None
+
+
+def _init_render_worker(main_path, conf, variables):
+  global _worker_renderer
+  _worker_renderer = Renderer(main_path, conf, variables)
+
+
+def _render_in_worker(page):
+  return _worker_renderer.render(page)
+
+
+def render_pages(
+  main_path, conf, pages: list[Path], variables=None, workers: int = 0
+) -> list[PageResult]:
+  """Render `pages`, on `workers` processes if more than one.
+
+  Results come back in page order.
+  """
+  variables = {"ucp_profile": False, **(variables or {})}
+  if workers > 1 and len(pages) > 1:
+    # Each worker renders only some pages, so it should not prefetch the
+    # schemas of all of them.
+    variables.setdefault("ucp_prefetch_workers", 0)
+    repo_dir = str(Path(main_path).resolve().parent)
+    if repo_dir not in sys.path:
+      sys.path.insert(0, repo_dir)
+    with ProcessPoolExecutor(
+      max_workers=min(workers, len(pages)),
+      mp_context=multiprocessing.get_context("spawn"),
+      initializer=_init_render_worker,
+      initargs=(main_path, conf, variables),
+    ) as pool:
+      return list(pool.map(_render_in_worker, pages))
+  renderer = Renderer(main_path, conf, variables)
+  return [renderer.render(page) for page in pages]
+
+
+def write_results(results: list[PageResult], output_dir: Path, fmt: str):
+  """Write expanded pages, or the JSON map of every call, to `output_dir`."""
+  output_dir.mkdir(parents=True, exist_ok=True)
+  if fmt == "markdown":
+    for result in results:
+      path = output_dir / result.src_path
+      path.parent.mkdir(parents=True, exist_ok=True)
+      path.write_text(result.markdown, encoding="utf-8")
+    return
+  calls = {
+    result.src_path: [asdict(call) for call in result.calls]
+    for result in results
+    if result.calls
+  }
+  with (output_dir / JSON_MAP_NAME).open("w", encoding="utf-8") as f:
+    json.dump(calls, f, indent=2, sort_keys=True)
+    f.write("\n")
+
+
+def _render_command(main_path: Path, conf, pages, args) -> int:
+  variables = {}
+  if args.resolver:
+    variables["ucp_schema_resolver"] = args.resolver
+
+  started = time.perf_counter()
+  results = render_pages(main_path, conf, pages, variables, args.workers)
+  write_results(results, args.output, args.format)
+  elapsed = time.perf_counter() - started
+
+  failed = [
+    f"{result.src_path}:{call.line} {call.macro}: {call.error}"
+    for result in results
+    for call in result.calls
+    if call.error
+  ]
+  for failure in failed:
+    print(f"Error: {failure}", file=sys.stderr)
+  print(
+    f"Rendered {sum(len(result.calls) for result in results)} macro calls "
+    f"on {len(results)} pages in {elapsed:.2f}s "
+    f"({max(1, min(args.workers, len(pages)))} worker(s)); "
+    f"wrote {args.output}"
+  )
+  return 1 if failed else 0
+
+
+def _snapshot_command(main_path: Path, conf, pages, args) -> int:
+  from ucp_tools.ref_graph import REF_GRAPH_CACHE, get_ref_graph
+  from ucp_tools.repository import get_repository
+  from ucp_tools.schema_cache import ResolutionCache
+  from ucp_tools.snapshot import SNAPSHOT_PATH, SchemaSnapshot
+
+  if not args.verify:
+    if not shutil.which("ucp-schema"):
+      print("Error: ucp-schema not found; `cargo install ucp-schema` first.")
+      return 1
+    # One in-process render records every variant the docs resolve.
+    renderer = Renderer(
+      main_path,
+      conf,
+      {
+        "ucp_profile": False,
+        "ucp_schema_resolver": "cli",
+        "ucp_schema_snapshot": "write",
+      },
+    )
+    for page in pages:
+      renderer.render(page)
+    renderer.module.on_post_build(renderer.env)
+    snapshot = renderer.module._schema_snapshot
+    print(f"Wrote {len(snapshot.entries)} resolved variants to {snapshot.path}")
+    return 0
+
+  module = load_module(main_path)
+  repository = get_repository(module.SOURCE_DIR)
+  snapshot = SchemaSnapshot.load(
+    SNAPSHOT_PATH,
+    repository,
+    module.SOURCE_DIR,
+    get_ref_graph(repository, module.SOURCE_DIR, REF_GRAPH_CACHE),
+    ResolutionCache(module.SCHEMA_CACHE_DIR).tool_version,
+  )
+  if not snapshot.entries:
+    print(f"Error: no snapshot at {SNAPSHOT_PATH}")
+    return 1
+  stale = snapshot.verify()
+  for variant, reason in stale:
+    print(f"Stale: {variant} ({reason})")
+  print(
+    f"{len(stale)} of {len(snapshot.entries)} snapshot entries stale "
+    f"against {module.SOURCE_DIR}/"
+  )
+  return 1 if stale else 0
+
+
+def main(main_path: Path, argv: list[str] | None = None) -> int:
+  """Command line of `python -m main`; returns the exit code."""
+  parser = argparse.ArgumentParser(
+    prog="python -m main",
+    description="Documentation macros for the UCP site.",
+  )
+  docs_options = argparse.ArgumentParser(add_help=False)
+  docs_options.add_argument(
+    "--config",
+    type=Path,
+    default=Path("mkdocs.yml"),
+    help="MkDocs config to read docs_dir and extra from (default: %(default)s)",
+  )
+  docs_options.add_argument(
+    "--docs-dir",
+    type=Path,
+    help="Pages to render, e.g. a generated corpus' docs/ (default: the "
+    "config's docs_dir)",
+  )
+  docs_options.add_argument(
+    "--page",
+    action="append",
+    help="Only render pages matching this glob, relative to docs_dir "
+    "(repeatable)",
+  )
+  commands = parser.add_subparsers(dest="command", required=True)
+  render = commands.add_parser(
+    "render",
+    parents=[docs_options],
+    help="Expand the macro calls in the docs without MkDocs.",
+  )
+  render.add_argument(
+    "--output",
+    type=Path,
+    default=DEFAULT_OUTPUT_DIR,
+    help="Directory to write to (default: %(default)s)",
+  )
+  render.add_argument(
+    "--format",
+    choices=OUTPUT_FORMATS,
+    default="markdown",
+    help="Expanded pages, or a JSON map of every call (default: %(default)s)",
+  )
+  render.add_argument(
+    "--workers",
+    type=int,
+    default=os.cpu_count() or 1,
+    help="Worker processes; 0 or 1 renders in-process (default: %(default)s)",
+  )
+  render.add_argument(
+    "--resolver",
+    help="Override extra.ucp_schema_resolver",
+  )
+  snapshot = commands.add_parser(
+    "snapshot",
+    parents=[docs_options],
+    help="Save the ucp-schema output the docs need to generated/.",
+  )
+  snapshot.add_argument(
+    "--verify",
+    action="store_true",
+    help="Only list snapshot entries stale against source/; exit 1 if any",
+  )
+  args = parser.parse_args(argv)
+  logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+  conf = headless_conf(args.config)
+  if args.docs_dir:
+    conf["docs_dir"] = str(args.docs_dir.resolve())
+  docs_dir = Path(conf["docs_dir"])
+  pages = [
+    page
+    for page in sorted(docs_dir.rglob("*.md"))
+    if not args.page
+    or any(
+      fnmatch.fnmatch(page.relative_to(docs_dir).as_posix(), pattern)
+      for pattern in args.page
+    )
+  ]
+  if args.command == "snapshot":
+    return _snapshot_command(main_path, conf, pages, args)
+  return _render_command(main_path, conf, pages, args)
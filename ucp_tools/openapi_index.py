@@ -0,0 +1,265 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""operationId index over OpenAPI and OpenRPC service definitions.
+
+Each spec file is scanned once into a map from operationId (OpenAPI) or
+method name (OpenRPC) to an `Operation` carrying everything the
+`method_fields` and `header_fields` macros need, with local `#/...`
+parameter and header `$ref`s already resolved. Indexes are rebuilt only
+when the file's content digest changes.
+"""
+
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path
+from typing import Any
+
+log = logging.getLogger("mkdocs")
+
+SUCCESS_RESPONSE_CODES = ("200", "201")
+
+
+def _resolve_local_ref(ref: Any, document: Any) -> Any | None:
+  """Follow a '#/a/b' ref within `document`; None if it cannot be followed."""
+  if not isinstance(ref, str) or not ref.startswith("#/"):
+    return None
+  current = document
+  for part in ref[2:].split("/"):
+    if isinstance(current, dict) and part in current:
+      current = current[part]
+    elif isinstance(current, list) and part.isdigit():
+      index = int(part)
+      if index >= len(current):
+        return None
+      current = current[index]
+    else:
+      return None
+  return current
+
+
+def _resolve_structure(schema: dict[str, Any], root: dict[str, Any]):
+  """Resolve only the top-level ref and 'allOf' children of a body schema.
+
+  This fixes the "Complete Checkout" table without expanding every property.
+  """
+  if not schema:
+    return schema
+  # 1. Resolve Top-Level Ref (e.g. "create_checkout")
+  if "$ref" in schema and schema["$ref"].startswith("#/"):
+    resolved = _resolve_local_ref(schema["$ref"], root)
+    if resolved:
+      schema = resolved
+
+  # 2. Resolve Composition Refs (e.g. "complete_checkout" response)
+  if "allOf" in schema:
+    new_all_of = []
+    for item in schema["allOf"]:
+      if "$ref" in item and item["$ref"].startswith("#/"):
+        resolved = _resolve_local_ref(item["$ref"], root)
+        new_all_of.append(resolved if resolved else item)
+      else:
+        new_all_of.append(item)
+    # Copy rather than mutate: the document is shared via the repository.
+    schema = {**schema, "allOf": new_all_of}
+  return schema
+
+
+@dataclass(frozen=True)
+class Operation:
+  """One indexed operation (or OpenRPC method)."""
+
+  operation_id: str
+  # Path template, webhook name or OpenRPC method name
+  location: str
+  # HTTP method, or "rpc" for OpenRPC methods
+  method: str
+  is_webhook: bool
+  operation: dict[str, Any]
+  # Path-level then operation-level parameters, refs resolved
+  parameters: tuple[dict[str, Any], ...] = ()
+  # Headers of the 200 response, each with its 'name', refs resolved
+  response_headers: tuple[dict[str, Any], ...] = ()
+  request_schema: dict[str, Any] = field(default_factory=dict)
+  response_schema: dict[str, Any] = field(default_factory=dict)
+
+  @property
+  def header_parameters(self) -> list[dict[str, Any]]:
+    """Return the request parameters sent as HTTP headers."""
+    return [p for p in self.parameters if p.get("in") == "header"]
+
+
+class OperationIndex:
+  """Maps operationIds / method names of one spec document to operations."""
+
+  def __init__(self, document: dict[str, Any], name: str = "spec"):
+    """Index every operation in an OpenAPI or OpenRPC document."""
+    self.document = document
+    self.name = name
+    self._operations: dict[str, Operation] = {}
+    if "openrpc" in document:
+      self._index_openrpc(document)
+    else:
+      self._index_openapi(document)
+
+  def _resolve_parameters(self, parameters: list[Any]):
+    resolved = []
+    for param in parameters:
+      if isinstance(param, dict) and "$ref" in param:
+        target = _resolve_local_ref(param["$ref"], self.document)
+        if isinstance(target, dict):
+          param = target
+        else:
+          # Kept as written, so method_fields treats it as before indexing
+          log.warning(
+            "%s: parameter $ref %r cannot be resolved", self.name, param["$ref"]
+          )
+      if isinstance(param, dict):
+        resolved.append(param)
+    return tuple(resolved)
+
+  def _response_headers(self, operation: dict[str, Any]):
+    headers = operation.get("responses", {}).get("200", {}).get("headers", {})
+    resolved = []
+    for name, header in headers.items():
+      if "$ref" in header:
+        target = _resolve_local_ref(header["$ref"], self.document)
+        if target:
+          resolved.append({**target, "name": name})
+        else:
+          resolved.append({"name": name, "description": "Ref not resolved"})
+      else:
+        resolved.append({**header, "name": name})
+    return tuple(resolved)
+
+  def _body_schemas(self, operation: dict[str, Any]):
+    req_content = operation.get("requestBody", {}).get("content", {})
+    req_schema = req_content.get("application/json", {}).get("schema", {})
+
+    res_schema = {}
+    responses = operation.get("responses", {})
+    for code in SUCCESS_RESPONSE_CODES:
+      if code in responses:
+        res_content = responses[code].get("content", {})
+        res_schema = res_content.get("application/json", {}).get("schema", {})
+        break
+
+    return (
+      _resolve_structure(req_schema, self.document),
+      _resolve_structure(res_schema, self.document),
+    )
+
+  def _index_openapi(self, document: dict[str, Any]) -> None:
+    # Paths first, then webhooks (OpenAPI 3.1+); the first match wins.
+    sections = (
+      (document.get("paths", {}), False),
+      (document.get("webhooks", {}), True),
+    )
+    for items, is_webhook in sections:
+      for location, path_item in items.items():
+        path_parameters = [] if is_webhook else path_item.get("parameters", [])
+        for method, op_data in path_item.items():
+          if not isinstance(op_data, dict):
+            continue
+          operation_id = op_data.get("operationId")
+          if not operation_id or operation_id in self._operations:
+            continue
+          request_schema, response_schema = self._body_schemas(op_data)
+          self._operations[operation_id] = Operation(
+            operation_id=operation_id,
+            location=location,
+            method=method,
+            is_webhook=is_webhook,
+            operation=op_data,
+            parameters=self._resolve_parameters(
+              path_parameters + op_data.get("parameters", [])
+            ),
+            response_headers=self._response_headers(op_data),
+            request_schema=request_schema,
+            response_schema=response_schema,
+          )
+
+  def _index_openrpc(self, document: dict[str, Any]) -> None:
+    # OpenRPC params become the properties of a single request object.
+    for method in document.get("methods", []):
+      name = method.get("name") if isinstance(method, dict) else None
+      if not name or name in self._operations:
+        continue
+      properties = {}
+      required = []
+      for param in self._resolve_parameters(method.get("params", [])):
+        param_name = param.get("name")
+        if not param_name:
+          continue
+        prop_schema = dict(param.get("schema", {}))
+        if "description" in param:
+          prop_schema["description"] = param["description"]
+        properties[param_name] = prop_schema
+        if param.get("required"):
+          required.append(param_name)
+      request_schema = (
+        {"properties": properties, "required": required} if properties else {}
+      )
+      result = method.get("result", {})
+      if "$ref" in result:
+        result = _resolve_local_ref(result["$ref"], document) or {}
+      self._operations[name] = Operation(
+        operation_id=name,
+        location=name,
+        method="rpc",
+        is_webhook=False,
+        operation=method,
+        request_schema=request_schema,
+        response_schema=_resolve_structure(result.get("schema", {}), document),
+      )
+
+  def get(self, operation_id: str) -> Operation | None:
+    """Return the operation with this operationId / method name."""
+    return self._operations.get(operation_id)
+
+  def __contains__(self, operation_id: str) -> bool:
+    """Return whether the operationId / method name is indexed."""
+    return operation_id in self._operations
+
+  def __iter__(self):
+    """Iterate over the indexed operations in document order."""
+    return iter(self._operations.values())
+
+  def __len__(self) -> int:
+    """Return the number of indexed operations."""
+    return len(self._operations)
+
+
+_indexes: dict[Path, tuple[str, OperationIndex]] = {}
+
+
+def get_operation_index(repository, path: str | Path) -> OperationIndex:
+  """Return the index for a spec file, rebuilding it if the file changed.
+
+  Args:
+    repository: The `SchemaRepository` the spec file is read through.
+    path: Path of the OpenAPI or OpenRPC document.
+
+  Raises:
+    FileNotFoundError: The file does not exist.
+    json.JSONDecodeError: The file is not valid JSON.
+
+  """
+  document = repository.load(path)
+  digest = repository.digest(path)
+  key = Path(path).resolve()
+  cached = _indexes.get(key)
+  if cached is None or cached[0] != digest:
+    cached = _indexes[key] = (digest, OperationIndex(document, str(path)))
+  return cached[1]
@@ -0,0 +1,187 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Per-page macro output, reused while nothing the page read has changed.
+
+While a page's macros render, every source file read through the schema
+repository is recorded (see `DependencyRecorder`), along with the files a
+resolved schema pulls in through `$ref`. On the next `mkdocs serve`
+reload, a page whose Markdown and recorded files are byte-for-byte the
+same gets its previous macro output back instead of being rendered again.
+Adding or removing a source file drops every page, since lookups by name
+or directory scans may now find something else.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import hashlib
+from pathlib import Path
+import threading
+
+
+class DependencyRecorder:
+  """Collects the files read while a capture is active on this thread.
+
+  Captures nest: a file read inside a nested capture (e.g. a memoized table
+  rendered for a page) is recorded in every enclosing one too.
+  """
+
+  def __init__(self):
+    """Create a recorder with no active capture."""
+    self._local = threading.local()
+
+  def _stack(self) -> list[set[Path]]:
+    stack = getattr(self._local, "stack", None)
+    if stack is None:
+      stack = self._local.stack = []
+    return stack
+
+  @property
+  def active(self) -> bool:
+    """Return whether a capture is active on this thread."""
+    return bool(self._stack())
+
+  def start(self) -> set[Path]:
+    """Begin a capture; returns the set the files are collected into."""
+    deps: set[Path] = set()
+    self._stack().append(deps)
+    return deps
+
+  def stop(self, deps: set[Path]) -> frozenset[Path]:
+    """End the capture `start()` returned `deps` for."""
+    stack = self._stack()
+    for index, open_deps in enumerate(stack):
+      if open_deps is deps:
+        # Drop it and anything an exception left open inside it.
+        del stack[index:]
+        break
+    return frozenset(deps)
+
+  def record(self, paths: Iterable[Path]) -> None:
+    """Add (absolute) paths to every active capture."""
+    stack = self._stack()
+    if stack:
+      paths = tuple(paths)
+      for deps in stack:
+        deps.update(paths)
+
+
+@dataclass
+class _Page:
+  """The macro output of one page and what it was rendered from."""
+
+  source: str
+  output: str
+  deps: dict[Path, str | None]
+
+
+def _digest(text: str) -> str:
+  return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+  """Macro output per page, checked against the files each page read."""
+
+  def __init__(self, repository):
+    """Create an empty cache recording reads through `repository`."""
+    self.repository = repository
+    self.recorder = DependencyRecorder()
+    self.reused = 0
+    self.rendered = 0
+    self._entries: dict[str, _Page] = {}
+    self._pending: dict[str, tuple[str, set[Path]]] = {}
+    self._generation = repository.generation
+    self._files = frozenset(repository.paths())
+
+  def reset_stats(self) -> None:
+    """Zero the counters, e.g. at the start of a rebuild."""
+    self.reused = self.rendered = 0
+
+  def _validate(self) -> None:
+    if self.repository.generation != self._generation:
+      self._generation = self.repository.generation
+      files = frozenset(self.repository.paths())
+      if files != self._files:
+        self._entries.clear()
+        self._files = files
+
+  def _deps_current(self, entry: _Page) -> bool:
+    return all(
+      self.repository.digest(path) == digest
+      for path, digest in entry.deps.items()
+    )
+
+  def is_current(self, page: str, source: str) -> bool:
+    """Return whether `page`'s cached output is still valid for `source`."""
+    self._validate()
+    entry = self._entries.get(page)
+    return (
+      entry is not None
+      and entry.source == _digest(source)
+      and self._deps_current(entry)
+    )
+
+  def affected(self, page: str) -> bool:
+    """Return whether `page` has no output or read a file that changed."""
+    self._validate()
+    entry = self._entries.get(page)
+    return entry is None or not self._deps_current(entry)
+
+  def begin(self, page: str, source: str) -> str | None:
+    """Start rendering `page`; returns its cached output if still valid.
+
+    On a miss, the files read until `finish()` are recorded for the page.
+    """
+    if self.is_current(page, source):
+      self.reused += 1
+      return self._entries[page].output
+    self._pending[page] = (source, self.recorder.start())
+    return None
+
+  def finish(self, page: str, output: str) -> None:
+    """Store the output of a page whose rendering `begin()` started."""
+    pending = self._pending.pop(page, None)
+    if pending is None:
+      return
+    source, deps = pending
+    self.rendered += 1
+    self._entries[page] = _Page(
+      _digest(source),
+      output,
+      {path: self.repository.digest(path) for path in self.recorder.stop(deps)},
+    )
+
+  def summary(self) -> str:
+    """Return a one-line summary for the build log."""
+    return (
+      f"Page cache: reused macro output of {self.reused} page(s), "
+      f"rendered {self.rendered}"
+    )
+
+
+_caches: dict[tuple, PageCache] = {}
+
+
+def get_page_cache(repository, namespace: tuple = ()) -> PageCache:
+  """Return the process-wide page cache for a repository and namespace.
+
+  As with `get_render_cache`, `namespace` should identify everything else
+  the output depends on, e.g. the macro code and `mkdocs.yml`.
+  """
+  key = (id(repository), namespace)
+  cache = _caches.get(key)
+  if cache is None or cache.repository is not repository:
+    cache = _caches[key] = PageCache(repository)
+  cache.reset_stats()
+  return cache
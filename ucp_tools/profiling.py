@@ -0,0 +1,228 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Opt-in wall/CPU timing of the build's macros, resolver and hook.
+
+Enabled with `extra.ucp_profile` in `mkdocs.yml`. Instrumented code opens
+named spans (`profiler.span(...)`, `@profiled(...)`), and the profiler keeps
+a call count and total wall and CPU time per name plus, for Chrome traces,
+every individual span. Times are inclusive: a macro's span contains the
+`create_link` and table-rendering spans it calls. CPU time is per thread
+(`time.thread_time`), so prefetch workers are not charged to each other.
+
+When disabled, a span costs one attribute check.
+"""
+
+from collections.abc import Callable
+import contextlib
+from dataclasses import dataclass
+import functools
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+# Default report location, relative to the checkout
+DEFAULT_PROFILE_PATH = Path(".cache/ucp-profile.json")
+PROFILE_FORMATS = ("json", "chrome")
+DEFAULT_TOP_N = 20
+
+
+@dataclass
+class Span:
+  """An open span; code inside it may rename it, e.g. once it hit a cache."""
+
+  name: str
+
+
+@dataclass
+class SpanStats:
+  """Totals for every span recorded under one name."""
+
+  category: str
+  count: int = 0
+  wall: float = 0.0
+  cpu: float = 0.0
+
+
+class Profiler:
+  """Collects span timings; disabled until `start()` is called."""
+
+  def __init__(self):
+    """Create a disabled profiler."""
+    self.enabled = False
+    self.path = DEFAULT_PROFILE_PATH
+    self.format = "json"
+    self.top_n = DEFAULT_TOP_N
+    self.stats: dict[str, SpanStats] = {}
+    self.events: list[dict[str, Any]] = []
+    self._origin = time.perf_counter()
+    self._lock = threading.Lock()
+
+  def start(
+    self,
+    path: str | Path = DEFAULT_PROFILE_PATH,
+    output_format: str = "json",
+    top_n: int = DEFAULT_TOP_N,
+  ) -> None:
+    """Discard earlier timings and start recording."""
+    self.path = Path(path)
+    self.format = output_format
+    self.top_n = top_n
+    self.stats = {}
+    self.events = []
+    self._origin = time.perf_counter()
+    self.enabled = True
+
+  def add(
+    self,
+    name: str,
+    category: str,
+    started: float,
+    wall: float,
+    cpu: float,
+    tid: int | None = None,
+  ) -> None:
+    """Record one span.
+
+    Args:
+      name: What ran, e.g. 'macro:schema_fields'.
+      category: Group for the report and the trace, e.g. 'macro'.
+      started: `time.perf_counter()` at the start of the span. The clock is
+        system-wide, so spans timed in worker processes line up.
+      wall: Elapsed wall-clock seconds.
+      cpu: CPU seconds used by the running thread.
+      tid: Thread (or worker) the span ran on; defaults to this thread.
+
+    """
+    if not self.enabled:
+      return
+    event = {
+      "name": name,
+      "cat": category,
+      "ph": "X",
+      "ts": round((started - self._origin) * 1e6, 1),
+      "dur": round(wall * 1e6, 1),
+      "pid": os.getpid(),
+      "tid": threading.get_native_id() if tid is None else tid,
+      "args": {"cpu_ms": round(cpu * 1e3, 3)},
+    }
+    with self._lock:
+      stats = self.stats.get(name)
+      if stats is None:
+        stats = self.stats[name] = SpanStats(category)
+      stats.count += 1
+      stats.wall += wall
+      stats.cpu += cpu
+      self.events.append(event)
+
+  @contextlib.contextmanager
+  def span(self, name: str, category: str = "build"):
+    """Time the enclosed block as one span, yielding a renamable `Span`."""
+    span = Span(name)
+    if not self.enabled:
+      yield span
+      return
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+      yield span
+    finally:
+      self.add(
+        span.name,
+        category,
+        started,
+        time.perf_counter() - started,
+        time.thread_time() - cpu_started,
+      )
+
+  def report(self) -> list[str]:
+    """Return the top-N spans by total wall time as report lines."""
+    ranked = sorted(self.stats.items(), key=lambda item: -item[1].wall)
+    lines = [
+      f"{'wall ms':>10} {'cpu ms':>10} {'calls':>7} {'ms/call':>9}  span",
+    ]
+    for name, stats in ranked[: self.top_n]:
+      lines.append(
+        f"{stats.wall * 1e3:10.1f} {stats.cpu * 1e3:10.1f} "
+        f"{stats.count:7d} {stats.wall * 1e3 / stats.count:9.3f}  {name}"
+      )
+    return lines
+
+  def summary(self) -> dict[str, Any]:
+    """Return the per-span totals, sorted by name, for a JSON report."""
+    return {
+      name: {
+        "category": stats.category,
+        "count": stats.count,
+        "wall_ms": round(stats.wall * 1e3, 3),
+        "cpu_ms": round(stats.cpu * 1e3, 3),
+      }
+      for name, stats in sorted(self.stats.items())
+    }
+
+  def write(self) -> Path:
+    """Write the totals ('json') or a Chrome trace ('chrome') to `path`.
+
+    Chrome traces load in chrome://tracing or https://ui.perfetto.dev.
+    """
+    if self.format == "chrome":
+      document = {
+        "traceEvents": sorted(self.events, key=lambda e: e["ts"]),
+        "displayTimeUnit": "ms",
+      }
+    else:
+      document = {"spans": self.summary()}
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    with self.path.open("w", encoding="utf-8") as f:
+      json.dump(document, f, indent=1)
+    return self.path
+
+  def stop(self) -> None:
+    """Stop recording; collected timings are kept until the next start."""
+    self.enabled = False
+
+
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+  """Return the process-wide profiler shared by the macros and the hook."""
+  return _profiler
+
+
+def profiled(name: str | None = None, category: str = "build"):
+  """Time every call of the decorated function as a span.
+
+  Args:
+    name: Span name; defaults to "<category>:<function name>".
+    category: Span category.
+
+  """
+
+  def decorate(function: Callable) -> Callable:
+    span_name = name or f"{category}:{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+      if not _profiler.enabled:
+        return function(*args, **kwargs)
+      with _profiler.span(span_name, category):
+        return function(*args, **kwargs)
+
+    return wrapper
+
+  return decorate
@@ -0,0 +1,948 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+
+"""Publishing of `source/` files into the built site.
+
+Each JSON schema gets its relative `$ref`s resolved to the target's `$id`,
+its version injected and its ucp.dev URLs versioned, in a single walk; other
+files are copied as-is. Files can be published in-process or on a process
+pool; either way results, including log records, come back in file order.
+
+Lives outside `hooks.py` because MkDocs registers hook modules under their
+file name, which spawned pool workers cannot import.
+"""
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import copy
+from dataclasses import dataclass, field
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+import sys
+import time
+
+from ucp_tools.bundle import bundle_variants
+from ucp_tools.repository import get_repository
+from ucp_tools.resolver import ResolutionError
+
+try:
+  import brotli
+except ImportError:  # Optional: only needed for .br artifacts.
+  brotli = None
+
+log = logging.getLogger("mkdocs")
+
+# URL prefix for UCP schemas that need version injection
+UCP_SCHEMA_PREFIX = "https://ucp.dev/schemas/"
+# Incremental-publish state: the manifest and a copy of every output. Kept
+# outside the site directory, which MkDocs empties on every build and
+# `serve` reload, and which is deployed as-is.
+PUBLISH_CACHE_DIR = Path(".cache/ucp-publish")
+BUILD_MANIFEST_NAME = "manifest.json"
+# Bump when publish output changes for unchanged inputs.
+BUILD_MANIFEST_FORMAT = 2
+# Per-file artifact sizes, written to the publish cache when precompressing
+SIZE_REPORT_NAME = "size-report.json"
+# Catalog of every published schema, written into each version's tree
+SCHEMA_CATALOG_PATH = "schemas/manifest.json"
+# Hex digits of the SHA-256 used in content-hashed file names
+HASH_LENGTH = 16
+
+
+class RefIdIndex:
+  """Path -> $id index used to rewrite relative $refs.
+
+  Seeded once per build from the schema repository, so each referenced file
+  is parsed at most once no matter how often it is referenced. Files
+  that cannot supply an $id are recorded with their referrers and reported
+  together by `log_summary()` instead of once per occurrence.
+  """
+
+  def __init__(self, repository):
+    """Index the `$id` of every file in `repository`."""
+    self.repository = repository
+    self._ids: dict[Path, str | None] = {}
+    self._problems: dict[Path, str] = {}
+    self._referrers: dict[Path, set[str]] = defaultdict(set)
+    for path in repository.paths():
+      self._lookup(path.resolve())
+
+  def _lookup(self, path):
+    try:
+      data = self.repository.load(path)
+    except FileNotFoundError:
+      self._problems[path] = "not found"
+      schema_id = None
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+      self._problems[path] = f"unreadable ({e})"
+      schema_id = None
+    else:
+      schema_id = data.get("$id") if isinstance(data, dict) else None
+      if not isinstance(schema_id, str):
+        schema_id = None
+    self._ids[path] = schema_id
+    return schema_id
+
+  def schema_id(self, path, referrer):
+    """Return the $id of `path`, recording `referrer` if there is none."""
+    # Files outside source/ are not pre-indexed; look them up once.
+    schema_id = self._ids[path] if path in self._ids else self._lookup(path)
+    if schema_id is None:
+      self._referrers[path].add(str(referrer))
+    return schema_id
+
+  def take_unresolved(self):
+    """Return and forget {path: (problem, referrers)} recorded so far."""
+    unresolved = {
+      path: (self._problems.get(path), referrers)
+      for path, referrers in self._referrers.items()
+    }
+    self._referrers.clear()
+    return unresolved
+
+  def merge_unresolved(self, unresolved):
+    """Record targets returned by another index's `take_unresolved()`."""
+    for path, (problem, referrers) in unresolved.items():
+      if problem:
+        self._problems[path] = problem
+      self._referrers[path].update(referrers)
+
+  def log_summary(self):
+    """Log every ref target that could not be rewritten, once each."""
+    missing = []
+    without_id = []
+    for path in sorted(self._referrers):
+      referrers = ", ".join(sorted(self._referrers[path]))
+      shown = (
+        path.relative_to(Path.cwd())
+        if path.is_relative_to(Path.cwd())
+        else path
+      )
+      problem = self._problems.get(path)
+      if problem:
+        missing.append(f"  {shown}: {problem}; referenced by {referrers}")
+      else:
+        without_id.append(f"  {shown}: referenced by {referrers}")
+    if missing:
+      log.error(
+        "Referenced files could not be read; their relative '$ref's were "
+        "kept as-is:\n" + "\n".join(missing)
+      )
+    if without_id:
+      log.warning(
+        "No '$id' found in referenced files; their relative '$ref's were "
+        "kept as-is:\n" + "\n".join(without_id)
+      )
+
+
+def _process_refs(data, current_file_dir, id_index, referrer=None):
+  """Recursively resolve relative $ref paths to absolute URLs.
+
+  Looks up the referenced file's $id in `id_index` to construct the absolute
+  URL. Only processes relative refs (not # fragments or http URLs).
+  """
+  if isinstance(data, dict):
+    for key, value in data.items():
+      if (
+        key == "$ref"
+        and isinstance(value, str)
+        and not value.startswith(("#", "http"))
+      ):
+        ref_parts = value.split("#", 1)
+        relative_path = ref_parts[0]
+        fragment = f"#{ref_parts[1]}" if len(ref_parts) > 1 else ""
+
+        if not relative_path:
+          continue
+
+        ref_file_path = (current_file_dir / relative_path).resolve()
+        schema_id = id_index.schema_id(ref_file_path, referrer)
+        if schema_id is not None:
+          data[key] = schema_id + fragment
+      else:
+        _process_refs(value, current_file_dir, id_index, referrer)
+  elif isinstance(data, list):
+    for item in data:
+      _process_refs(item, current_file_dir, id_index, referrer)
+
+
+def _rewrite_version_urls(data, url_version):
+  """Recursively rewrite ucp.dev/schemas/ URLs to include version.
+
+  Transforms: https://ucp.dev/schemas/X -> https://ucp.dev/{url_version}/schemas/X
+
+  This ensures $id matches the deployed URL and $ref resolves correctly.
+  Applied to both $id and $ref fields.
+  """
+  versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
+
+  if isinstance(data, dict):
+    for key, value in data.items():
+      if (
+        key in ("$id", "$ref")
+        and isinstance(value, str)
+        and value.startswith(UCP_SCHEMA_PREFIX)
+      ):
+        data[key] = value.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
+      else:
+        _rewrite_version_urls(value, url_version)
+  elif isinstance(data, list):
+    for item in data:
+      _rewrite_version_urls(item, url_version)
+
+
+def _versioned_copy(data, url_version):
+  """Return a copy of `data` with URLs rewritten as `_rewrite_version_urls`.
+
+  Builds the copy while walking, so fanning one ref-resolved document out to
+  several versions costs one walk per version instead of a deepcopy plus a
+  walk.
+  """
+  if not url_version:
+    return copy.deepcopy(data)
+  versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
+
+  def visit(node):
+    if isinstance(node, dict):
+      return {
+        key: (
+          value.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
+          if key in ("$id", "$ref")
+          and isinstance(value, str)
+          and value.startswith(UCP_SCHEMA_PREFIX)
+          else visit(value)
+        )
+        for key, value in node.items()
+      }
+    if isinstance(node, list):
+      return [visit(item) for item in node]
+    return node
+
+  return visit(data)
+
+
+def _set_schema_version(data, version):
+  """Set version field for named entities (capabilities, services, handlers).
+
+  Named entities (schemas with top-level 'name' field) require version per
+  ucp.json#/$defs/entity. Build injects version so source files don't need it.
+  """
+  if "name" in data:
+    data["version"] = version
+
+
+def transform_schema(
+  data, current_file_dir, id_index, referrer, schema_version, url_version
+):
+  """Apply all build rewrites to a schema document in a single tree walk.
+
+  Equivalent to `_process_refs`, then `_set_schema_version`, then
+  `_rewrite_version_urls`, but visits each node once: a relative $ref is
+  resolved to its target's $id and that URL is versioned in the same step.
+  """
+  versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
+
+  def version_url(value):
+    if url_version and value.startswith(UCP_SCHEMA_PREFIX):
+      return value.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
+    return value
+
+  def visit(node):
+    if isinstance(node, dict):
+      for key, value in node.items():
+        if key == "$ref" and isinstance(value, str):
+          if not value.startswith(("#", "http")):
+            relative_path, sep, fragment = value.partition("#")
+            if not relative_path:
+              continue
+            schema_id = id_index.schema_id(
+              (current_file_dir / relative_path).resolve(), referrer
+            )
+            if schema_id is None:
+              continue
+            value = schema_id + sep + fragment
+          node[key] = version_url(value)
+        elif key == "$id" and isinstance(value, str):
+          node[key] = version_url(value)
+        else:
+          visit(value)
+    elif isinstance(node, list):
+      for item in node:
+        visit(item)
+
+  visit(data)
+  if schema_version:
+    _set_schema_version(data, schema_version)
+
+
+def transform_schema_legacy(
+  data, current_file_dir, id_index, referrer, schema_version, url_version
+):
+  """Apply the build rewrites as three separate passes (reference)."""
+  # Step 1: Resolve relative $ref to absolute URLs
+  _process_refs(data, current_file_dir, id_index, referrer)
+
+  # Step 2: Inject version field for named entities
+  if schema_version:
+    _set_schema_version(data, schema_version)
+
+  # Step 3: Rewrite URLs to include version
+  if url_version:
+    _rewrite_version_urls(data, url_version)
+
+
+def _dump_schema(data):
+  return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class PublishVersion:
+  """One version of the schemas to publish."""
+
+  # Version in $id/$ref URLs, e.g. '2026-01-11' or 'draft'
+  url_version: str | None
+  # Value injected as the 'version' of named entities
+  schema_version: str | None
+  # Output tree relative to the site directory ('' for the site root)
+  output_dir: str = ""
+
+
+@dataclass(frozen=True)
+class PublishSettings:
+  """Per-build inputs shared by every file (and every pool worker)."""
+
+  source_dir: Path
+  site_dir: Path
+  versions: tuple[PublishVersion, ...]
+  check_fused: bool = False
+  # Also write minified, .gz and .br forms of every schema
+  precompressed: bool = False
+  # Also write '<name>.<sha256 prefix>.json' copies for immutable caching
+  hashed_copies: bool = False
+  # {source-relative path: (direction, operation) variants} to bundle
+  bundles: dict[str, tuple[tuple[str, str], ...]] = field(default_factory=dict)
+
+
+@dataclass
+class PublishResult:
+  """Outcome of publishing one source file.
+
+  Log records are returned rather than emitted so the parent process can
+  write them in file order regardless of which worker produced them.
+  """
+
+  rel_path: str
+  records: list[tuple[int, str, tuple]] = field(default_factory=list)
+  # {target path: (problem, referrers)} from `RefIdIndex.take_unresolved`
+  unresolved: dict = field(default_factory=dict)
+  fused_mismatch: bool = False
+  # Files written, relative to the site directory
+  outputs: list[str] = field(default_factory=list)
+  # {schema output: {artifact suffix: bytes}} when precompressing
+  sizes: dict[str, dict[str, int]] = field(default_factory=dict)
+  # {schema output: schemas/manifest.json entry}, see `write_schema_catalogs`
+  catalog: dict[str, dict] = field(default_factory=dict)
+  # (perf_counter at start, wall seconds, CPU seconds, process id)
+  timing: tuple[float, float, float, int] | None = None
+
+
+def canonical_json(data) -> bytes:
+  """Return the minified canonical encoding of a JSON document.
+
+  Keys are sorted and insignificant whitespace dropped, so equal documents
+  always encode to the same bytes.
+  """
+  return json.dumps(
+    data, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+  ).encode("utf-8")
+
+
+def _write_precompressed(site_dir, output_path, readable, data):
+  """Write `.min.json` and the `.gz`/`.br` siblings of a published schema.
+
+  Args:
+    site_dir: The site directory.
+    output_path: The readable schema, relative to `site_dir`; already written.
+    readable: The bytes of the readable schema.
+    data: The published document, re-encoded as the minified form.
+
+  Returns:
+    A tuple of the size in bytes of each artifact, keyed by suffix, and the
+    paths (relative to `site_dir`) of the files written.
+
+  """
+  base = output_path.removesuffix(".json")
+  artifacts = {".json": readable, ".min.json": canonical_json(data)}
+  for suffix, raw in list(artifacts.items()):
+    # mtime=0 keeps the archives byte-identical across builds.
+    artifacts[f"{suffix}.gz"] = gzip.compress(raw, compresslevel=9, mtime=0)
+    if brotli is not None:
+      artifacts[f"{suffix}.br"] = brotli.compress(raw, quality=11)
+  written = []
+  for suffix, payload in artifacts.items():
+    if suffix != ".json":
+      (site_dir / f"{base}{suffix}").write_bytes(payload)
+      written.append(f"{base}{suffix}")
+  sizes = {suffix: len(p) for suffix, p in sorted(artifacts.items())}
+  return sizes, written
+
+
+def _iter_refs(data):
+  """Yield every `$ref` string in a document."""
+  if isinstance(data, dict):
+    for key, value in data.items():
+      if key == "$ref" and isinstance(value, str):
+        yield value
+      else:
+        yield from _iter_refs(value)
+  elif isinstance(data, list):
+    for item in data:
+      yield from _iter_refs(item)
+
+
+def _write_published(settings, result, version, rel_output, published, output):
+  """Write one published JSON document and its optional extra artifacts.
+
+  Args:
+    settings: The `PublishSettings`.
+    result: The `PublishResult` the written files are recorded in.
+    version: The `PublishVersion` being written.
+    rel_output: Output path within the version's tree.
+    published: The published document.
+    output: Its readable serialization.
+
+  Returns:
+    The path of the written readable file.
+
+  """
+  output_path = (Path(version.output_dir) / rel_output).as_posix()
+  dest_file = settings.site_dir / output_path
+  dest_file.parent.mkdir(exist_ok=True, parents=True)
+  dest_file.write_text(output, encoding="utf-8")
+  readable = output.encode("utf-8")
+  result.outputs.append(output_path)
+
+  if settings.precompressed:
+    sizes, written = _write_precompressed(
+      settings.site_dir, output_path, readable, published
+    )
+    result.sizes[output_path] = sizes
+    result.outputs.extend(written)
+
+  # Catalog entry for the tree's schemas/manifest.json, hashing the bytes
+  # served at `rel_output` so a client can check what it downloaded.
+  digest = hashlib.sha256(readable).hexdigest()
+  entry = {
+    "tree": version.output_dir,
+    "path": rel_output,
+    "$id": published.get("$id") if isinstance(published, dict) else None,
+    "sha256": digest,
+    "size": len(readable),
+    "refs": sorted(
+      {ref.partition("#")[0] for ref in _iter_refs(published)} - {""}
+    ),
+  }
+  if settings.hashed_copies:
+    # The digest is in the name, so the copy can be cached forever.
+    hashed = f"{rel_output.removesuffix('.json')}.{digest[:HASH_LENGTH]}.json"
+    hashed_path = (Path(version.output_dir) / hashed).as_posix()
+    (settings.site_dir / hashed_path).write_bytes(readable)
+    result.outputs.append(hashed_path)
+    entry["immutable"] = hashed
+  result.catalog[output_path] = entry
+  return dest_file
+
+
+def _publish_bundles(
+  src_file, file_id, file_rel_path, settings, id_index, result
+):
+  """Write the single-file bundles of a schema into each version's tree.
+
+  Written next to the schema as '<name>.bundled.json' and, per variant,
+  '<name>.<operation>_<direction>.bundled.json'.
+  """
+  rel_path = result.rel_path
+  try:
+    bundles = bundle_variants(
+      src_file,
+      id_index.repository.load,
+      settings.source_dir,
+      settings.bundles[rel_path],
+    )
+  except (ResolutionError, OSError, ValueError) as e:
+    result.records.append(
+      (logging.ERROR, "Failed to bundle %s: %s", (str(src_file), str(e)))
+    )
+    return
+
+  base = file_rel_path.removesuffix(".json")
+  for name, bundle in bundles.items():
+    suffix = f".{name}.bundled.json" if name else ".bundled.json"
+    if isinstance(file_id, str):
+      bundle["$id"] = file_id.removesuffix(".json") + suffix
+    for version in settings.versions:
+      published = _versioned_copy(bundle, version.url_version)
+      if version.schema_version:
+        _set_schema_version(published, version.schema_version)
+      _write_published(
+        settings,
+        result,
+        version,
+        f"{base}{suffix}",
+        published,
+        _dump_schema(published),
+      )
+  result.records.append(
+    (
+      logging.INFO,
+      "Bundled %s into %s single-file schemas",
+      (str(src_file), str(len(bundles) * len(settings.versions))),
+    )
+  )
+
+
+def publish_file(src_file, settings, id_index):
+  """Copy or rewrite one file from source/ into each version's output tree.
+
+  JSON is parsed and its relative refs resolved once; only the version
+  rewrite and serialization are repeated per version. The result carries
+  how long this took, for the build profile.
+  """
+  started, cpu_started = time.perf_counter(), time.thread_time()
+  result = _publish_file(src_file, settings, id_index)
+  result.timing = (
+    started,
+    time.perf_counter() - started,
+    time.thread_time() - cpu_started,
+    os.getpid(),
+  )
+  return result
+
+
+def _publish_file(src_file, settings, id_index):
+  rel_path = src_file.relative_to(settings.source_dir).as_posix()
+  result = PublishResult(rel_path)
+
+  def record(level, msg, *args):
+    result.records.append((level, msg, tuple(str(a) for a in args)))
+
+  def copy_as_is():
+    result.outputs.clear()
+    dest_files = []
+    for version in settings.versions:
+      output_path = (Path(version.output_dir) / rel_path).as_posix()
+      dest_file = settings.site_dir / output_path
+      dest_file.parent.mkdir(exist_ok=True, parents=True)
+      shutil.copy2(src_file, dest_file)
+      result.outputs.append(output_path)
+      dest_files.append(dest_file)
+    return dest_files
+
+  if not src_file.name.endswith(".json"):
+    for dest_file in copy_as_is():
+      record(logging.INFO, "Copied %s to %s", src_file, dest_file)
+    return result
+
+  # Process JSON files
+  try:
+    with src_file.open("r", encoding="utf-8") as f:
+      data = json.load(f)
+
+    # Determine output path from ORIGINAL $id (before version rewrite).
+    # Mike deploys site/ to /{version}/, so we exclude version from path.
+    file_id = data.get("$id")
+    if file_id and file_id.startswith("https://ucp.dev"):
+      file_rel_path = file_id.removeprefix("https://ucp.dev").lstrip("/")
+    else:
+      file_rel_path = rel_path
+
+    referrer = f"source/{rel_path}"
+    original = copy.deepcopy(data) if settings.check_fused else None
+    if len(settings.versions) == 1:
+      version = settings.versions[0]
+      transform_schema(
+        data,
+        src_file.parent,
+        id_index,
+        referrer,
+        version.schema_version,
+        version.url_version,
+      )
+      outputs = [(version, data, _dump_schema(data))]
+    else:
+      transform_schema(data, src_file.parent, id_index, referrer, None, None)
+      outputs = []
+      for version in settings.versions:
+        versioned = _versioned_copy(data, version.url_version)
+        if version.schema_version:
+          _set_schema_version(versioned, version.schema_version)
+        outputs.append((version, versioned, _dump_schema(versioned)))
+
+    if original is not None:
+      for version, _, output in outputs:
+        legacy = copy.deepcopy(original)
+        transform_schema_legacy(
+          legacy,
+          src_file.parent,
+          id_index,
+          referrer,
+          version.schema_version,
+          version.url_version,
+        )
+        if _dump_schema(legacy) != output:
+          result.fused_mismatch = True
+
+    for version, published, output in outputs:
+      dest_file = _write_published(
+        settings, result, version, file_rel_path, published, output
+      )
+      record(logging.INFO, "Processed and copied %s to %s", src_file, dest_file)
+
+    if rel_path in settings.bundles:
+      _publish_bundles(
+        src_file, file_id, file_rel_path, settings, id_index, result
+      )
+
+  except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+    record(
+      logging.ERROR,
+      "Failed to process JSON file %s, copying as-is: %s",
+      src_file,
+      e,
+    )
+    # Fallback to copying if processing fails
+    copy_as_is()
+
+  result.unresolved = id_index.take_unresolved()
+  return result
+
+
+# Per-process state of a pool worker, set by `_init_publish_worker`.
+_worker_state = None
+
+
+def _init_publish_worker(settings):
+  global _worker_state
+  _worker_state = (settings, RefIdIndex(get_repository(settings.source_dir)))
+
+
+def _publish_in_worker(src_file):
+  settings, id_index = _worker_state
+  return publish_file(src_file, settings, id_index)
+
+
+def publish_in_pool(src_files, settings, workers):
+  """Publish files on a process pool, returning results in file order."""
+  log.info(
+    "Publishing %d source files on %d worker processes",
+    len(src_files),
+    workers,
+  )
+  # Spawned workers import this module by name, but MkDocs only puts the
+  # repository on sys.path while loading hooks; add it back for them.
+  repo_dir = str(Path(__file__).resolve().parents[1])
+  if repo_dir not in sys.path:
+    sys.path.insert(0, repo_dir)
+  # One shard per worker is uneven when a few schemas are large; a few
+  # shards each keeps every worker busy until the end.
+  chunksize = max(1, len(src_files) // (workers * 4))
+  with ProcessPoolExecutor(
+    max_workers=workers,
+    mp_context=multiprocessing.get_context("spawn"),
+    initializer=_init_publish_worker,
+    initargs=(settings,),
+  ) as pool:
+    return list(pool.map(_publish_in_worker, src_files, chunksize=chunksize))
+
+
+class BuildManifest:
+  """Inputs and outputs of every published file, kept in the publish cache.
+
+  A file whose source bytes, `$ref` target bytes and published versions all
+  match its previous entry need not be published again. The cache also keeps
+  a copy of every output, so a site directory that MkDocs emptied (every
+  build without `--dirty`, every `mkdocs serve` reload) is refilled by
+  copying files rather than publishing them.
+  """
+
+  def __init__(
+    self, settings, repository, ref_graph=None, cache_dir=PUBLISH_CACHE_DIR
+  ):
+    """Load the manifest from `cache_dir`, if there is one.
+
+    With a `RefGraph` of the source directory, bundle closures are read from
+    it rather than walked file by file.
+    """
+    self.settings = settings
+    self.repository = repository
+    self.ref_graph = ref_graph
+    self.cache_dir = Path(cache_dir)
+    self.path = self.cache_dir / BUILD_MANIFEST_NAME
+    # Copies of the outputs, laid out as in the site directory
+    self.files_dir = self.cache_dir / "files"
+    self._entries: dict[str, dict] = {}
+    # Previous outputs of republished files that they no longer write
+    self._orphans: set[str] = set()
+    try:
+      with self.path.open(encoding="utf-8") as f:
+        recorded = json.load(f)
+      if recorded.get("format") == BUILD_MANIFEST_FORMAT:
+        self._entries = recorded["files"]
+    except (OSError, json.JSONDecodeError, KeyError, AttributeError):
+      pass
+
+  def _digest(self, path):
+    digest = self.repository.digest(path)
+    if digest is None and path.is_file():
+      # Not JSON, so not in the repository.
+      digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    return digest
+
+  def _closure(self, src_file):
+    """Return {path: digest} for every file `src_file` transitively refs."""
+    if self.ref_graph is not None:
+      rel_path = src_file.relative_to(self.settings.source_dir).as_posix()
+      return {
+        key: self._digest(self.settings.source_dir / key)
+        for key in sorted(self.ref_graph.file_closure(rel_path))
+      }
+    digests = {}
+    pending = list(self.repository.file_refs(src_file))
+    while pending:
+      path = pending.pop()
+      key = Path(os.path.relpath(path, self.settings.source_dir)).as_posix()
+      if key not in digests:
+        digests[key] = self._digest(path)
+        pending.extend(self.repository.file_refs(path))
+    return dict(sorted(digests.items()))
+
+  def inputs(self, src_file):
+    """Return everything the published output of `src_file` depends on."""
+    refs = {
+      Path(os.path.relpath(ref, self.settings.source_dir)).as_posix(): (
+        self._digest(ref)
+      )
+      for ref in self.repository.file_refs(src_file)
+    }
+    inputs = {
+      "source": self._digest(src_file),
+      "refs": dict(sorted(refs.items())),
+      "versions": [
+        [v.url_version, v.schema_version, v.output_dir]
+        for v in self.settings.versions
+      ],
+      "precompressed": self.settings.precompressed
+      and ("gzip+brotli" if brotli is not None else "gzip"),
+      "hashed_copies": self.settings.hashed_copies,
+    }
+    rel_path = src_file.relative_to(self.settings.source_dir).as_posix()
+    if rel_path in self.settings.bundles:
+      # Bundles embed the whole ref closure, not just the direct targets.
+      inputs["bundles"] = [list(v) for v in self.settings.bundles[rel_path]]
+      inputs["closure"] = self._closure(src_file)
+    return inputs
+
+  def is_current(self, rel_path, inputs):
+    """Return whether the previous output of `rel_path` can be kept."""
+    entry = self._entries.get(rel_path)
+    return (
+      entry is not None
+      and entry["inputs"] == inputs
+      and all(
+        (self.settings.site_dir / out).is_file()
+        or (self.files_dir / out).is_file()
+        for out in entry["outputs"]
+      )
+    )
+
+  def restore(self, rel_path):
+    """Copy the kept outputs of `rel_path` missing from the site directory.
+
+    Returns:
+      The number of files copied from the cache.
+
+    """
+    copied = 0
+    for out in self._entries[rel_path]["outputs"]:
+      dest = self.settings.site_dir / out
+      if not dest.is_file():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self.files_dir / out, dest)
+        copied += 1
+    return copied
+
+  def unresolved(self, rel_path):
+    """Return the unresolved ref targets recorded for a kept file."""
+    entry = self._entries[rel_path]
+    return {
+      Path(target): (problem, {f"source/{rel_path}"})
+      for target, problem in entry["unresolved"]
+    }
+
+  def record(self, result, inputs):
+    """Store the outcome of publishing a file."""
+    previous = self._entries.get(result.rel_path)
+    if previous:
+      self._orphans.update(set(previous["outputs"]) - set(result.outputs))
+    self._entries[result.rel_path] = {
+      "inputs": inputs,
+      "outputs": result.outputs,
+      "sizes": result.sizes,
+      "catalog": result.catalog,
+      "unresolved": sorted(
+        [str(target), problem]
+        for target, (problem, _) in result.unresolved.items()
+      ),
+    }
+    for out in result.outputs:
+      cached = self.files_dir / out
+      cached.parent.mkdir(parents=True, exist_ok=True)
+      shutil.copyfile(self.settings.site_dir / out, cached)
+
+  def remove_deleted(self, rel_paths):
+    """Forget sources not in `rel_paths` and delete their outputs.
+
+    Call after recording this build's results: outputs a republished file
+    stopped writing (e.g. because its `$id` changed) are deleted as well.
+
+    Returns:
+      The removed output paths, relative to the site directory.
+
+    """
+    current = set(rel_paths)
+    deleted = [rel for rel in self._entries if rel not in current]
+    kept_outputs = {
+      out
+      for rel, entry in self._entries.items()
+      if rel in current
+      for out in entry["outputs"]
+    }
+    stale = self._orphans
+    for rel in deleted:
+      stale.update(self._entries.pop(rel)["outputs"])
+    removed = sorted(stale - kept_outputs)
+    for out in removed:
+      (self.settings.site_dir / out).unlink(missing_ok=True)
+      (self.files_dir / out).unlink(missing_ok=True)
+    self._orphans = set()
+    return removed
+
+  def sizes(self):
+    """Return {schema output: {artifact suffix: bytes}} for every file."""
+    sizes = {}
+    for entry in self._entries.values():
+      sizes.update(entry.get("sizes", {}))
+    return dict(sorted(sizes.items()))
+
+  def catalog(self):
+    """Return {schema output: catalog entry} for every published schema."""
+    catalog = {}
+    for entry in self._entries.values():
+      catalog.update(entry.get("catalog", {}))
+    return dict(sorted(catalog.items()))
+
+  def save(self):
+    """Write the manifest to the publish cache."""
+    manifest = {
+      "format": BUILD_MANIFEST_FORMAT,
+      "files": dict(sorted(self._entries.items())),
+    }
+    self.cache_dir.mkdir(parents=True, exist_ok=True)
+    with self.path.open("w", encoding="utf-8") as f:
+      json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def write_size_report(cache_dir, sizes):
+  """Write the per-file artifact size report and log the totals.
+
+  Args:
+    cache_dir: The publish cache; the report is written to
+      `SIZE_REPORT_NAME` inside it, so it is not deployed with the site.
+    sizes: {schema output: {artifact suffix: bytes}}, as returned by
+      `BuildManifest.sizes()`.
+
+  """
+  totals: dict[str, int] = defaultdict(int)
+  for file_sizes in sizes.values():
+    for suffix, size in file_sizes.items():
+      totals[suffix] += size
+  report = {"totals": dict(sorted(totals.items())), "files": sizes}
+  report_path = Path(cache_dir) / SIZE_REPORT_NAME
+  report_path.parent.mkdir(parents=True, exist_ok=True)
+  with report_path.open("w", encoding="utf-8") as f:
+    json.dump(report, f, indent=2, ensure_ascii=False)
+  if brotli is None:
+    log.warning(
+      "No .br schema artifacts written: the 'brotli' package is not "
+      "installed (e.g. `uv run --with brotli mkdocs build`)"
+    )
+
+  readable = totals.get(".json")
+  if not readable:
+    return
+  parts = [
+    f"{suffix} {size} ({100 * size / readable:.0f}%)"
+    for suffix, size in sorted(totals.items())
+    if suffix != ".json"
+  ]
+  log.info(
+    "Schema artifacts for %d files: .json %d bytes, %s; per-file sizes in %s",
+    len(sizes),
+    readable,
+    ", ".join(parts),
+    report_path,
+  )
+
+
+def write_schema_catalogs(site_dir, catalog):
+  """Write `schemas/manifest.json` into every version's output tree.
+
+  Each lists the tree's published JSON files with their `$id`, the SHA-256
+  of their bytes as served (which their hashed copy holds too), their size,
+  the SHA-256 of every document they `$ref` (null if not published here)
+  and, if written, the name of their content-hashed copy. Clients can fetch
+  the manifest and download only the files whose hash changed.
+
+  Args:
+    site_dir: The site directory.
+    catalog: {schema output: entry}, as returned by `BuildManifest.catalog()`.
+
+  """
+  trees: dict[str, list[dict]] = defaultdict(list)
+  for entry in catalog.values():
+    trees[entry["tree"]].append(entry)
+  for tree, entries in sorted(trees.items()):
+    digests = {e["$id"]: e["sha256"] for e in entries if e["$id"]}
+    files = {}
+    for entry in sorted(entries, key=lambda e: e["path"]):
+      files[entry["path"]] = {
+        "$id": entry["$id"],
+        "sha256": entry["sha256"],
+        "size": entry["size"],
+        "refs": {ref: digests.get(ref) for ref in entry["refs"]},
+      }
+      if "immutable" in entry:
+        files[entry["path"]]["immutable"] = entry["immutable"]
+    path = site_dir / tree / SCHEMA_CATALOG_PATH
+    path.parent.mkdir(exist_ok=True, parents=True)
+    with path.open("w", encoding="utf-8") as f:
+      json.dump({"files": files}, f, indent=2, ensure_ascii=False)
+    log.info("Wrote %s listing %d files", path, len(files))
@@ -0,0 +1,365 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Cross-file `$ref` dependency graph of the JSON files under `source/`.
+
+Nodes are `(file, pointer)` pairs: `file` is a path relative to the source
+directory and `pointer` a JSON pointer into it, '' for the whole file. A
+node depends on every node that a `$ref` inside it targets, so
+('schemas/shopping/cart.json', '') depends on
+('schemas/shopping/types/line_item.json', '') and a `$defs` entry depends
+only on what its own refs reach. Refs by absolute `$id` URL are mapped to
+the declaring file; refs to anything else outside the tree are ignored.
+
+The graph is built from each file's list of refs, which is cached by
+content digest: `save()` writes it as JSON, and `RefGraph.build()` given a
+previous graph only rescans files whose digest changed.
+"""
+
+from collections.abc import Iterable
+import contextlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+# Bump when the artifact layout changes.
+REF_GRAPH_FORMAT = 1
+# Where the build keeps the graph between runs (relative to the checkout)
+REF_GRAPH_CACHE = Path(".cache/ucp-ref-graph.json")
+# JSON object keys whose entries become pointer nodes even if never targeted
+DEFINITION_KEYWORDS = ("$defs", "definitions")
+
+Node = tuple[str, str]
+
+
+def _escape(key: str) -> str:
+  """Escape a key for use in a JSON pointer (RFC 6901)."""
+  return key.replace("~", "~0").replace("/", "~1")
+
+
+def _normalize_pointer(fragment: str) -> str:
+  return "" if fragment in ("", "/") else "/" + fragment.lstrip("/")
+
+
+def _scan(data: Any, location: str = ""):
+  """Yield (location, ref) for every `$ref` string in a document."""
+  if isinstance(data, dict):
+    for key, value in data.items():
+      if key == "$ref" and isinstance(value, str):
+        yield location, value
+      else:
+        yield from _scan(value, f"{location}/{_escape(key)}")
+  elif isinstance(data, list):
+    for index, item in enumerate(data):
+      yield from _scan(item, f"{location}/{index}")
+
+
+def _definitions(data: Any) -> list[str]:
+  """Return the pointers of a document's top-level definitions."""
+  if not isinstance(data, dict):
+    return []
+  return [
+    f"/{keyword}/{_escape(name)}"
+    for keyword in DEFINITION_KEYWORDS
+    if isinstance(data.get(keyword), dict)
+    for name in data[keyword]
+  ]
+
+
+def _within(location: str, pointer: str) -> bool:
+  """Return whether `location` is `pointer` or inside it."""
+  return (
+    not pointer or location == pointer or location.startswith(pointer + "/")
+  )
+
+
+def _strongly_connected(nodes: Iterable[Any], successors) -> list[list[Any]]:
+  """Return the strongly connected components, dependencies first.
+
+  Iterative Tarjan: components come out in reverse topological order of
+  the condensed graph, i.e. every component after those it depends on.
+  """
+  index: dict[Any, int] = {}
+  low: dict[Any, int] = {}
+  on_stack: set[Any] = set()
+  stack: list[Any] = []
+  components: list[list[Any]] = []
+  for root in nodes:
+    if root in index:
+      continue
+    work = [(root, iter(sorted(successors(root))))]
+    index[root] = low[root] = len(index)
+    stack.append(root)
+    on_stack.add(root)
+    while work:
+      node, children = work[-1]
+      for child in children:
+        if child not in index:
+          index[child] = low[child] = len(index)
+          stack.append(child)
+          on_stack.add(child)
+          work.append((child, iter(sorted(successors(child)))))
+          break
+        if child in on_stack:
+          low[node] = min(low[node], index[child])
+      else:
+        work.pop()
+        if work:
+          parent = work[-1][0]
+          low[parent] = min(low[parent], low[node])
+        if low[node] == index[node]:
+          component = []
+          while True:
+            member = stack.pop()
+            on_stack.discard(member)
+            component.append(member)
+            if member == node:
+              break
+          components.append(sorted(component))
+  return components
+
+
+class RefGraph:
+  """Queryable `$ref` graph over files and JSON-pointer nodes."""
+
+  def __init__(self, files: dict[str, dict[str, Any]]):
+    """Create a graph from per-file scan results.
+
+    Args:
+      files: {relative path: {"digest": ..., "definitions": [pointer, ...],
+        "refs": [[location, target file, target pointer], ...]}}, as built
+        by `RefGraph.build()` or read back by `RefGraph.load()`.
+
+    """
+    self.files = files
+    self._edges: dict[Node, set[Node]] = {}
+    self._reverse: dict[Node, set[Node]] = {}
+    self._by_file: dict[str, list[Node]] = {}
+    for path, entry in files.items():
+      self._add((path, ""))
+      for pointer in entry["definitions"]:
+        self._add((path, pointer))
+      for _, target, pointer in entry["refs"]:
+        self._add((target, ""))
+        self._add((target, pointer))
+    # Each node depends on what the refs inside its subtree target.
+    for path, entry in files.items():
+      nodes = self._by_file[path]
+      for location, target, pointer in entry["refs"]:
+        for node in nodes:
+          if _within(location, node[1]) and node != (target, pointer):
+            self._link(node, (target, pointer))
+
+  def _add(self, node: Node) -> None:
+    if node not in self._edges:
+      self._edges[node] = set()
+      self._reverse[node] = set()
+      self._by_file.setdefault(node[0], []).append(node)
+
+  def _link(self, source: Node, target: Node) -> None:
+    self._edges[source].add(target)
+    self._reverse[target].add(source)
+
+  # --- Building and caching ---
+
+  @classmethod
+  def build(
+    cls, repository, source_dir: str | Path, previous: "RefGraph | None" = None
+  ) -> "RefGraph":
+    """Scan every file in `repository` under `source_dir`.
+
+    Files whose digest matches their entry in `previous` are not rescanned.
+    """
+    source_dir = Path(source_dir).resolve()
+    reuse = previous.files if previous is not None else {}
+    files = {}
+    for path in repository.paths():
+      absolute = Path(path).resolve()
+      if not absolute.is_relative_to(source_dir):
+        continue
+      rel = absolute.relative_to(source_dir).as_posix()
+      digest = repository.digest(path)
+      cached = reuse.get(rel)
+      if cached is not None and cached["digest"] == digest:
+        files[rel] = cached
+        continue
+      data = repository.get(path)
+      files[rel] = {
+        "digest": digest,
+        "definitions": _definitions(data),
+        "refs": cls._scan_refs(repository, source_dir, absolute, data),
+      }
+    return cls(files)
+
+  @staticmethod
+  def _scan_refs(repository, source_dir, path, data):
+    refs = []
+    for location, ref in _scan(data):
+      file_part, _, fragment = ref.partition("#")
+      if not file_part:
+        target = path
+      elif file_part.startswith(("http://", "https://")):
+        target = repository.path_for_id(file_part)
+        if target is None:
+          continue
+        target = Path(target).resolve()
+      else:
+        target = (path.parent / file_part).resolve()
+      rel = Path(os.path.relpath(target, source_dir)).as_posix()
+      refs.append([location, rel, _normalize_pointer(fragment)])
+    return refs
+
+  def save(self, path: str | Path) -> None:
+    """Write the graph's per-file scan results to `path` as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+      json.dump(
+        {"format": REF_GRAPH_FORMAT, "files": self.files},
+        f,
+        indent=1,
+        sort_keys=True,
+      )
+    tmp.replace(path)
+
+  @classmethod
+  def load(cls, path: str | Path) -> "RefGraph | None":
+    """Read a graph written by `save()`; None if missing or outdated."""
+    try:
+      with Path(path).open(encoding="utf-8") as f:
+        recorded = json.load(f)
+      if recorded.get("format") == REF_GRAPH_FORMAT:
+        return cls(recorded["files"])
+    except (OSError, json.JSONDecodeError, KeyError, AttributeError):
+      pass
+    return None
+
+  # --- Node queries ---
+
+  def nodes(self) -> list[Node]:
+    """Return every file and pointer node, sorted."""
+    return sorted(self._edges)
+
+  def dependencies(self, node: Node) -> set[Node]:
+    """Return the nodes `node` refs directly."""
+    return set(self._edges.get(node, ()))
+
+  def dependents(self, node: Node) -> set[Node]:
+    """Return the nodes that ref `node` directly."""
+    return set(self._reverse.get(node, ()))
+
+  def _reach(self, starts: Iterable[Node], edges) -> set[Node]:
+    seen: set[Node] = set()
+    pending = [n for start in starts for n in edges.get(start, ())]
+    while pending:
+      node = pending.pop()
+      if node not in seen:
+        seen.add(node)
+        pending.extend(edges.get(node, ()))
+    return seen
+
+  def closure(self, node: Node) -> set[Node]:
+    """Return every node `node` depends on, directly or transitively."""
+    return self._reach([node], self._edges)
+
+  def affected(self, node: Node) -> set[Node]:
+    """Return every node depending on `node`, directly or transitively."""
+    return self._reach([node], self._reverse)
+
+  # --- File queries ---
+
+  def file_dependencies(self, path: str) -> set[str]:
+    """Return the other files `path` refs directly."""
+    return {n[0] for n in self._edges.get((path, ""), ())} - {path}
+
+  def file_closure(self, path: str) -> set[str]:
+    """Return every other file `path` depends on, transitively."""
+    return {n[0] for n in self._reach([(path, "")], self._edges)} - {path}
+
+  def file_dependents(self, paths: str | Iterable[str]) -> set[str]:
+    """Return every other file depending on any of `paths`, transitively.
+
+    Any node of a changed file may have changed, so this is the set of
+    files whose resolved output is stale after `paths` are edited.
+    """
+    paths = {paths} if isinstance(paths, str) else set(paths)
+    starts = [node for path in paths for node in self._by_file.get(path, ())]
+    return {n[0] for n in self._reach(starts, self._reverse)} - paths
+
+  def topological_order(self) -> list[str]:
+    """Return the files, each after every file it refs.
+
+    Files on a cycle are adjacent, in path order.
+    """
+    files = sorted(self._by_file)
+    return [
+      path
+      for component in _strongly_connected(files, self.file_dependencies)
+      for path in component
+    ]
+
+  def cycles(self, pointers: bool = False) -> list[list[str] | list[Node]]:
+    """Return the ref cycles, each as a sorted list of its members.
+
+    Args:
+      pointers: If False, cycles between files (a file referring to itself
+        through local refs is not one). If True, cycles between nodes,
+        including recursive definitions within a single file.
+
+    """
+    if pointers:
+      nodes = self.nodes()
+      components = _strongly_connected(nodes, self.dependencies)
+      return [
+        c for c in components if len(c) > 1 or c[0] in self._edges.get(c[0], ())
+      ]
+    files = sorted(self._by_file)
+    return [
+      c
+      for c in _strongly_connected(files, self.file_dependencies)
+      if len(c) > 1
+    ]
+
+
+_graphs: dict[tuple, tuple[int, RefGraph]] = {}
+
+
+def get_ref_graph(
+  repository, source_dir: str | Path, cache_path: str | Path | None = None
+) -> RefGraph:
+  """Return the process-wide graph for `source_dir`, updated if needed.
+
+  The graph is rebuilt only when the repository's generation changes, and
+  then only changed files are rescanned. With `cache_path`, the first build
+  in a process starts from the graph saved there, and a rebuilt graph is
+  saved back.
+  """
+  key = (id(repository), Path(source_dir).resolve())
+  cached = _graphs.get(key)
+  if cached is not None and cached[0] == repository.generation:
+    return cached[1]
+  previous = cached[1] if cached is not None else None
+  if previous is None and cache_path is not None:
+    previous = RefGraph.load(cache_path)
+  graph = RefGraph.build(repository, source_dir, previous)
+  if cache_path is not None and (
+    previous is None or graph.files != previous.files
+  ):
+    # The cache only saves rescanning; a read-only checkout still builds.
+    with contextlib.suppress(OSError):
+      graph.save(cache_path)
+  _graphs[key] = (repository.generation, graph)
+  return graph
@@ -0,0 +1,108 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Memo of rendered Markdown tables, shared across macro calls.
+
+The same entity is rendered by `schema_fields`, by the reference page and
+inside `allOf` expansions elsewhere. Entries are keyed on the content of
+what is rendered plus every argument that changes the output, and the whole
+cache is dropped whenever the schema repository sees a changed file, since a
+table also depends on the schemas it links to and inlines. The files read
+while rendering an entry are kept with it and reported to the repository's
+dependency recorder on every hit, so page-level tracking sees them too.
+"""
+
+from collections.abc import Callable, Hashable
+import hashlib
+import json
+from typing import Any
+
+
+def content_hash(value: Any) -> str:
+  """Return a stable hash of a JSON-compatible value."""
+  encoded = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+  return hashlib.sha256(encoded).hexdigest()
+
+
+class RenderCache:
+  """Rendered tables keyed on their inputs, valid for one repository state."""
+
+  def __init__(self, repository):
+    """Create an empty cache tied to `repository`'s current generation."""
+    self.repository = repository
+    self.generation = repository.generation
+    self.hits = 0
+    self.misses = 0
+    self.invalidations = 0
+    self._entries: dict[Hashable, tuple[str, frozenset]] = {}
+
+  def reset_stats(self) -> None:
+    """Zero the counters, e.g. at the start of a rebuild."""
+    self.hits = self.misses = self.invalidations = 0
+
+  def _validate(self) -> None:
+    if self.repository.generation != self.generation:
+      self._entries.clear()
+      self.generation = self.repository.generation
+      self.invalidations += 1
+
+  def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+    """Return the cached table for `key`, rendering it on a miss."""
+    self._validate()
+    recorder = self.repository.recorder
+    cached = self._entries.get(key)
+    if cached is not None:
+      self.hits += 1
+      if recorder is not None:
+        recorder.record(cached[1])
+      return cached[0]
+    self.misses += 1
+    if recorder is None:
+      rendered, deps = render(), frozenset()
+    else:
+      capture = recorder.start()
+      try:
+        rendered = render()
+      finally:
+        deps = recorder.stop(capture)
+    self._entries[key] = (rendered, deps)
+    return rendered
+
+  def summary(self) -> str:
+    """Return a one-line hit/miss summary for the build log."""
+    lookups = self.hits + self.misses
+    rate = f"{100 * self.hits / lookups:.0f}%" if lookups else "n/a"
+    return (
+      f"Render cache: {self.hits} hits, {self.misses} misses "
+      f"({rate} hit rate), {len(self._entries)} tables cached, "
+      f"{self.invalidations} invalidations"
+    )
+
+
+_caches: dict[tuple, RenderCache] = {}
+
+
+def get_render_cache(repository, namespace: tuple = ()) -> RenderCache:
+  """Return the process-wide render cache for a repository and namespace.
+
+  `namespace` should identify everything else the tables depend on (the
+  resolver backend, the rendering code itself), so a `mkdocs serve` rebuild
+  after editing either starts from an empty cache.
+  """
+  key = (id(repository), namespace)
+  cache = _caches.get(key)
+  if cache is None or cache.repository is not repository:
+    cache = _caches[key] = RenderCache(repository)
+  cache.reset_stats()
+  return cache
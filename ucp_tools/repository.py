@@ -0,0 +1,294 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Indexed, parse-once view of the JSON files under `source/`.
+
+Every file is parsed a single time and indexed by path, by name within each
+search directory (the way the macros look schemas up, e.g. 'checkout' or
+'types/line_item') and by `$id`. `refresh()` re-stats the tree and reparses
+only files whose mtime or size changed, so a long-lived repository stays
+correct across `mkdocs serve` rebuilds.
+
+Paths are returned in the form the repository was created with (e.g.
+'source/schemas/shopping/cart.json' for root 'source'), matching the
+relative paths used throughout the build. Parsed documents are shared
+between callers and must be treated as read-only.
+"""
+
+from dataclasses import dataclass
+import errno
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any
+
+from ucp_tools.schema_cache import iter_file_refs
+
+
+@dataclass
+class _Entry:
+  """A parsed source file and the stat data it was parsed from."""
+
+  mtime_ns: int
+  size: int
+  digest: str
+  data: Any = None
+  error: Exception | None = None
+  refs: tuple[Path, ...] = ()
+
+
+class SchemaRepository:
+  """Parses every JSON file under `root` once and indexes it."""
+
+  def __init__(
+    self, root: str | Path = "source", search_dirs: list | tuple = ()
+  ):
+    """Create a repository; call `refresh()` to (re)load the files.
+
+    Args:
+      root: Directory whose `*.json` files are indexed.
+      search_dirs: Directories, in priority order, used by `find()` to map
+        names such as 'checkout' or 'types/line_item' to files.
+
+    """
+    self._given_root = Path(root)
+    self.root = self._given_root.resolve()
+    self.search_dirs = [Path(d).resolve() for d in search_dirs]
+    self.generation = 0
+    self.parses = 0
+    self._entries: dict[Path, _Entry] = {}
+    self._by_name: dict[tuple[Path, str], Path] = {}
+    self._by_id: dict[str, Path] = {}
+    self._absolute: dict[str | Path, Path] = {}
+    self._lock = threading.Lock()
+    # Optional `DependencyRecorder` told about every file looked up
+    self.recorder = None
+
+  # --- Loading ---
+
+  def _parse(self, path: Path, stat: os.stat_result) -> _Entry:
+    raw = path.read_bytes()
+    entry = _Entry(
+      stat.st_mtime_ns, stat.st_size, hashlib.sha256(raw).hexdigest()
+    )
+    try:
+      entry.data = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+      entry.error = e
+    else:
+      entry.refs = tuple(
+        dict.fromkeys(
+          (path.parent / ref).resolve() for ref in iter_file_refs(entry.data)
+        )
+      )
+    self.parses += 1
+    return entry
+
+  def refresh(self) -> set[Path]:
+    """Re-stat the tree, reparsing changed files and dropping deleted ones.
+
+    Returns:
+      The set of files that were added, changed or removed.
+
+    """
+    changed: set[Path] = set()
+    seen: set[Path] = set()
+    with self._lock:
+      for path in sorted(self.root.rglob("*.json")):
+        if not path.is_file():
+          continue
+        seen.add(path)
+        stat = path.stat()
+        entry = self._entries.get(path)
+        if (
+          entry
+          and entry.mtime_ns == stat.st_mtime_ns
+          and entry.size == stat.st_size
+        ):
+          continue
+        self._entries[path] = self._parse(path, stat)
+        changed.add(path)
+
+      for path in list(self._entries):
+        if path not in seen and path.is_relative_to(self.root):
+          del self._entries[path]
+          changed.add(path)
+
+      if changed or not self.generation:
+        self._reindex()
+        self.generation += 1
+    return changed
+
+  def _reindex(self) -> None:
+    self._by_name.clear()
+    self._by_id.clear()
+    for path, entry in self._entries.items():
+      for search_dir in self.search_dirs:
+        if path.is_relative_to(search_dir):
+          name = path.relative_to(search_dir).with_suffix("").as_posix()
+          self._by_name[(search_dir, name)] = path
+      if isinstance(entry.data, dict):
+        schema_id = entry.data.get("$id")
+        if isinstance(schema_id, str):
+          self._by_id.setdefault(schema_id, path)
+
+  def _entry(self, path: str | Path) -> _Entry | None:
+    absolute = self._absolute.get(path)
+    if absolute is None:
+      # Memoized: resolve() costs a syscall per path component.
+      absolute = self._absolute[path] = Path(path).resolve()
+    path = absolute
+    if self.recorder is not None:
+      self.recorder.record((path,))
+    entry = self._entries.get(path)
+    if entry is not None:
+      return entry
+    # Outside the indexed tree (or created since the last refresh): parse
+    # on demand and keep it, without adding it to the name/$id indexes.
+    try:
+      stat = path.stat()
+      if not path.is_file():
+        return None
+      entry = self._parse(path, stat)
+    except OSError:
+      return None
+    with self._lock:
+      return self._entries.setdefault(path, entry)
+
+  def _present(self, path: Path) -> Path:
+    """Express an absolute path relative to the root as given."""
+    if path.is_relative_to(self.root):
+      return self._given_root / path.relative_to(self.root)
+    return path
+
+  # --- Lookups ---
+
+  def get(self, path: str | Path) -> Any | None:
+    """Return the parsed document at `path`, or None if missing/invalid."""
+    entry = self._entry(path)
+    return entry.data if entry and entry.error is None else None
+
+  def load(self, path: str | Path) -> Any:
+    """Return the parsed document at `path`, raising like `json.load`.
+
+    Raises:
+      FileNotFoundError: The file does not exist.
+      json.JSONDecodeError: The file is not valid JSON.
+
+    """
+    entry = self._entry(path)
+    if entry is None:
+      raise FileNotFoundError(
+        errno.ENOENT, os.strerror(errno.ENOENT), str(path)
+      )
+    if entry.error is not None:
+      raise entry.error
+    return entry.data
+
+  def find(self, name: str) -> Path | None:
+    """Map a name like 'checkout' or 'types/line_item.json' to a file.
+
+    Search directories are tried in order, like the macros' lookups.
+    """
+    name = name.removesuffix(".json")
+    for search_dir in self.search_dirs:
+      path = self._by_name.get((search_dir, name))
+      if path is None and ".." in name:
+        # Names such as '../ucp' step outside the search directory.
+        candidate = (search_dir / f"{name}.json").resolve()
+        if candidate in self._entries:
+          path = candidate
+      if path is not None:
+        return self._present(path)
+    return None
+
+  def load_by_name(self, name: str) -> Any | None:
+    """Return the document `find(name)` maps to, or None."""
+    path = self.find(name)
+    return self.get(path) if path else None
+
+  def path_for_id(self, schema_id: str) -> Path | None:
+    """Return the file declaring `$id`, or None."""
+    path = self._by_id.get(schema_id)
+    return self._present(path) if path else None
+
+  def by_id(self, schema_id: str) -> Any | None:
+    """Return the document declaring `$id`, or None."""
+    path = self._by_id.get(schema_id)
+    return self.get(path) if path else None
+
+  def schema_id(self, path: str | Path) -> str | None:
+    """Return the `$id` declared by the file at `path`, if any."""
+    data = self.get(path)
+    if isinstance(data, dict) and isinstance(data.get("$id"), str):
+      return data["$id"]
+    return None
+
+  def digest(self, path: str | Path) -> str | None:
+    """Return the SHA-256 of the file's bytes as last parsed."""
+    entry = self._entry(path)
+    return entry.digest if entry else None
+
+  def file_refs(self, path: str | Path) -> tuple[Path, ...]:
+    """Return the (absolute) files the document at `path` `$ref`s."""
+    entry = self._entry(path)
+    return entry.refs if entry else ()
+
+  def paths(self) -> list[Path]:
+    """Return every indexed file under the root, sorted."""
+    return [
+      self._present(p)
+      for p in sorted(self._entries)
+      if p.is_relative_to(self.root)
+    ]
+
+
+# Directories, relative to the source root and in priority order, that the
+# macros look schema names up in
+SEARCH_DIRS = (
+  "handlers/google_pay",
+  "schemas",
+  "schemas/shopping",
+  "schemas/shopping/types",
+)
+
+_repositories: dict[tuple, SchemaRepository] = {}
+
+
+def source_search_dirs(root: str | Path = "source") -> list[Path]:
+  """Return `SEARCH_DIRS` under `root`."""
+  return [Path(root) / search_dir for search_dir in SEARCH_DIRS]
+
+
+def get_repository(
+  root: str | Path = "source", search_dirs: list | tuple | None = None
+) -> SchemaRepository:
+  """Return the process-wide repository for `root`, refreshed.
+
+  MkDocs re-executes `main.py` and `hooks.py` on every `mkdocs serve`
+  rebuild; keeping the repository here means a rebuild only reparses the
+  files that changed. Repositories are keyed by root and search directories,
+  which default to `source_search_dirs(root)` so that the macros, the hooks
+  and their worker processes all share one index of `source/`.
+  """
+  if search_dirs is None:
+    search_dirs = source_search_dirs(root)
+  key = (Path(root).resolve(), tuple(Path(d).resolve() for d in search_dirs))
+  repository = _repositories.get(key)
+  if repository is None:
+    repository = _repositories[key] = SchemaRepository(root, search_dirs)
+  repository.refresh()
+  return repository
@@ -0,0 +1,250 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""In-process resolver for `ucp_request` / `ucp_response` annotations.
+
+Mirrors `ucp-schema resolve <file> --request|--response --op <op> [--bundle]`:
+
+- Properties annotated for the selected direction are kept ("optional"),
+  forced into the parent's `required` list ("required") or dropped together
+  with their `required` entry ("omit"). An annotation is either a single
+  value or a map keyed by operation (`create`, `update`, `complete`, ...);
+  operations missing from the map leave the property as declared.
+- Every `ucp_request` / `ucp_response` key is stripped from the output.
+- With `bundle=True`, every `$ref` (relative files and `#/...` pointers) is
+  replaced by its target, resolved for the same direction and operation.
+  Cyclic refs are left in place.
+"""
+
+from collections.abc import Callable
+import copy
+import json
+from pathlib import Path
+from typing import Any
+
+ANNOTATION_KEYS = {"request": "ucp_request", "response": "ucp_response"}
+VISIBILITY_VALUES = ("omit", "required", "optional")
+
+
+class ResolutionError(Exception):
+  """Raised when a schema cannot be resolved."""
+
+
+def _load_json_file(path: Path) -> Any:
+  try:
+    with path.open(encoding="utf-8") as f:
+      return json.load(f)
+  except (OSError, json.JSONDecodeError, UnicodeDecodeError) as e:
+    raise ResolutionError(f"Cannot load schema {path}: {e}") from e
+
+
+def _visibility(annotation: Any, operation: str, where: str) -> str | None:
+  """Return the visibility an annotation assigns for `operation`."""
+  if isinstance(annotation, dict):
+    annotation = annotation.get(operation)
+    if annotation is None:
+      return None
+  if annotation not in VISIBILITY_VALUES:
+    raise ResolutionError(
+      f"Invalid annotation value {annotation!r} at {where}; expected one of "
+      f"{', '.join(VISIBILITY_VALUES)}"
+    )
+  return annotation
+
+
+def apply_annotations(
+  schema: Any, direction: str, operation: str, where: str = "#"
+) -> Any:
+  """Return a copy of `schema` with visibility annotations applied.
+
+  Args:
+    schema: A loaded JSON Schema document (or any sub-schema).
+    direction: 'request' or 'response'.
+    operation: 'create', 'update', 'complete' or 'read'.
+    where: JSON pointer of `schema`, used in error messages.
+
+  Returns:
+    The resolved schema; the input is not modified.
+
+  """
+  if direction not in ANNOTATION_KEYS:
+    raise ResolutionError(f"Unknown direction {direction!r}")
+  active_key = ANNOTATION_KEYS[direction]
+
+  def visit(node, pointer):
+    if isinstance(node, list):
+      return [visit(item, f"{pointer}/{i}") for i, item in enumerate(node)]
+    if not isinstance(node, dict):
+      return node
+
+    result = {}
+    for key, value in node.items():
+      if key in ANNOTATION_KEYS.values():
+        continue
+      result[key] = visit(value, f"{pointer}/{key}")
+
+    properties = node.get("properties")
+    if not isinstance(properties, dict):
+      return result
+
+    required = list(result.get("required", []))
+    changed = False
+    for name, prop in properties.items():
+      if not isinstance(prop, dict) or active_key not in prop:
+        continue
+      visibility = _visibility(
+        prop[active_key], operation, f"{pointer}/properties/{name}"
+      )
+      if visibility == "omit":
+        del result["properties"][name]
+        if name in required:
+          required.remove(name)
+        changed = True
+      elif visibility == "required" and name not in required:
+        required.append(name)
+        changed = True
+      elif visibility == "optional" and name in required:
+        required.remove(name)
+        changed = True
+
+    if changed:
+      if required:
+        result["required"] = required
+      else:
+        result.pop("required", None)
+    return result
+
+  return visit(schema, where)
+
+
+def _resolve_pointer(document: Any, fragment: str, where: str) -> Any:
+  """Follow a `#/...` JSON pointer (RFC 6901 escaping) into `document`."""
+  if fragment in ("", "/"):
+    return document
+  current = document
+  for raw_part in fragment.lstrip("/").split("/"):
+    part = raw_part.replace("~1", "/").replace("~0", "~")
+    if isinstance(current, dict) and part in current:
+      current = current[part]
+    elif isinstance(current, list) and part.isdigit():
+      index = int(part)
+      if index >= len(current):
+        raise ResolutionError(f"Unresolvable $ref #{fragment} in {where}")
+      current = current[index]
+    else:
+      raise ResolutionError(f"Unresolvable $ref #{fragment} in {where}")
+  return current
+
+
+class Resolver:
+  """Resolves schema files, memoizing each file's annotated form.
+
+  One instance serves a single (direction, operation) pair; bundling pulls
+  every referenced file through the same pair.
+  """
+
+  def __init__(
+    self,
+    direction: str,
+    operation: str,
+    loader: Callable[[Path], Any] | None = None,
+  ):
+    """Create a resolver; `loader` reads a schema file (default: json)."""
+    self.direction = direction
+    self.operation = operation
+    self._loader = loader or _load_json_file
+    self._resolved: dict[Path, Any] = {}
+
+  def document(self, path: Path) -> Any:
+    """Return the annotation-resolved form of a schema file."""
+    path = path.resolve()
+    if path not in self._resolved:
+      self._resolved[path] = apply_annotations(
+        self._loader(path), self.direction, self.operation
+      )
+    return self._resolved[path]
+
+  def resolve(self, path: str | Path, bundle: bool = False) -> Any:
+    """Resolve a schema file, optionally inlining every `$ref`."""
+    path = Path(path).resolve()
+    resolved = self.document(path)
+    if not bundle:
+      return copy.deepcopy(resolved)
+    return self._bundle(resolved, path, ((path, ""),))
+
+  def resolve_pointer(
+    self, path: str | Path, pointer: str, bundle: bool = True
+  ) -> Any:
+    """Resolve only the sub-schema at `pointer` (e.g. '/$defs/x') of a file.
+
+    With `bundle`, only the refs reachable from that sub-schema are inlined,
+    giving the same result as bundling the whole file and then following
+    the pointer.
+    """
+    path = Path(path).resolve()
+    target = _resolve_pointer(self.document(path), pointer, str(path))
+    if not bundle:
+      return copy.deepcopy(target)
+    # Same stack as a whole-file bundle, so cyclic refs are kept identically.
+    return self._bundle(target, path, ((path, ""),))
+
+  def _bundle(self, node: Any, base: Path, stack: tuple) -> Any:
+    if isinstance(node, list):
+      return [self._bundle(item, base, stack) for item in node]
+    if not isinstance(node, dict):
+      return node
+
+    ref = node.get("$ref")
+    if not isinstance(ref, str) or ref.startswith(("http://", "https://")):
+      return {
+        key: self._bundle(value, base, stack) for key, value in node.items()
+      }
+
+    file_part, _, fragment = ref.partition("#")
+    target_path = (base.parent / file_part).resolve() if file_part else base
+    target_key = (target_path, fragment)
+    if target_key in stack:
+      # Cyclic reference: keep the $ref rather than recurse forever.
+      return dict(node)
+
+    target = _resolve_pointer(
+      self.document(target_path), fragment, f"{base}: {ref}"
+    )
+    inlined = self._bundle(target, target_path, (*stack, target_key))
+    siblings = {
+      key: self._bundle(value, base, stack)
+      for key, value in node.items()
+      if key != "$ref"
+    }
+    if not isinstance(inlined, dict):
+      # Boolean schemas cannot carry siblings; keep the target as-is.
+      return siblings or inlined
+    # Inlined documents are no longer standalone resources.
+    inlined = {
+      key: value
+      for key, value in inlined.items()
+      if key not in ("$id", "$schema")
+    }
+    return {**inlined, **siblings}
+
+
+def resolve_file(
+  path: str | Path,
+  direction: str = "response",
+  operation: str = "read",
+  bundle: bool = False,
+  loader: Callable[[Path], Any] | None = None,
+) -> Any:
+  """Resolve one schema file; see the module docstring for the semantics."""
+  return Resolver(direction, operation, loader).resolve(path, bundle=bundle)
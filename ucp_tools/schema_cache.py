@@ -0,0 +1,250 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Content-addressed on-disk cache for `ucp-schema resolve` output.
+
+A cache key covers everything that can change the CLI output: the schema
+file, every file it transitively `$ref`s, the CLI flags and the
+`ucp-schema --version` string. Keys therefore never go stale; editing any
+input simply produces a different key.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Any
+
+# Bump when the key layout or entry format changes.
+CACHE_FORMAT = 1
+
+
+def iter_file_refs(data: Any):
+  """Yield the file part of every relative `$ref` in a JSON document.
+
+  Fragment-only refs (`#/...`) and absolute URLs are skipped since they do
+  not pull in another local file.
+  """
+  if isinstance(data, dict):
+    for key, value in data.items():
+      if key == "$ref" and isinstance(value, str):
+        if value.startswith(("#", "http")):
+          continue
+        relative_path = value.split("#", 1)[0]
+        if relative_path:
+          yield relative_path
+      else:
+        yield from iter_file_refs(value)
+  elif isinstance(data, list):
+    for item in data:
+      yield from iter_file_refs(item)
+
+
+def _display_path(path: Path) -> str:
+  """Return a checkout-independent path so cache entries are portable."""
+  try:
+    return path.relative_to(Path.cwd()).as_posix()
+  except ValueError:
+    return path.as_posix()
+
+
+class ResolutionCache:
+  """On-disk cache of resolved schemas, keyed by input content.
+
+  File digests and ref lists are memoized on (mtime, size) so a build hashes
+  each source file once, while `mkdocs serve` still notices edits. Safe to
+  share between the prefetch worker threads.
+  """
+
+  def __init__(
+    self,
+    cache_dir: str | Path,
+    executable: str = "ucp-schema",
+    repository=None,
+  ):
+    """Create a cache rooted at `cache_dir` for the given CLI executable.
+
+    When a `SchemaRepository` is given, file digests and refs come from it
+    instead of being re-read from disk.
+    """
+    self.cache_dir = Path(cache_dir)
+    self.executable = executable
+    self.repository = repository
+    self.hits = 0
+    self.misses = 0
+    self.writes = 0
+    self._version: str | None = None
+    self._file_info: dict[Path, tuple[int, int, str, tuple[Path, ...]]] = {}
+    self._lock = threading.Lock()
+
+  # --- Inputs ---
+
+  @property
+  def tool_version(self) -> str | None:
+    """Return `ucp-schema --version`, or None if the CLI is unavailable.
+
+    The version is itself cached next to the entries, keyed on the binary's
+    location, mtime and size, so warm builds do not fork the CLI at all.
+    """
+    with self._lock:
+      if self._version is None:
+        self._version = self._probe_version()
+      return self._version
+
+  def _probe_version(self) -> str | None:
+    """Read the CLI version from the version stamp, or run the CLI."""
+    binary = shutil.which(self.executable)
+    if not binary:
+      return None
+    stat = Path(binary).stat()
+    stamp = [binary, stat.st_mtime_ns, stat.st_size]
+    version_file = self.cache_dir / "version.json"
+    try:
+      with version_file.open(encoding="utf-8") as f:
+        recorded = json.load(f)
+      if recorded.get("binary") == stamp:
+        return recorded["version"]
+    except (OSError, json.JSONDecodeError, KeyError, AttributeError):
+      pass
+
+    try:
+      result = subprocess.run(
+        [binary, "--version"],
+        capture_output=True,
+        text=True,
+        check=False,
+      )
+    except (OSError, subprocess.SubprocessError):
+      return None
+    if result.returncode != 0 or not result.stdout.strip():
+      return None
+    version = result.stdout.strip()
+    self._write_json(version_file, {"binary": stamp, "version": version})
+    return version
+
+  def _inspect(self, path: Path) -> tuple[str, tuple[Path, ...]]:
+    """Return (digest, referenced files) for a source file, memoized."""
+    if self.repository is not None:
+      digest = self.repository.digest(path)
+      if digest is None:
+        raise FileNotFoundError(path)
+      return digest, self.repository.file_refs(path)
+
+    stat = path.stat()
+    info = self._file_info.get(path)
+    if info and info[0] == stat.st_mtime_ns and info[1] == stat.st_size:
+      return info[2], info[3]
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    try:
+      refs = tuple(
+        dict.fromkeys(
+          (path.parent / ref).resolve()
+          for ref in iter_file_refs(json.loads(raw))
+        )
+      )
+    except (json.JSONDecodeError, UnicodeDecodeError):
+      refs = ()
+    self._file_info[path] = (stat.st_mtime_ns, stat.st_size, digest, refs)
+    return digest, refs
+
+  def _closure(self, schema_path: Path) -> dict[str, str]:
+    """Return {path: digest} for a schema and everything it references."""
+    digests: dict[str, str] = {}
+    pending = [schema_path.resolve()]
+    seen: set[Path] = set()
+    while pending:
+      path = pending.pop()
+      if path in seen:
+        continue
+      seen.add(path)
+      try:
+        digest, refs = self._inspect(path)
+      except OSError:
+        # A dangling ref still changes the CLI output, so record it.
+        digests[_display_path(path)] = "missing"
+        continue
+      digests[_display_path(path)] = digest
+      pending.extend(refs)
+    return digests
+
+  def key(self, schema_path: str | Path, flags: list[str]) -> str | None:
+    """Return the cache key for a resolution, or None if uncacheable."""
+    version = self.tool_version
+    if version is None:
+      return None
+    schema_path = Path(schema_path)
+    try:
+      root_digest, _ = self._inspect(schema_path.resolve())
+    except OSError:
+      return None
+    material = {
+      "format": CACHE_FORMAT,
+      "tool": version,
+      "flags": flags,
+      "schema": root_digest,
+      "files": sorted(self._closure(schema_path).items()),
+    }
+    encoded = json.dumps(material, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+  # --- Entries ---
+
+  def _entry_path(self, key: str) -> Path:
+    return self.cache_dir / key[:2] / f"{key}.json"
+
+  def get(self, key: str) -> Any | None:
+    """Return the cached resolution for `key`, or None on a miss."""
+    try:
+      with self._entry_path(key).open(encoding="utf-8") as f:
+        data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+      with self._lock:
+        self.misses += 1
+      return None
+    with self._lock:
+      self.hits += 1
+    return data
+
+  def put(self, key: str, data: Any) -> None:
+    """Store a resolution under `key`."""
+    if self._write_json(self._entry_path(key), data):
+      with self._lock:
+        self.writes += 1
+
+  def _write_json(self, path: Path, data: Any) -> bool:
+    """Atomically write JSON so concurrent builds never see partial files."""
+    try:
+      path.parent.mkdir(parents=True, exist_ok=True)
+      fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+      with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+      Path(tmp_name).replace(path)
+    except OSError:
+      return False
+    return True
+
+  def summary(self) -> str:
+    """Return a one-line hit/miss summary for the build log."""
+    lookups = self.hits + self.misses
+    rate = f"{100 * self.hits / lookups:.0f}%" if lookups else "n/a"
+    return (
+      f"ucp-schema disk cache: {self.hits} hits, {self.misses} misses "
+      f"({rate} hit rate), {self.writes} entries written to {self.cache_dir}"
+    )
@@ -0,0 +1,206 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Committed snapshot of `ucp-schema resolve` output.
+
+`python -m main snapshot` renders the docs with the CLI backend and saves
+every variant it resolved to `generated/ucp-schema-snapshot.json`, a
+lockfile-style artifact meant to be committed. Builds using the `cli` or
+`cross-check` backend then serve a variant from the snapshot whenever its
+inputs are unchanged, so they need neither the binary nor a warm disk cache.
+
+Entries are keyed by variant (source path and CLI flags), record that path
+and those flags, and carry the digest of every file in the schema's `$ref`
+closure. An entry is valid only while those digests match `source/` and,
+where `ucp-schema` is installed, while its version is the one the snapshot
+was made with; `python -m main snapshot --verify` lists the entries that
+are not.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import Any
+
+# Bump when the snapshot layout changes.
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_PATH = Path("generated/ucp-schema-snapshot.json")
+# extra.ucp_schema_snapshot: serve from the snapshot, or rewrite it
+SNAPSHOT_MODES = ("read", "write")
+
+
+def _inputs_hash(files: dict[str, str]) -> str:
+  encoded = json.dumps(sorted(files.items())).encode("utf-8")
+  return hashlib.sha256(encoded).hexdigest()
+
+
+class SchemaSnapshot:
+  """Resolved variants loaded from, or recorded for, a snapshot file.
+
+  Safe to share between the prefetch worker threads.
+  """
+
+  def __init__(
+    self, path, repository, source_dir, ref_graph, installed_tool=None
+  ):
+    """Create an empty snapshot; see `load` to read an existing one.
+
+    Args:
+      path: The snapshot file.
+      repository: The `SchemaRepository` digests are taken from.
+      source_dir: Directory entry paths are relative to.
+      ref_graph: `RefGraph` of `source_dir`, for `$ref` closures.
+      installed_tool: `ucp-schema --version` of the installed CLI, or None
+        if it is not installed. When it differs from the snapshot's, every
+        entry is stale.
+
+    """
+    self.path = Path(path)
+    self.repository = repository
+    self.source_dir = Path(source_dir).resolve()
+    self.ref_graph = ref_graph
+    # `ucp-schema --version` of the CLI the entries came from
+    self.tool: str | None = None
+    self.installed_tool = installed_tool
+    self.entries: dict[str, dict[str, Any]] = {}
+    self.served = 0
+    self.stale: set[str] = set()
+    self._lock = threading.Lock()
+
+  @classmethod
+  def load(
+    cls, path, repository, source_dir, ref_graph, installed_tool=None
+  ) -> "SchemaSnapshot":
+    """Read a snapshot file; a missing or unreadable one loads empty."""
+    snapshot = cls(path, repository, source_dir, ref_graph, installed_tool)
+    try:
+      with snapshot.path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+      return snapshot
+    if data.get("format") == SNAPSHOT_FORMAT:
+      snapshot.tool = data.get("tool")
+      snapshot.entries = data.get("entries", {})
+    return snapshot
+
+  def _relative(self, schema_path) -> str | None:
+    path = Path(schema_path).resolve()
+    if not path.is_relative_to(self.source_dir):
+      return None
+    return path.relative_to(self.source_dir).as_posix()
+
+  def variant(self, schema_path, flags: list[str]) -> str | None:
+    """Return the entry key of a resolution; None outside `source_dir`."""
+    relative = self._relative(schema_path)
+    return f"{relative} {' '.join(flags)}" if relative else None
+
+  def _inputs(self, relative: str) -> dict[str, str]:
+    """Return {path: digest} for a source file and its `$ref` closure."""
+    files = {}
+    for path in sorted({relative, *self.ref_graph.file_closure(relative)}):
+      digest = self.repository.digest(self.source_dir / path)
+      files[path] = digest or "missing"
+    return files
+
+  @property
+  def tool_mismatch(self) -> str | None:
+    """Describe how the installed CLI differs from the snapshot's, if so."""
+    if self.installed_tool is None or self.installed_tool == self.tool:
+      return None
+    return f"made with {self.tool}; installed is {self.installed_tool}"
+
+  def get(self, schema_path, flags: list[str]) -> Any | None:
+    """Return the snapshot of a resolution, or None if absent or stale."""
+    variant = self.variant(schema_path, flags)
+    entry = self.entries.get(variant) if variant else None
+    if entry is None:
+      return None
+    relative = self._relative(schema_path)
+    if self.tool_mismatch or _inputs_hash(self._inputs(relative)) != entry.get(
+      "inputs"
+    ):
+      with self._lock:
+        self.stale.add(variant)
+      return None
+    with self._lock:
+      self.served += 1
+    return entry["schema"]
+
+  def put(self, schema_path, flags: list[str], data: Any) -> None:
+    """Record a resolution, with the digests of its current inputs."""
+    variant = self.variant(schema_path, flags)
+    if variant is None:
+      return
+    relative = self._relative(schema_path)
+    files = self._inputs(relative)
+    entry = {
+      "path": relative,
+      "flags": list(flags),
+      "inputs": _inputs_hash(files),
+      "files": files,
+      "schema": data,
+    }
+    with self._lock:
+      self.entries[variant] = entry
+
+  def save(self, tool: str | None) -> None:
+    """Atomically write the snapshot, variants sorted for stable diffs."""
+    self.tool = tool
+    document = {
+      "format": SNAPSHOT_FORMAT,
+      "tool": tool,
+      "entries": dict(sorted(self.entries.items())),
+    }
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+      # Not sort_keys: property order is what the tables are rendered in.
+      json.dump(document, f, indent=2, ensure_ascii=False)
+      f.write("\n")
+    Path(tmp_name).replace(self.path)
+    # mkstemp files are private; the snapshot is meant to be committed.
+    self.path.chmod(0o644)
+
+  def verify(self) -> list[tuple[str, str]]:
+    """Return (variant, reason) for every entry that may not be served."""
+    mismatch = self.tool_mismatch
+    if mismatch:
+      return [(variant, mismatch) for variant in sorted(self.entries)]
+    stale = []
+    for variant, entry in sorted(self.entries.items()):
+      relative = entry["path"]
+      if self.repository.digest(self.source_dir / relative) is None:
+        stale.append((variant, "source file removed"))
+        continue
+      recorded = entry.get("files", {})
+      current = self._inputs(relative)
+      changed = sorted(
+        path
+        for path in recorded.keys() | current.keys()
+        if recorded.get(path) != current.get(path)
+      )
+      if changed:
+        stale.append((variant, f"changed: {', '.join(changed)}"))
+    return stale
+
+  def summary(self) -> str:
+    """Return a one-line summary for the build log."""
+    return (
+      f"ucp-schema snapshot: {self.served} variants served from "
+      f"{len(self.entries)} entries in {self.path}, "
+      f"{len(self.stale)} stale"
+    )
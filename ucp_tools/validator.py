@@ -0,0 +1,727 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Payload validators compiled from resolved UCP schema variants.
+
+A variant ('checkout.json' as a create request, say) is resolved with the
+same `Resolver` the documentation uses, bundled into a single file (see
+`bundle.py`), and then compiled once into nested closures: each keyword is
+looked at when compiling, so validating a payload only runs the checks that
+apply, with constants such as required names and enum sets precomputed.
+
+Errors are `Violation`s whose `pointer` is the JSON pointer of the failing
+value in the payload. The JSON Schema 2020-12 applicator and validation
+vocabularies are supported except `unevaluated*` and `$dynamicRef`; `format`
+is an annotation, as by default in 2020-12. Any other keyword that is not a
+known annotation (or a `ucp_` / `x-` extension) raises `CompileError`
+rather than being ignored, so a validator never accepts what it cannot
+check.
+
+`get_validator` keeps compiled validators per variant for the process,
+recompiling one only when a file it was built from changed.
+"""
+
+from collections.abc import Callable
+import math
+from pathlib import Path
+import re
+from typing import Any, NamedTuple
+
+from ucp_tools.bundle import (
+  REQUEST_OPERATIONS,
+  RESPONSE_OPERATION,
+  bundle_schema,
+  variant_name,
+)
+from ucp_tools.resolver import Resolver
+
+# Variants compiled by `compile_variants`, as (direction, operation)
+VARIANTS = (
+  *(("request", operation) for operation in REQUEST_OPERATIONS),
+  ("response", RESPONSE_OPERATION),
+)
+
+
+class Violation(NamedTuple):
+  """One failed check: where in the payload, which keyword, and why."""
+
+  pointer: str
+  keyword: str
+  message: str
+
+
+class CompileError(Exception):
+  """A schema could not be compiled (e.g. a `$ref` that does not resolve)."""
+
+
+# check(instance, pointer, errors) appends a Violation per failure.
+Check = Callable[[Any, str, list], None]
+
+
+def _escape(key: str) -> str:
+  return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+  return token.replace("~1", "/").replace("~0", "~")
+
+
+def _is_number(value: Any) -> bool:
+  return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_integer(value: Any) -> bool:
+  if isinstance(value, bool):
+    return False
+  return isinstance(value, int) or (
+    isinstance(value, float) and value.is_integer()
+  )
+
+
+_TYPE_TESTS: dict[str, Callable[[Any], bool]] = {
+  "object": lambda value: isinstance(value, dict),
+  "array": lambda value: isinstance(value, list),
+  "string": lambda value: isinstance(value, str),
+  "number": _is_number,
+  "integer": _is_integer,
+  "boolean": lambda value: isinstance(value, bool),
+  "null": lambda value: value is None,
+}
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+  """Compare as JSON values: `True` is not `1`, but `1` is `1.0`."""
+  if isinstance(a, bool) or isinstance(b, bool):
+    return isinstance(a, bool) and isinstance(b, bool) and a == b
+  if isinstance(a, dict) and isinstance(b, dict):
+    return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+  if isinstance(a, list) and isinstance(b, list):
+    return len(a) == len(b) and all(map(_json_equal, a, b))
+  if _is_number(a) and _is_number(b):
+    return a == b
+  return type(a) is type(b) and a == b
+
+
+def _unique(items: list) -> bool:
+  return not any(
+    _json_equal(items[i], items[j])
+    for i in range(len(items))
+    for j in range(i + 1, len(items))
+  )
+
+
+def _describe(value: Any) -> str:
+  text = repr(value)
+  return text if len(text) <= 40 else text[:37] + "..."
+
+
+def _run_all(checks: list[Check]) -> Check:
+  """Combine checks into one, avoiding the loop for a single check."""
+  if not checks:
+    return lambda instance, pointer, errors: None
+  if len(checks) == 1:
+    return checks[0]
+  checks = tuple(checks)
+
+  def check(instance, pointer, errors):
+    for c in checks:
+      c(instance, pointer, errors)
+
+  return check
+
+
+def _passes(check: Check, instance: Any, pointer: str) -> bool:
+  errors: list[Violation] = []
+  check(instance, pointer, errors)
+  return not errors
+
+
+def _any_of(subschemas: list[Check]) -> Check:
+  subschemas = tuple(subschemas)
+
+  def check(instance, pointer, errors):
+    for sub in subschemas:
+      if _passes(sub, instance, pointer):
+        return
+    errors.append(
+      Violation(pointer, "anyOf", "matches none of the alternatives")
+    )
+
+  return check
+
+
+def _one_of(subschemas: list[Check]) -> Check:
+  subschemas = tuple(subschemas)
+
+  def check(instance, pointer, errors):
+    matched = 0
+    for sub in subschemas:
+      if _passes(sub, instance, pointer):
+        matched += 1
+        if matched > 1:
+          break
+    if matched != 1:
+      errors.append(
+        Violation(
+          pointer,
+          "oneOf",
+          "matches none of the alternatives"
+          if not matched
+          else "matches more than one alternative",
+        )
+      )
+
+  return check
+
+
+def _not(sub: Check) -> Check:
+  def check(instance, pointer, errors):
+    if _passes(sub, instance, pointer):
+      errors.append(Violation(pointer, "not", "must not match the schema"))
+
+  return check
+
+
+class _Compiler:
+  """Compiles the schemas of one bundled document."""
+
+  def __init__(self, root: Any):
+    self.root = root
+    # '#/pointer' -> one-element list holding the compiled check, filled in
+    # after compiling so cyclic refs can point at it before it exists.
+    self._refs: dict[str, list[Check | None]] = {}
+
+  def compile(self, schema: Any, location: str = "#") -> Check:
+    if schema is True or schema == {}:
+      return _run_all([])
+    if schema is False:
+      return lambda instance, pointer, errors: errors.append(
+        Violation(pointer, "false", "no value is allowed here")
+      )
+    if not isinstance(schema, dict):
+      raise CompileError(f"{location}: a schema must be an object or bool")
+    unsupported = sorted(
+      keyword
+      for keyword in schema
+      if keyword not in _KEYWORDS
+      and not keyword.startswith(_EXTENSION_PREFIXES)
+    )
+    if unsupported:
+      raise CompileError(f"{location}: unsupported keywords {unsupported}")
+    checks = []
+    if "type" in schema:
+      checks.append(self._type(schema["type"], location))
+    if "enum" in schema:
+      checks.append(self._enum(schema["enum"]))
+    if "const" in schema:
+      checks.append(self._const(schema["const"]))
+    for keywords, compile_group in (
+      (_OBJECT_KEYWORDS, self._object),
+      (_ARRAY_KEYWORDS, self._array),
+      (_STRING_KEYWORDS, self._string),
+      (_NUMBER_KEYWORDS, self._number),
+    ):
+      if not keywords.isdisjoint(schema):
+        checks.append(compile_group(schema, location))
+    if "$ref" in schema:
+      checks.append(self._ref(schema["$ref"], location))
+    for keyword, combine in (
+      ("allOf", _run_all),
+      ("anyOf", _any_of),
+      ("oneOf", _one_of),
+    ):
+      if keyword in schema:
+        subschemas = [
+          self.compile(sub, f"{location}/{keyword}/{i}")
+          for i, sub in enumerate(schema[keyword])
+        ]
+        checks.append(combine(subschemas))
+    if "not" in schema:
+      checks.append(_not(self.compile(schema["not"], f"{location}/not")))
+    if "if" in schema:
+      checks.append(self._if(schema, location))
+    return _run_all(checks)
+
+  def _type(self, expected: str | list[str], location: str) -> Check:
+    names = [expected] if isinstance(expected, str) else list(expected)
+    unknown = set(names) - _TYPE_TESTS.keys()
+    if unknown:
+      raise CompileError(f"{location}: unknown type {sorted(unknown)}")
+    message = f"expected {' or '.join(names)}"
+    if len(names) == 1:
+      test = _TYPE_TESTS[names[0]]
+    else:
+      tests = tuple(_TYPE_TESTS[name] for name in names)
+
+      def test(value):
+        return any(t(value) for t in tests)
+
+    def check(instance, pointer, errors):
+      if not test(instance):
+        errors.append(
+          Violation(pointer, "type", f"{message}, got {_describe(instance)}")
+        )
+
+    return check
+
+  def _enum(self, values: list) -> Check:
+    message = f"must be one of {_describe(values)}"
+    if values and all(isinstance(value, str) for value in values):
+      allowed = frozenset(values)
+
+      def check(instance, pointer, errors):
+        if not (isinstance(instance, str) and instance in allowed):
+          errors.append(Violation(pointer, "enum", message))
+
+      return check
+
+    def check(instance, pointer, errors):
+      if not any(_json_equal(instance, value) for value in values):
+        errors.append(Violation(pointer, "enum", message))
+
+    return check
+
+  def _const(self, value: Any) -> Check:
+    message = f"must be {_describe(value)}"
+
+    def check(instance, pointer, errors):
+      if not _json_equal(instance, value):
+        errors.append(Violation(pointer, "const", message))
+
+    return check
+
+  def _object(self, schema: dict, location: str) -> Check:
+    properties = tuple(
+      (
+        name,
+        "/" + _escape(name),
+        self.compile(sub, f"{location}/properties/{_escape(name)}"),
+      )
+      for name, sub in schema.get("properties", {}).items()
+    )
+    patterns = tuple(
+      (re.compile(pattern).search, self.compile(sub, f"{location}/patterns"))
+      for pattern, sub in schema.get("patternProperties", {}).items()
+    )
+    required = tuple(schema.get("required", ()))
+    dependent = tuple(schema.get("dependentRequired", {}).items())
+    dependent_schemas = tuple(
+      (
+        name,
+        self.compile(sub, f"{location}/dependentSchemas/{_escape(name)}"),
+      )
+      for name, sub in schema.get("dependentSchemas", {}).items()
+    )
+    names = frozenset(name for name, _, _ in properties)
+    additional = schema.get("additionalProperties", True)
+    additional_check = (
+      None
+      if additional is True
+      else self.compile(additional, f"{location}/additionalProperties")
+    )
+    property_names = (
+      self.compile(schema["propertyNames"], f"{location}/propertyNames")
+      if "propertyNames" in schema
+      else None
+    )
+    min_properties = schema.get("minProperties")
+    max_properties = schema.get("maxProperties")
+    missing = object()
+
+    def check(instance, pointer, errors):
+      if not isinstance(instance, dict):
+        return
+      for name in required:
+        if name not in instance:
+          errors.append(
+            Violation(pointer, "required", f"missing property {name!r}")
+          )
+      for name, segment, sub in properties:
+        value = instance.get(name, missing)
+        if value is not missing:
+          sub(value, pointer + segment, errors)
+      if patterns or additional_check is not None:
+        for name, value in instance.items():
+          matched = name in names
+          for search, sub in patterns:
+            if search(name):
+              matched = True
+              sub(value, pointer + "/" + _escape(name), errors)
+          if not matched and additional_check is not None:
+            additional_check(value, pointer + "/" + _escape(name), errors)
+      if property_names is not None:
+        for name in instance:
+          property_names(name, pointer + "/" + _escape(name), errors)
+      for name, needed in dependent:
+        if name in instance:
+          for other in needed:
+            if other not in instance:
+              errors.append(
+                Violation(
+                  pointer,
+                  "dependentRequired",
+                  f"{other!r} is required with {name!r}",
+                )
+              )
+      for name, sub in dependent_schemas:
+        if name in instance:
+          sub(instance, pointer, errors)
+      if min_properties is not None and len(instance) < min_properties:
+        errors.append(
+          Violation(
+            pointer, "minProperties", f"needs {min_properties}+ properties"
+          )
+        )
+      if max_properties is not None and len(instance) > max_properties:
+        errors.append(
+          Violation(
+            pointer, "maxProperties", f"allows {max_properties} properties"
+          )
+        )
+
+    return check
+
+  def _array(self, schema: dict, location: str) -> Check:
+    prefix = tuple(
+      self.compile(sub, f"{location}/prefixItems/{i}")
+      for i, sub in enumerate(schema.get("prefixItems", ()))
+    )
+    items = (
+      self.compile(schema["items"], f"{location}/items")
+      if "items" in schema
+      else None
+    )
+    contains = (
+      self.compile(schema["contains"], f"{location}/contains")
+      if "contains" in schema
+      else None
+    )
+    min_contains = schema.get("minContains", 1)
+    max_contains = schema.get("maxContains")
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    unique = schema.get("uniqueItems", False)
+
+    def check(instance, pointer, errors):
+      if not isinstance(instance, list):
+        return
+      if min_items is not None and len(instance) < min_items:
+        errors.append(
+          Violation(pointer, "minItems", f"needs {min_items}+ items")
+        )
+      if max_items is not None and len(instance) > max_items:
+        errors.append(
+          Violation(pointer, "maxItems", f"allows {max_items} items")
+        )
+      for i, sub in enumerate(prefix[: len(instance)]):
+        sub(instance[i], f"{pointer}/{i}", errors)
+      if items is not None:
+        for i in range(len(prefix), len(instance)):
+          items(instance[i], f"{pointer}/{i}", errors)
+      if contains is not None:
+        found = sum(
+          _passes(contains, item, f"{pointer}/{i}")
+          for i, item in enumerate(instance)
+        )
+        if found < min_contains or (
+          max_contains is not None and found > max_contains
+        ):
+          errors.append(
+            Violation(pointer, "contains", f"{found} items match 'contains'")
+          )
+      if unique and not _unique(instance):
+        errors.append(Violation(pointer, "uniqueItems", "items must differ"))
+
+    return check
+
+  def _string(self, schema: dict, location: str) -> Check:
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = schema.get("pattern")
+    try:
+      search = re.compile(pattern).search if pattern is not None else None
+    except re.error as e:
+      raise CompileError(f"{location}/pattern: {e}") from e
+
+    def check(instance, pointer, errors):
+      if not isinstance(instance, str):
+        return
+      if min_length is not None and len(instance) < min_length:
+        errors.append(
+          Violation(pointer, "minLength", f"needs {min_length}+ characters")
+        )
+      if max_length is not None and len(instance) > max_length:
+        errors.append(
+          Violation(pointer, "maxLength", f"allows {max_length} characters")
+        )
+      if search is not None and not search(instance):
+        errors.append(
+          Violation(pointer, "pattern", f"does not match {pattern!r}")
+        )
+
+    return check
+
+  def _number(self, schema: dict, location: str) -> Check:
+    bounds = tuple(
+      (keyword, schema[keyword], test, text)
+      for keyword, test, text in (
+        ("minimum", lambda v, b: v >= b, ">="),
+        ("maximum", lambda v, b: v <= b, "<="),
+        ("exclusiveMinimum", lambda v, b: v > b, ">"),
+        ("exclusiveMaximum", lambda v, b: v < b, "<"),
+      )
+      if keyword in schema
+    )
+    multiple_of = schema.get("multipleOf")
+
+    def check(instance, pointer, errors):
+      if not _is_number(instance):
+        return
+      for keyword, bound, test, text in bounds:
+        if not test(instance, bound):
+          errors.append(Violation(pointer, keyword, f"must be {text} {bound}"))
+      if multiple_of is not None:
+        quotient = instance / multiple_of
+        if not (math.isfinite(quotient) and quotient.is_integer()):
+          errors.append(
+            Violation(
+              pointer, "multipleOf", f"must be a multiple of {multiple_of}"
+            )
+          )
+
+    return check
+
+  def _ref(self, ref: str, location: str) -> Check:
+    if not ref.startswith("#"):
+      raise CompileError(f"{location}: cannot follow non-local $ref {ref!r}")
+    cell = self._refs.get(ref)
+    if cell is None:
+      cell = self._refs[ref] = [None]
+      cell[0] = self.compile(self._target(ref, location), ref)
+
+    def check(instance, pointer, errors):
+      cell[0](instance, pointer, errors)
+
+    return check
+
+  def _target(self, ref: str, location: str) -> Any:
+    node = self.root
+    for token in filter(None, ref[1:].split("/")):
+      token = _unescape(token)
+      try:
+        node = node[int(token) if isinstance(node, list) else token]
+      except (KeyError, IndexError, ValueError, TypeError):
+        raise CompileError(
+          f"{location}: $ref {ref!r} does not resolve"
+        ) from None
+    return node
+
+  def _if(self, schema: dict, location: str) -> Check:
+    condition = self.compile(schema["if"], f"{location}/if")
+    then = self.compile(schema.get("then", True), f"{location}/then")
+    otherwise = self.compile(schema.get("else", True), f"{location}/else")
+
+    def check(instance, pointer, errors):
+      if _passes(condition, instance, pointer):
+        then(instance, pointer, errors)
+      else:
+        otherwise(instance, pointer, errors)
+
+    return check
+
+
+_OBJECT_KEYWORDS = frozenset(
+  (
+    "properties",
+    "patternProperties",
+    "additionalProperties",
+    "required",
+    "dependentRequired",
+    "dependentSchemas",
+    "propertyNames",
+    "minProperties",
+    "maxProperties",
+  )
+)
+_ARRAY_KEYWORDS = frozenset(
+  (
+    "items",
+    "prefixItems",
+    "contains",
+    "minContains",
+    "maxContains",
+    "minItems",
+    "maxItems",
+    "uniqueItems",
+  )
+)
+_STRING_KEYWORDS = frozenset(("minLength", "maxLength", "pattern"))
+_NUMBER_KEYWORDS = frozenset(
+  (
+    "minimum",
+    "maximum",
+    "exclusiveMinimum",
+    "exclusiveMaximum",
+    "multipleOf",
+  )
+)
+
+# Keywords that do not affect validation
+_ANNOTATIONS = frozenset(
+  (
+    "$schema",
+    "$id",
+    "$anchor",
+    "$dynamicAnchor",
+    "$vocabulary",
+    "$comment",
+    "$defs",
+    "definitions",
+    "title",
+    "description",
+    "default",
+    "examples",
+    "deprecated",
+    "readOnly",
+    "writeOnly",
+    "format",
+    "contentEncoding",
+    "contentMediaType",
+    "contentSchema",
+    # Only read through 'if'
+    "then",
+    "else",
+    # UCP capability metadata at a schema's root
+    "name",
+    "embedded",
+  )
+)
+_KEYWORDS = (
+  _ANNOTATIONS
+  | _OBJECT_KEYWORDS
+  | _ARRAY_KEYWORDS
+  | _STRING_KEYWORDS
+  | _NUMBER_KEYWORDS
+  | {"type", "enum", "const", "$ref", "allOf", "anyOf", "oneOf", "not", "if"}
+)
+# Vendor keywords, annotations by definition
+_EXTENSION_PREFIXES = ("ucp_", "x-")
+
+
+class Validator:
+  """A schema compiled into closures; call `errors` or `is_valid`."""
+
+  def __init__(self, schema: Any, name: str = ""):
+    """Compile `schema`, a bundled schema whose `$ref`s are all local.
+
+    Raises:
+      CompileError: If a keyword value is malformed or a `$ref` does not
+        resolve within the schema.
+
+    """
+    self.schema = schema
+    self.name = name
+    self._check = _Compiler(schema).compile(schema)
+
+  def errors(self, instance: Any) -> list[Violation]:
+    """Return every violation in a (parsed JSON) payload."""
+    errors: list[Violation] = []
+    self._check(instance, "", errors)
+    return errors
+
+  def is_valid(self, instance: Any) -> bool:
+    """Return whether a payload has no violations."""
+    return not self.errors(instance)
+
+  def __repr__(self) -> str:
+    """Name the variant, for logs."""
+    return f"Validator({self.name!r})"
+
+
+def compile_variant(
+  path: str | Path,
+  direction: str,
+  operation: str,
+  load: Callable[[Path], Any] | None = None,
+  source_dir: str | Path = "source",
+) -> Validator:
+  """Compile one variant of a schema file.
+
+  Args:
+    path: The schema file, e.g. 'source/schemas/shopping/checkout.json'.
+    direction: 'request' or 'response'.
+    operation: e.g. 'create', as for `ucp_request` annotations.
+    load: Reads a schema file, e.g. `SchemaRepository.load` (default: json).
+    source_dir: Directory the bundle's `$defs` keys are relative to.
+
+  """
+  resolver = Resolver(direction, operation, loader=load)
+  bundled = bundle_schema(path, resolver.document, source_dir)
+  name = f"{Path(path).stem}.{variant_name(direction, operation)}"
+  return Validator(bundled, name)
+
+
+# (id(repository), path, direction, operation)
+#   -> (repository generation, {file: digest} it was built from, validator)
+_validators: dict[tuple, tuple[int, dict[Path, str | None], Validator]] = {}
+
+
+def get_validator(
+  repository,
+  path: str | Path,
+  direction: str,
+  operation: str,
+  source_dir: str | Path = "source",
+) -> Validator:
+  """Return the process-wide compiled validator for a schema variant.
+
+  Lookups are a dict access while the repository generation is unchanged;
+  after a refresh, the validator is recompiled only if one of the files it
+  was built from changed.
+  """
+  path = Path(path).resolve()
+  key = (id(repository), path, direction, operation)
+  cached = _validators.get(key)
+  if cached is not None:
+    generation, sources, validator = cached
+    if generation == repository.generation:
+      return validator
+    if all(repository.digest(p) == d for p, d in sources.items()):
+      _validators[key] = (repository.generation, sources, validator)
+      return validator
+  read: list[Path] = []
+
+  def load(file: Path) -> Any:
+    read.append(file.resolve())
+    return repository.load(file)
+
+  validator = compile_variant(path, direction, operation, load, source_dir)
+  sources = {file: repository.digest(file) for file in read}
+  _validators[key] = (repository.generation, sources, validator)
+  return validator
+
+
+def compile_variants(
+  repository,
+  path: str | Path,
+  variants=VARIANTS,
+  source_dir: str | Path = "source",
+) -> dict[str, Validator]:
+  """Return {variant name: validator}, e.g. 'create_request', for a file."""
+  return {
+    variant_name(direction, operation): get_validator(
+      repository, path, direction, operation, source_dir
+    )
+    for direction, operation in variants
+  }